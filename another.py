@@ -1,45 +1,61 @@
 import sys
-import serial
 import time
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QLabel,
                              QVBoxLayout, QHBoxLayout, QWidget, QProgressBar,
                              QGridLayout, QFrame, QSlider)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QTimer
+from PyQt5.QtCore import QObject, pyqtSignal, Qt, QTimer, QRectF
 from PyQt5.QtGui import QColor, QPalette
 
+import events
+import metrics
+import pipeline
+import profiling
+import render_gate
+import stall_watchdog
+import stats_panel
+
 
 
 
 #   이게 이쁜거 (나중에 프로그레스 바 등등 뜯어낼거 많음/ 그리고 소리 추가할거면 이게 나음)
-class SerialThread(QThread):
-    received = pyqtSignal(str)
+class BoardLink(QObject):
+    """보드 연결 구독 - 포트는 hub가 갖고 있어서 같은 포트를 쓰는 다른 패널과 같이 씀 (hub.py)"""
+    ready = pyqtSignal()  # feed에 새 이벤트가 있음 (GUI가 drain할 때까지 한 번만 emit)
+    TOPICS = ("led", "tim", "log")  # LED/RGB, SEG/PROG + 콘솔 로그
 
     def __init__(self, port, baudrate):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
-        self.running = True
-
-    def run(self):
-        try:
-            self.serial = serial.Serial(self.port, self.baudrate, timeout=0.1)
-            while self.running:
-                if self.serial.in_waiting > 0:
-                    data = self.serial.readline().decode('utf-8').strip()
-                    if data:
-                        self.received.emit(data)
-                time.sleep(0.01)
-        except Exception as e:
-            print(f"시리얼 통신 오류: {e}")
+        # GUI가 밀려도 Qt 대기열이 늘지 않게 크기 제한 채널로 받음 (pipeline.py)
+        self.feed = pipeline.UiFeed("another")
+        self.sub = None
+        self.stopped = False
+
+    def start(self):
+        if self.stopped:
+            return  # 포트를 열기 전에 창이 닫힘
+        # 연결/세션 기록 모듈은 첫 프레임 뒤에 불러옴 (시작 시간)
+        import hub
+        import session_store
+        session_store.start("another", self.port)
+        self.sub = hub.subscribe(self.port, self.baudrate, "another", self.TOPICS, self.ready.emit, feed=self.feed)
 
     def send_command(self, command):
-        if hasattr(self, 'serial') and self.serial.is_open:
-            self.serial.write(f"{command}\n".encode('utf-8'))
+        import hub
+        if self.sub is not None and self.sub.closed and not self.stopped:
+            # 연결이 끊겼음 (포트 오류/뽑힘) - 다시 구독하면 연결 스레드가 포트를 다시 엶
+            print(f"시리얼 포트 {self.port} 연결이 끊겨서 다시 연결")
+            self.sub = hub.resubscribe(self.sub)
+        if self.sub is not None:
+            self.sub.write(f"{command}\n".encode('utf-8'))
 
     def stop(self):
-        self.running = False
-        if hasattr(self, 'serial') and self.serial.is_open:
-            self.serial.close()
+        self.stopped = True
+        if self.sub is not None:
+            import hub
+            hub.unsubscribe(self.sub)
+            self.sub = None
 
 
 class SegmentDisplay(QFrame):
@@ -52,9 +68,10 @@ class SegmentDisplay(QFrame):
         self.value = value.zfill(4)[:4]  # 항상 4자리 표시
         self.update()
 
+    @profiling.span("SegmentDisplay.paintEvent")
     def paintEvent(self, event):
         super().paintEvent(event)
-        from PyQt5.QtGui import QPainter, QPen, QBrush
+        from PyQt5.QtGui import QPainter
 
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
@@ -69,7 +86,6 @@ class SegmentDisplay(QFrame):
 
     def draw_digit(self, painter, x, y, width, digit):
         from PyQt5.QtGui import QPen, QBrush
-        from PyQt5.QtCore import QRect, QPoint, QLine
 
         # 세그먼트 색상
         on_color = QColor(255, 0, 0)  # 켜진 상태
@@ -118,7 +134,7 @@ class SegmentDisplay(QFrame):
             painter.translate(-seg_width / 2, -seg_height / 2)
 
             painter.setBrush(QBrush(color))
-            painter.drawRect(0, 0, seg_width, seg_height)
+            painter.drawRect(QRectF(0, 0, seg_width, seg_height))
             painter.restore()
 
 
@@ -136,6 +152,7 @@ class RGBLed(QFrame):
         self.b = b
         self.update()
 
+    @profiling.span("RGBLed.paintEvent")
     def paintEvent(self, event):
         super().paintEvent(event)
         from PyQt5.QtGui import QPainter, QPen, QBrush
@@ -152,16 +169,20 @@ class RGBLed(QFrame):
         painter.drawEllipse(5, 5, 50, 50)
 
 
-class MainWindow(QMainWindow):
-    def __init__(self):
+StatsPanel = stats_panel.panel_class(QLabel, QTimer)  # 지표 패널 (stats_panel.py)
+
+
+class MainWindow(render_gate.GatedWindow, QMainWindow):
+    def __init__(self, port="COM13", baudrate=115200):
         super().__init__()
         self.init_ui()
-        self.init_serial()
+        self.init_serial(port, baudrate)
 
-    def init_serial(self):
-        self.serial_thread = SerialThread('COM13', 115200)
-        self.serial_thread.received.connect(self.handle_received_data)
-        self.serial_thread.start()
+    def init_serial(self, port="COM13", baudrate=115200):
+        # 포트는 hub가 가짐 - 같은 포트를 쓰는 다른 패널(another2 등)이 이미 열었으면 그 연결을 같이 씀
+        self.board_link = BoardLink(port, baudrate)
+        self.board_link.ready.connect(self.drain_received)
+        self.link_started = False  # 포트 열기는 창이 처음 그려진 다음으로 미룸 (paintEvent)
 
     def init_ui(self):
         self.setWindowTitle('STM32 보드 제어')
@@ -251,6 +272,10 @@ class MainWindow(QMainWindow):
         self.status_label = QLabel("상태: COM13에 연결 중...")
         main_layout.addWidget(self.status_label)
 
+        # 지표 패널
+        self.stats_panel = StatsPanel()
+        main_layout.addWidget(self.stats_panel)
+
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
 
@@ -260,12 +285,22 @@ class MainWindow(QMainWindow):
         self.timer.start(100)
         self.progress_value = 0
 
+        # 창이 안 보이면 위젯 갱신과 화면용 타이머를 멈춤 (render_gate.py)
+        self.render_gate = render_gate.RenderGate("another")
+        self.render_gate.add_timer(self.timer)
+        self.render_gate.add_timer(self.stats_panel.refresh_timer, self.stats_panel.refresh)
+        self.render_poll_timer = QTimer(self)
+        self.render_poll_timer.timeout.connect(self.update_render_state)
+        self.render_poll_timer.start(render_gate.POLL_MS)
+
+    @stall_watchdog.slot("button_clicked")
     def button_clicked(self, idx):
         print(f"버튼 {idx + 1} 클릭됨")
         # STM32로 명령 전송
         command = f"BTN{idx + 1}"
-        self.serial_thread.send_command(command)
+        self.board_link.send_command(command)
 
+    @stall_watchdog.slot("update_rgb")
     def update_rgb(self):
         r = self.r_slider.value()
         g = self.g_slider.value()
@@ -274,8 +309,9 @@ class MainWindow(QMainWindow):
 
         # STM32로 RGB 값 전송
         command = f"RGB:{r},{g},{b}"
-        self.serial_thread.send_command(command)
+        self.board_link.send_command(command)
 
+    @stall_watchdog.slot("update_progress")
     def update_progress(self):
         # 테스트용 프로그레스바 업데이트
         self.progress_value = (self.progress_value + 1) % 101
@@ -283,6 +319,7 @@ class MainWindow(QMainWindow):
 
         # 실제 사용시에는 STM32에서 수신한 값으로 업데이트할 수 있음
 
+    @stall_watchdog.slot("test_segment")
     def test_segment(self):
         # 테스트용 랜덤 숫자 표시
         import random
@@ -291,65 +328,88 @@ class MainWindow(QMainWindow):
 
         # STM32로 세그먼트 값 전송
         command = f"SEG:{value}"
-        self.serial_thread.send_command(command)
+        self.board_link.send_command(command)
+
+    @stall_watchdog.slot("drain_received")
+    def drain_received(self):
+        # 밀린 만큼 한 번에 - 로그는 전부 (넘친 건 개수만), 위젯은 키별 마지막 상태만
+        logs, states, dropped = self.board_link.feed.drain()
+        if dropped:
+            print(f"[수신] GUI가 밀려서 로그 {dropped}줄 버림")
+        for event in logs:
+            print(f"[{events.format_time(event.t_ns)}] 수신된 데이터: {event.line}")
+        for event in states:
+            self.handle_received_data(event)
+        # 상태 표시는 상태 이벤트만이 아니라 마지막으로 받은 줄 기준 (로그가 없으면 가장 최근 상태)
+        last = logs[-1] if logs else max(states, key=lambda e: e.t_ns, default=None)
+        if last is not None:
+            self.render_gate.apply("status", self.status_label.setText, f"상태: 수신됨 - {last.line}")
+
+    @stall_watchdog.slot("handle_received_data", message_arg=0)
+    @profiling.span("MainWindow.handle_received_data")
+    def handle_received_data(self, event):
+        started = time.monotonic()
+        metrics.SIGNAL_LATENCY.observe((time.monotonic_ns() - event.t_ns) / 1e9)
+
+        # 파싱은 리더 스레드에서 끝남 (events.parse_line) - 예: "LED:1,ON" -> LED, 1, ON
+        try:
+            if event.kind == events.LED:
+                led_num = event.value
+                if 0 <= led_num < 4:  # LED 번호 유효성 확인
+                    color = "green" if event.aux else "gray"
+                    self.leds[led_num].is_on = bool(event.aux)
+                    self.render_gate.apply(("led", led_num), self.leds[led_num].setStyleSheet,
+                                           f"background-color: {color}; border-radius: 25px;")
 
-    def handle_received_data(self, data):
-        print(f"수신된 데이터: {data}")
+            elif event.kind == events.RGB:
+                self.render_gate.apply("rgb", self.show_rgb, event.value, event.aux, event.aux2)
 
-        try:
-            # 데이터 파싱 예시: "LED:1,ON" 또는 "BTN:2,PRESS"
-            parts = data.split(':')
-            if len(parts) == 2:
-                cmd_type = parts[0]
-                cmd_data = parts[1]
-
-                if cmd_type == "LED":
-                    led_parts = cmd_data.split(',')
-                    if len(led_parts) == 2:
-                        led_num = int(led_parts[0])
-                        led_state = led_parts[1]
-
-                        if 0 <= led_num < 4:  # LED 번호 유효성 확인
-                            if led_state == "ON":
-                                self.leds[led_num].setStyleSheet("background-color: green; border-radius: 25px;")
-                                self.leds[led_num].is_on = True
-                            else:
-                                self.leds[led_num].setStyleSheet("background-color: gray; border-radius: 25px;")
-                                self.leds[led_num].is_on = False
-
-                elif cmd_type == "RGB":
-                    rgb_values = cmd_data.split(',')
-                    if len(rgb_values) == 3:
-                        r = int(rgb_values[0])
-                        g = int(rgb_values[1])
-                        b = int(rgb_values[2])
-
-                        self.r_slider.setValue(r)
-                        self.g_slider.setValue(g)
-                        self.b_slider.setValue(b)
-                        self.rgb_led.set_color(r, g, b)
-
-                elif cmd_type == "SEG":
-                    self.segment_display.set_value(cmd_data)
-
-                elif cmd_type == "PROG":
-                    value = int(cmd_data)
-                    self.progress_bar.setValue(value)
+            elif event.kind == events.SEG:
+                self.render_gate.apply("segment", self.segment_display.set_value, event.payload)
+
+            elif event.kind == events.PROG:
+                self.render_gate.apply("progress", self.progress_bar.setValue, event.value)
 
         except Exception as e:
+            metrics.PARSE_FAILURES.inc()
             print(f"데이터 처리 오류: {e}")
 
-        self.status_label.setText(f"상태: 수신됨 - {data}")
+        metrics.UI_UPDATE_SECONDS.observe(time.monotonic() - started)
+
+    def show_rgb(self, r, g, b):
+        # 보드가 알려준 값을 슬라이더에 반영할 때는 다시 RGB 명령을 보내지 않음
+        # (슬라이더 하나씩 바뀔 때마다 update_rgb가 보내서 보드와 주고받기가 끝없이 이어졌음)
+        for slider, value in ((self.r_slider, r), (self.g_slider, g), (self.b_slider, b)):
+            slider.blockSignals(True)
+            slider.setValue(value)
+            slider.blockSignals(False)
+        self.rgb_led.set_color(r, g, b)
+
+    def update_render_state(self):
+        self.render_gate.update(self)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.link_started:
+            # 첫 프레임 뒤에 연결 (hub, session_store import도 이때)
+            self.link_started = True
+            QTimer.singleShot(0, self.board_link.start)
 
     def closeEvent(self, event):
-        # 앱 종료 시 시리얼 통신 스레드 종료
-        self.serial_thread.stop()
-        self.serial_thread.wait()
+        # 구독 해제 - 이 포트를 쓰는 마지막 패널이면 hub가 포트를 닫음
+        self.board_link.stop()
         event.accept()
 
 
+def create_window(port="COM13", baudrate=115200):
+    """MainWindow 생성 - 포트는 첫 프레임 이후에 열림"""
+    metrics.start_exporter()
+    stall_watchdog.WATCHDOG.attach(QTimer)
+    return MainWindow(port, baudrate)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = create_window()
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
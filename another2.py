@@ -1,60 +1,120 @@
+import os
 import sys
 from os.path import commonpath
 
-import serial
 import time
+import threading
 from datetime import datetime
 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QLabel,
                              QVBoxLayout, QHBoxLayout, QWidget, QProgressBar,
                              QGridLayout, QFrame)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QTimer
+from PyQt5.QtCore import QObject, pyqtSignal, Qt, QTimer, QRectF, QPointF
 from PyQt5.QtGui import QColor, QPalette, QFont
 
+import events
+import metrics
+import pipeline
+import clocksync
+import profiling
+import render_gate
+import stall_watchdog
+import stats_panel
+import timer_sync
+
 #   {1435} 를 전송하는 커맨트 추가
 #   현재모드 표시 adc:1534 --> 현재모드: ADC 텍스트 띄워주기
 
 #
-class SerialThread(QThread):
-    received = pyqtSignal(str)
+class BoardLink(QObject):
+    """보드 연결 구독 - 포트는 hub가 갖고 있어서 같은 포트를 쓰는 다른 패널과 같이 씀 (hub.py)
+
+    덤프/업로드/시계 응답 가로채기와 주기 작업은 hub 연결 스레드에서 (on_line / on_tick)"""
+    ready = pyqtSignal()  # feed에 새 이벤트가 있음 (GUI가 drain할 때까지 한 번만 emit)
+    TOPICS = ("adc", "led", "tim", "rtc", "flash", "log")
 
     def __init__(self, port, baudrate):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
-        self.running = True
-
-    def run(self):
-        try:
-            self.serial = serial.Serial(self.port, self.baudrate, timeout=0.1)
-            while self.running:
-                if self.serial.in_waiting > 0:
-                    # data = self.serial.readline().decode('utf-8').strip()
-                    # 시리얼 통신 오류: 'utf-8' codec can't decode byte 0x81 in position 0: invalid start byte
-                    data = self.serial.readline().decode('utf-8', errors='ignore').strip()
-                    # current_time = datetime.now().strftime("%M%S")
-                    # self.serial.write(current_time.encode())  # 시간 전송
-                    # print(repr(current_time.encode()))  # 실제 전송 데이터 확인
-                    # print(f"[현재시각: {current_time[1:]}]")
-                    # print(f"[현재시각: {current_time}]")
-                    # 이거 밑으로 옮기면 될거같은데?
-                    if data:
-                        self.received.emit(data)
-                time.sleep(0.01)
-        except Exception as e:
-            print(f"시리얼 통신 오류: {e}")
+        # 보드 RTC 동기화 - "RTC?" 질의에 "RTC:MMSS"로 응답, "%M%S"로 설정
+        self.clock_sync = clocksync.ClockSync(self.send_command, clocksync.MMSS, "RTC?")
+        # Flash 덤프 - GUI가 pending_dump에 넣으면 연결 스레드가 받아서 진행
+        self.pending_dump = None
+        self.flash_dumper = None
+        # 대량 업로드 - 루프 한 번에 몇 패킷씩만 보내서 제어 명령이 밀리지 않게
+        self.uploader = None
+        # 시퀀스 실행 중이면 받은 줄을 복사해서 넘김 (sequence_runner.FeedLink)
+        self.sequence_link = None
+        # GUI가 밀려도 Qt 대기열이 늘지 않게 크기 제한 채널로 받음 (pipeline.py)
+        self.feed = pipeline.UiFeed("another2")
+        self.sub = None
+        self.stopped = False
+
+    def start(self):
+        if self.stopped:
+            return  # 포트를 열기 전에 창이 닫힘
+        # 연결/세션 기록 모듈은 첫 프레임 뒤에 불러옴 (시작 시간)
+        import hub
+        import session_store
+        session_store.start("another2", self.port)
+        self.sub = hub.subscribe(self.port, self.baudrate, "another2", self.TOPICS, self.ready.emit,
+                                 on_line=self.handle_line, on_tick=self.tick, feed=self.feed)
+
+    def handle_line(self, line, t_ns):
+        # Flash 덤프 데이터/업로드 응답은 GUI로 보내지 않음 (True = 가져감)
+        if self.flash_dumper is not None and self.flash_dumper.handle_line(line):
+            return True
+        if self.uploader is not None and self.uploader.handle_line(line):
+            return True
+        self.clock_sync.handle_line(line, received=t_ns / 1e9)
+        if self.sequence_link is not None:
+            self.sequence_link.feed(line)
+        return False
+
+    def tick(self):
+        self.clock_sync.tick()
+        self.pump_flash_dump()
+        if self.uploader is not None:
+            self.uploader.pump()
+
+    def pump_flash_dump(self):
+        if self.pending_dump is not None:
+            self.flash_dumper, self.pending_dump = self.pending_dump, None
+            self.flash_dumper.open()
+        if self.flash_dumper is not None:
+            self.flash_dumper.pump()
+
+    def start_flash_dump(self, path, size):
+        import flashdump
+        self.pending_dump = flashdump.FlashDumper(self.send_command, path, size=size)
+        return self.pending_dump
+
+    def start_upload(self, data, name):
+        import bulkupload
+        self.uploader = bulkupload.BulkUploader(self.send_command, data, name=name)
+        return self.uploader
 
     def send_command(self, command):
-        if hasattr(self, 'serial') and self.serial.is_open:
-            # self.serial.write(command.encode(('utf-8')))
-            self.serial.write(f"{command}".encode('utf-8'))
+        import hub
+        if self.sub is not None and self.sub.closed and not self.stopped:
+            # 연결이 끊겼음 (포트 오류/뽑힘) - 다시 구독하면 연결 스레드가 포트를 다시 엶
+            print(f"시리얼 포트 {self.port} 연결이 끊겨서 다시 연결")
+            self.sub = hub.resubscribe(self.sub)
+        if self.sub is not None:
             # 아 공백 빼는지 알았는데 아니었네? 간단하게는 그냥 여기서 처리
-            # self.serial.write(f"{command}\n".encode('utf-8'))
+            # self.sub.write(f"{command}\n".encode('utf-8'))
+            self.sub.write(f"{command}".encode('utf-8'))
 
     def stop(self):
-        self.running = False
-        if hasattr(self, 'serial') and self.serial.is_open:
-            self.serial.close()
+        self.stopped = True
+        if self.sub is not None:
+            # 구독을 빼고 나면 연결 스레드가 더는 on_line/on_tick을 부르지 않음
+            import hub
+            hub.unsubscribe(self.sub)
+            self.sub = None
+        if self.flash_dumper is not None:
+            self.flash_dumper.close()  # 진행 위치 저장 (다음에 이어서)
 
 
 class SegmentDigit(QFrame):
@@ -68,9 +128,10 @@ class SegmentDigit(QFrame):
         self.digit = digit
         self.update()
 
+    @profiling.span("SegmentDigit.paintEvent")
     def paintEvent(self, event):
         super().paintEvent(event)
-        from PyQt5.QtGui import QPainter, QPen, QBrush
+        from PyQt5.QtGui import QPainter, QBrush
 
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
@@ -115,43 +176,43 @@ class SegmentDigit(QFrame):
         # a (상단 가로)
         color = on_color if digit_segments[0] else off_color
         painter.setBrush(QBrush(color))
-        painter.drawRect(margin, margin, segment_length, segment_thickness)
+        painter.drawRect(QRectF(margin, margin, segment_length, segment_thickness))
 
         # b (우측 상단 세로)
         color = on_color if digit_segments[1] else off_color
         painter.setBrush(QBrush(color))
-        painter.drawRect(margin + segment_length - segment_thickness, margin,
-                         segment_thickness, segment_length)
+        painter.drawRect(QRectF(margin + segment_length - segment_thickness, margin,
+                                segment_thickness, segment_length))
 
         # c (우측 하단 세로)
         color = on_color if digit_segments[2] else off_color
         painter.setBrush(QBrush(color))
-        painter.drawRect(margin + segment_length - segment_thickness, margin + segment_length,
-                         segment_thickness, segment_length)
+        painter.drawRect(QRectF(margin + segment_length - segment_thickness, margin + segment_length,
+                                segment_thickness, segment_length))
 
         # d (하단 가로)
         color = on_color if digit_segments[3] else off_color
         painter.setBrush(QBrush(color))
-        painter.drawRect(margin, margin + segment_length * 2 - segment_thickness,
-                         segment_length, segment_thickness)
+        painter.drawRect(QRectF(margin, margin + segment_length * 2 - segment_thickness,
+                                segment_length, segment_thickness))
 
         # e (좌측 하단 세로)
         color = on_color if digit_segments[4] else off_color
         painter.setBrush(QBrush(color))
-        painter.drawRect(margin, margin + segment_length,
-                         segment_thickness, segment_length)
+        painter.drawRect(QRectF(margin, margin + segment_length,
+                                segment_thickness, segment_length))
 
         # f (좌측 상단 세로)
         color = on_color if digit_segments[5] else off_color
         painter.setBrush(QBrush(color))
-        painter.drawRect(margin, margin,
-                         segment_thickness, segment_length)
+        painter.drawRect(QRectF(margin, margin,
+                                segment_thickness, segment_length))
 
         # g (중앙 가로)
         color = on_color if digit_segments[6] else off_color
         painter.setBrush(QBrush(color))
-        painter.drawRect(margin, margin + segment_length - segment_thickness / 2,
-                         segment_length, segment_thickness)
+        painter.drawRect(QRectF(margin, margin + segment_length - segment_thickness / 2,
+                                segment_length, segment_thickness))
 
 
 class SegmentDisplay(QFrame):
@@ -199,6 +260,7 @@ class RGBLed(QFrame):
         self.b = b
         self.update()
 
+    @profiling.span("RGBLed.paintEvent")
     def paintEvent(self, event):
         super().paintEvent(event)
         from PyQt5.QtGui import QPainter, QPen, QBrush
@@ -225,6 +287,7 @@ class ADCBarGraph(QWidget):
         self.value = max(0, min(100, value))  # 0-100 범위로 제한
         self.update()
 
+    @profiling.span("ADCBarGraph.paintEvent")
     def paintEvent(self, event):
         super().paintEvent(event)
         from PyQt5.QtGui import QPainter, QPen, QBrush, QLinearGradient
@@ -256,7 +319,7 @@ class ADCBarGraph(QWidget):
         painter.setPen(QPen(Qt.black))
         painter.setFont(QFont("Galmuri11", 10, QFont.Bold))
         text = f"{self.value}%"
-        painter.drawText(self.width() / 2 - 15, self.height() / 2 + 5, text)
+        painter.drawText(QPointF(self.width() / 2 - 15, self.height() / 2 + 5), text)
 
 # GlassDisplay 클래스 추가 - 유리 느낌의 모드 표시 디스플레이
 class GlassDisplay(QFrame):
@@ -347,6 +410,7 @@ class GlassDisplay(QFrame):
             """)
             self.value_label.setStyleSheet("color: rgba(0, 0, 100, 230); background-color: transparent; border: none;")
 
+    @profiling.span("GlassDisplay.paintEvent")
     def paintEvent(self, event):
         super().paintEvent(event)
         from PyQt5.QtGui import QPainter, QLinearGradient
@@ -362,20 +426,26 @@ class GlassDisplay(QFrame):
 
         painter.setBrush(gradient)
         painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(5, 5, self.width() - 10, self.height() / 2 - 5, 8, 8)
-class MainWindow(QMainWindow):
-    def __init__(self):
+        painter.drawRoundedRect(QRectF(5, 5, self.width() - 10, self.height() / 2 - 5), 8, 8)
+
+
+StatsPanel = stats_panel.panel_class(QLabel, QTimer)  # 지표 패널 (stats_panel.py)
+
+
+class MainWindow(render_gate.GatedWindow, QMainWindow):
+    def __init__(self, port="COM13", baudrate=115200):
         super().__init__()
         self.init_ui()
-        self.init_serial()
+        self.init_serial(port, baudrate)
         self.set_ui()
         self.reset_ui()
 
 
-    def init_serial(self):
-        self.serial_thread = SerialThread('COM13', 115200)
-        self.serial_thread.received.connect(self.handle_received_data)
-        self.serial_thread.start()
+    def init_serial(self, port="COM13", baudrate=115200):
+        # 포트는 hub가 가짐 - 같은 포트를 쓰는 다른 패널(another 등)이 이미 열었으면 그 연결을 같이 씀
+        self.board_link = BoardLink(port, baudrate)
+        self.board_link.ready.connect(self.handle_received_data)
+        self.link_started = False  # 포트 열기는 창이 처음 그려진 다음으로 미룸 (paintEvent)
 
     def init_ui(self):
         self.setWindowTitle('STM32 보드 제어')
@@ -494,17 +564,179 @@ class MainWindow(QMainWindow):
         self.label_flash_info.setStyleSheet("color: blue; font-weight: bold;")
         main_layout.addWidget(self.label_flash_info)
 
+        # Flash 전체 덤프
+        self.flash_size = None  # 0x90 ID 응답으로 알게 되면 (없으면 flashdump.DEFAULT_SIZE)
+        self.flash_dump_btn = QPushButton("Flash 덤프")
+        self.flash_dump_btn.setFont(QFont("Galmuri11", 10))
+        self.flash_dump_btn.clicked.connect(self.start_flash_dump)
+        main_layout.addWidget(self.flash_dump_btn)
+        self.flash_dump_timer = QTimer(self)
+        self.flash_dump_timer.timeout.connect(self.update_flash_dump)
+
+        # 보정 테이블/에셋 업로드
+        self.upload_btn = QPushButton("데이터 업로드")
+        self.upload_btn.setFont(QFont("Galmuri11", 10))
+        self.upload_btn.clicked.connect(self.start_upload)
+        main_layout.addWidget(self.upload_btn)
+        self.label_upload = QLabel("")
+        self.label_upload.setFont(QFont("Galmuri9", 9))
+        main_layout.addWidget(self.label_upload)
+        self.upload_timer = QTimer(self)
+        self.upload_timer.timeout.connect(self.update_upload)
+
+        # 테스트 시퀀스 (sequence_runner.py)
+        self.sequence_btn = QPushButton("시퀀스 실행")
+        self.sequence_btn.setFont(QFont("Galmuri11", 10))
+        self.sequence_btn.clicked.connect(self.start_sequence)
+        main_layout.addWidget(self.sequence_btn)
+        self.label_sequence = QLabel("")
+        self.label_sequence.setFont(QFont("Galmuri9", 9))
+        main_layout.addWidget(self.label_sequence)
+        self.sequence_timer = QTimer(self)
+        self.sequence_timer.timeout.connect(self.update_sequence)
+        self.sequence_thread = None
+        self.sequence_steps = []
+        self.sequence_reports = None
+
+        # 시계 동기 상태
+        self.sync_label = QLabel("시계 동기: 대기 중")
+        self.sync_label.setFont(QFont("Galmuri9", 9))
+        main_layout.addWidget(self.sync_label)
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.update_sync_status)
+        self.sync_timer.start(1000)
+
+        # 지표 패널
+        self.stats_panel = StatsPanel()
+        main_layout.addWidget(self.stats_panel)
+
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
 
         # 초기 상태 설정
         self.segment_display.set_value("8888")
 
-    def send_current_time(self):
-        current_time = datetime.now().strftime("%M%S")
-        self.serial_thread.send_command(current_time)  # send_command 메소드 사용
-        print(f"Current time: {current_time}")
+        # 타이머 동기 모드면 보드는 기준점만 보내고 여기서 세어서 그림 (timer_sync.py)
+        self.timer_model = timer_sync.TimerModel()
+        self.timer_text = None
+        self.timer_view = QTimer(self)
+        self.timer_view.timeout.connect(self.render_timer)
+        self.timer_view.start(timer_sync.REFRESH_MS)
+
+        # 창이 안 보이면 위젯 갱신과 화면용 타이머를 멈춤 (render_gate.py)
+        self.render_gate = render_gate.RenderGate("another2")
+        self.render_gate.add_timer(self.sync_timer, self.update_sync_status)
+        self.render_gate.add_timer(self.timer_view, self.render_timer)
+        self.render_gate.add_timer(self.stats_panel.refresh_timer, self.stats_panel.refresh)
+        self.render_poll_timer = QTimer(self)
+        self.render_poll_timer.timeout.connect(self.update_render_state)
+        self.render_poll_timer.start(render_gate.POLL_MS)
 
+    def send_current_time(self):
+        # 리더 스레드의 시계 동기화가 RTT를 감안해서 바로 보정
+        self.board_link.clock_sync.request_correction()
+        print("Current time: 보정 요청")
+
+    @stall_watchdog.slot("start_flash_dump")
+    def start_flash_dump(self):
+        # 저장 대화상자는 거의 안 쓰니까 필요할 때만 불러옴
+        from PyQt5.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getSaveFileName(self, "Flash 덤프 저장", "flash_dump.bin")
+        if not path:
+            return
+        import flashdump
+        self.flash_dumper = self.board_link.start_flash_dump(path, self.flash_size or flashdump.DEFAULT_SIZE)
+        self.flash_dump_btn.setEnabled(False)
+        self.glass_display.set_mode("Flash")
+        self.flash_dump_timer.start(500)
+
+    def update_flash_dump(self):
+        self.label_flash_info.setText(self.flash_dumper.status_text())
+        if self.flash_dumper.finished or self.flash_dumper.failed:
+            self.flash_dump_timer.stop()
+            self.flash_dump_btn.setEnabled(True)
+            self.board_link.flash_dumper = None
+
+    def start_upload(self):
+        from PyQt5.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, "보드로 올릴 파일")
+        if not path:
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        self.uploader = self.board_link.start_upload(data, os.path.basename(path))
+        self.upload_btn.setEnabled(False)
+        self.upload_timer.start(500)
+
+    def update_upload(self):
+        self.label_upload.setText(self.uploader.status_text())
+        if self.uploader.finished:
+            self.upload_timer.stop()
+            self.upload_btn.setEnabled(True)
+            self.board_link.uploader = None
+
+    def start_sequence(self):
+        from PyQt5.QtWidgets import QFileDialog, QInputDialog
+        import sequence_runner
+        path, _ = QFileDialog.getOpenFileName(self, "시퀀스 스크립트", "sequences", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            script = sequence_runner.load_script(path)
+        except (OSError, ValueError) as e:
+            self.label_sequence.setText(f"스크립트 오류: {e}")
+            return
+        # 이 보드는 지금 연결을 같이 쓰고, 다른 보드는 각자 포트를 엶
+        extra, ok = QInputDialog.getText(self, "시퀀스 실행", "같이 돌릴 다른 포트 (쉼표로 구분, 비우면 이 보드만)")
+        link = sequence_runner.FeedLink(self.board_link.port, self.board_link.send_command)
+        links = [link]
+        for port in (extra.split(",") if ok else []):
+            if port.strip():
+                try:
+                    links.append(sequence_runner.PortLink(port.strip(), self.board_link.baudrate))
+                except Exception as e:
+                    print(f"{port} 열기 실패: {e}")
+        self.board_link.sequence_link = link
+        self.sequence_steps = []
+        self.sequence_reports = None
+
+        def run():
+            try:
+                self.sequence_reports = sequence_runner.run_parallel(
+                    script, links, on_step=lambda board, result: self.sequence_steps.append((board, result)))
+            finally:
+                for other in links[1:]:
+                    other.close()
+
+        self.sequence_script = script
+        self.sequence_report_path = os.path.splitext(path)[0] + ".result.json"
+        self.sequence_thread = threading.Thread(target=run, name="sequence", daemon=True)
+        self.sequence_thread.start()
+        self.sequence_btn.setEnabled(False)
+        self.sequence_timer.start(200)
+
+    def update_sequence(self):
+        if self.sequence_steps:
+            board, result = self.sequence_steps[-1]
+            self.label_sequence.setText(f"시퀀스: {board} {result['step']}. {result['name']} "
+                                        f"{result['status']} ({result['elapsed_ms']:.0f} ms)")
+        if self.sequence_thread.is_alive():
+            return
+        self.sequence_timer.stop()
+        self.sequence_btn.setEnabled(True)
+        self.board_link.sequence_link = None
+        import sequence_runner
+        reports = self.sequence_reports or []
+        print(sequence_runner.format_report(self.sequence_script, reports))
+        sequence_runner.write_report(self.sequence_report_path, self.sequence_script, reports)
+        passed = sum(1 for report in reports if report["passed"])
+        self.label_sequence.setText(f"시퀀스 완료: 보드 {len(reports)}개 중 {passed}개 통과 "
+                                    f"({os.path.basename(self.sequence_report_path)})")
+
+    def update_sync_status(self):
+        self.sync_label.setText(self.board_link.clock_sync.status_text())
+
+    @stall_watchdog.slot("set_ui")
     def set_ui(self):
         self.send_current_time()
     # 이 메소드는 이비 버튼의 이벤트 핸들러로 등록되어있음
@@ -520,6 +752,7 @@ class MainWindow(QMainWindow):
 
 
     # 새거 추가했어
+    @stall_watchdog.slot("reset_ui")
     def reset_ui(self):
         # LED 꺼짐 상태로
         for led in self.leds:
@@ -547,11 +780,12 @@ class MainWindow(QMainWindow):
         # for i, name in enumerate(button_names):
         #     self.buttons[i].setText(name)
 
+    @stall_watchdog.slot("button_clicked")
     def button_clicked(self, idx):
         print(f"버튼 {idx + 1} 클릭됨")
         if self.buttons[idx].isCheckable():
             command= f"BTN{idx + 1}"
-            self.serial_thread.send_command(command)
+            self.board_link.send_command(command)
 
             if idx ==0:
                 self.glass_display.set_mode("RTC")
@@ -564,7 +798,7 @@ class MainWindow(QMainWindow):
 
         else:
             command=f"BTN{idx + 1}_OFF"
-            self.serial_thread.send_command("command")
+            self.board_link.send_command("command")
             self.glass_display.set_mode("IDLE")
 
 
@@ -574,100 +808,126 @@ class MainWindow(QMainWindow):
 
 
     # print(repr(ser.read(10)))  # b'\x81\x01...' 이런 식으로 바이트 그대로 확인
-    def handle_received_data(self, data):
-        print(f"수신된 데이터: {data}")
+    @stall_watchdog.slot("handle_received_data")
+    @profiling.span("MainWindow.handle_received_data")
+    def handle_received_data(self):
+        # 리더가 feed에 쌓아둔 것을 한 번에 - 로그는 전부 (넘친 건 개수만), 위젯은 키별 마지막 상태만
+        started = time.monotonic()
+        logs, states, dropped = self.board_link.feed.drain()
+        if dropped:
+            print(f"[수신] GUI가 밀려서 로그 {dropped}줄 버림")
+        for event in logs:
+            print(f"[{events.format_time(event.t_ns)}] 수신된 데이터: {event.line}")
+        now_ns = time.monotonic_ns()
+        for event in states:
+            metrics.SIGNAL_LATENCY.observe((now_ns - event.t_ns) / 1e9)
+            try:
+                self.handle_event(event)
+            except Exception as e:
+                metrics.PARSE_FAILURES.inc()
+                print(f"데이터 처리 오류: {e}")
+        self.render_gate.apply("status", self.status_label.setText, "")
+        metrics.UI_UPDATE_SECONDS.observe(time.monotonic() - started)
+        # self.status_label.setText(f"상태: 수신됨 - {data}")
 
-        try:
-            if data.startswith("0x90 ID - Manufacturer"):
-                self.label_flash_info.setText(f"Flash 정보: {data}")
-                self.status_label.setText(" ")  # 기존 라벨은 비워줌
-                self.glass_display.set_mode("Flash")
+    @stall_watchdog.slot("handle_event", message_arg=0)
+    def handle_event(self, event):
+        # 파싱은 리더 스레드에서 끝남 (events.parse_line) - 예: "LED:1,ON", "ADC:75"
+        # 위젯 갱신은 render_gate를 거침 (창이 안 보이면 키별 마지막 값만 남았다가 다시 보일 때 적용)
+        gate = self.render_gate
+        if event.kind == events.FLASH_ID:
+            import flashdump  # 덤프 기능은 ID 응답을 받을 때 처음 불러옴
+            self.flash_size = flashdump.size_from_id_line(event.line) or self.flash_size
+            gate.apply("flash_info", self.label_flash_info.setText, f"Flash 정보: {event.line}")
+            gate.apply("status", self.status_label.setText, " ")  # 기존 라벨은 비워줌
+            gate.apply("glass", self.glass_display.set_mode, "Flash")
+
+        elif event.kind == events.LED:
+            led_num = event.value - 1
+            if 0 <= led_num <= 4:  # LED 번호 유효성 확인
+                color = "red" if event.aux else "gray"
+                self.leds[led_num].is_on = bool(event.aux)
+                gate.apply(("led", led_num), self.leds[led_num].setStyleSheet,
+                           f"background-color: {color}; border-radius: 25px; border: 2px solid black;")
+        # 이거 밑에랑 합쳤음
+        elif event.kind == events.RGB:
+            gate.apply("rgb", self.rgb_led.set_color, event.value, event.aux, event.aux2)
+
+        elif event.kind == events.RTC:
+            gate.apply("glass", self.glass_display.set_mode, "RTC")
+
+        elif event.kind == events.SEG:
+            gate.apply("glass", self.glass_display.set_mode, "TIM", event.payload)
+            gate.apply("segment", self.segment_display.set_value, event.payload)
+
+        elif event.kind == events.TIM:
+            if self.timer_model.anchor(event):
+                self.timer_text = None  # 기준점마다 바로 다시 그림
+                self.render_timer()
                 return
+            gate.apply("segment", self.segment_display.set_value, event.payload)
+            gate.apply("glass", self.glass_display.set_mode, "TIM", event.payload)
+
+        elif event.kind == events.ADC:
+            value = event.value
+            gate.apply("adc", self.adc_bar.set_value, value)
+            gate.apply("glass", self.glass_display.set_mode, "ADC", event.payload)
+
+            # alertLED 함수의 동작을 시뮬레이션
+            if value == 0:
+                color = (255, 0, 0)  # 빨간색 점멸
+            elif value <= 20:
+                color = (255, 50, 0)  # 빨간색
+            elif value <= 40:
+                color = (255, 100, 0)  # 주황색
+            elif value <= 60:
+                color = (0, 255, 0)  # 녹색
+            elif value <= 80:
+                color = (0, 255, 100)  # 청녹색
+            elif value <= 95:
+                color = (0, 50, 255)  # 파란색
+            else:
+                color = (0, 0, 255)  # 파란색 점멸
+            gate.apply("rgb", self.rgb_led.set_color, *color)
+
+    def render_timer(self):
+        # 보간한 타이머 값 - 표시가 바뀔 때(초 단위)만 그림
+        model = self.timer_model
+        if not model.active or (not model.running and self.timer_text is not None):
+            return
+        text = timer_sync.mmss(model.value_ms(time.monotonic_ns()))
+        if text == self.timer_text:
+            return
+        self.timer_text = text
+        self.render_gate.apply("segment", self.segment_display.set_value, text)
+        self.render_gate.apply("glass", self.glass_display.set_mode, "TIM", text)
 
+    def update_render_state(self):
+        self.render_gate.update(self)
 
-            # 데이터 파싱 예시: "LED:1,ON" 또는 "ADC:75"
-            parts = data.split(':')
-            if len(parts) == 2:
-                cmd_type = parts[0]
-                cmd_data = parts[1]
-
-                if cmd_type == "LED":
-                    led_parts = cmd_data.split(',')
-                    if len(led_parts) == 2:
-                        led_num = int(led_parts[0])-1
-                        led_state = led_parts[1].strip()
-
-                        if 0 <= led_num <= 4:  # LED 번호 유효성 확인
-                            if led_state == "ON":
-                                self.leds[led_num].setStyleSheet(
-                                    "background-color: red; border-radius: 25px; border: 2px solid black;")
-                                self.leds[led_num].is_on = True
-                            else:
-                                self.leds[led_num].setStyleSheet(
-                                    "background-color: gray; border-radius: 25px; border: 2px solid black;")
-                                self.leds[led_num].is_on = False
-                # 이거 밑에랑 합쳤음
-                elif cmd_type == "RGB":
-                    rgb_values = cmd_data.split(',')
-                    if len(rgb_values) == 3:
-                        r = int(rgb_values[0])
-                        g = int(rgb_values[1])
-                        b = int(rgb_values[2])
-                        self.rgb_led.set_color(r, g, b)
-
-                elif cmd_type == "RTC":
-                    self.glass_display.set_mode("RTC")
-
-
-                elif cmd_type == "SEG":
-                    self.glass_display.set_mode("TIM", cmd_data)
-                    self.segment_display.set_value(cmd_data)
-
-                elif cmd_type =="TIM":
-                    self.segment_display.set_value(cmd_data)
-                    self.glass_display.set_mode("TIM",cmd_data)
-
-                elif cmd_type == "ADC":
-                    try:
-                        value = int(cmd_data)
-                        self.adc_bar.set_value(value)
-                        self.glass_display.set_mode("ADC", cmd_data)
-
-                        # alertLED 함수의 동작을 시뮬레이션
-                        if value == 0:
-                            self.rgb_led.set_color(255, 0, 0)  # 빨간색 점멸
-                        elif value <= 20:
-                            self.rgb_led.set_color(255, 50, 0)  # 빨간색
-                        elif value <= 40:
-                            self.rgb_led.set_color(255, 100, 0)  # 주황색
-                        elif value <= 60:
-                            self.rgb_led.set_color(0, 255, 0)  # 녹색
-                        elif value <= 80:
-                            self.rgb_led.set_color(0, 255, 100)  # 청녹색
-                        elif value <= 95:
-                            self.rgb_led.set_color(0, 50, 255)  # 파란색
-                        else:
-                            self.rgb_led.set_color(0, 0, 255)  # 파란색 점멸
-                    except ValueError:
-                        print(f"유효하지 않은 ADC 값: {cmd_data}")
-
-        except Exception as e:
-            print(f"데이터 처리 오류: {e}")
-
-
-        self.status_label.setText("")
-        # self.status_label.setText(f"상태: 수신됨 - {data}")
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.link_started:
+            # 첫 프레임 뒤에 연결 (hub, session_store import도 이때)
+            self.link_started = True
+            QTimer.singleShot(0, self.board_link.start)
 
     def closeEvent(self, event):
-        # 앱 종료 시 시리얼 통신 스레드 종료
-        self.serial_thread.stop()
-        self.serial_thread.wait()
+        # 구독 해제 - 이 포트를 쓰는 마지막 패널이면 hub가 포트를 닫음
+        self.board_link.stop()
         event.accept()
 
 
+def create_window(port="COM13", baudrate=115200):
+    """MainWindow 생성 - 포트는 첫 프레임 이후에 열림"""
+    metrics.start_exporter()
+    stall_watchdog.WATCHDOG.attach(QTimer)
+    return MainWindow(port, baudrate)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = create_window()
 
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
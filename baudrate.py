@@ -0,0 +1,134 @@
+"""
+보드레이트 자동 협상
+
+115200으로 연결한 뒤 보드와 한 단계씩 올려가며(230400 -> 460800 -> 921600 -> 2M)
+테스트 패턴으로 확인하고, 깨지면 이전 속도로 되돌린다.
+포트 + 보드 ID 별로 마지막으로 안정적이었던 속도를 기억해서 다음엔 그 속도부터 시도.
+
+펌웨어 프로토콜
+    BAUD?<속도>     -> BAUD:OK,<속도>,<보드 ID>  (응답을 보낸 뒤 그 속도로 바꿈)
+                    -> BAUD:NO
+    PING:<패턴>     -> PONG:<패턴>
+    새 속도에서 1초 안에 올바른 PING을 못 받으면 보드는 원래 속도로 돌아가야 함
+
+TESTINGGUI_BAUD_NEGOTIATE=1 (런처 --negotiate-baud) 일 때 serial_port.open_port()에서 실행.
+"""
+import os
+import json
+import time
+import random
+
+import metrics
+
+RATES = (115200, 230400, 460800, 921600, 2000000)
+STORE_PATH = os.environ.get("TESTINGGUI_BAUD_STORE",
+                            os.path.join(os.path.expanduser("~"), ".testinggui_baud.json"))
+
+NEGOTIATED = metrics.REGISTRY.gauge("serial_baudrate", "협상된 보드레이트")
+FALLBACKS = metrics.REGISTRY.counter("baud_fallbacks_total", "검증 실패로 이전 속도로 되돌린 횟수")
+
+
+def load_store():
+    try:
+        with open(STORE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_rate(key, rate, failed=None):
+    store = load_store()
+    store[key] = {"rate": rate, "failed": failed, "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+    tmp_path = STORE_PATH + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(store, f, indent=2)
+        os.replace(tmp_path, STORE_PATH)
+    except OSError as e:
+        print(f"보드레이트 기록 실패: {e}")
+
+
+def read_reply(ser, prefixes, timeout):
+    """prefixes로 시작하는 줄이 올 때까지 읽기 (다른 줄은 무시)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        line = ser.readline().decode("utf-8", errors="replace").strip()
+        if line.startswith(prefixes):
+            return line
+    return None
+
+
+def verify(ser, rounds=3, timeout=0.5):
+    """테스트 패턴 왕복 - 0x55/0xAA 비슷한 비트 패턴 + 난수"""
+    for _ in range(rounds):
+        pattern = "U*U*" + "".join(random.choice("0123456789ABCDEF") for _ in range(32))
+        ser.write(f"PING:{pattern}\n".encode())
+        reply = read_reply(ser, ("PONG:",), timeout)
+        if reply != f"PONG:{pattern}":
+            return False
+    return True
+
+
+def request(ser, rate, timeout=0.5):
+    """보드에 속도 변경 요청 - 성공하면 보드 ID, 아니면 None"""
+    ser.write(f"BAUD?{rate}\n".encode())
+    reply = read_reply(ser, ("BAUD:",), timeout)
+    if not reply or not reply.startswith(f"BAUD:OK,{rate}"):
+        return None
+    parts = reply.split(",")
+    return parts[2] if len(parts) > 2 else "unknown"
+
+
+def step(ser, rate, previous):
+    """한 단계 올리기. 검증 실패하면 이전 속도로 돌아가고 False"""
+    if request(ser, rate) is None:
+        return False
+    time.sleep(0.02)  # 보드가 속도를 바꿀 시간
+    ser.baudrate = rate
+    ser.reset_input_buffer()
+    if verify(ser):
+        return True
+    FALLBACKS.inc()
+    print(f"[보드레이트] {rate} 검증 실패 - {previous}로 되돌림")
+    ser.baudrate = previous
+    time.sleep(1.1)  # 보드가 스스로 되돌아갈 때까지
+    ser.reset_input_buffer()
+    return False
+
+
+def negotiate(ser, port, max_rate=None, rates=RATES):
+    """가능한 가장 높은 속도로 올리고 그 속도를 돌려줌"""
+    max_rate = max_rate or int(os.environ.get("TESTINGGUI_MAX_BAUD", rates[-1]))
+    old_timeout = ser.timeout
+    ser.timeout = 0.05
+    current = ser.baudrate
+    try:
+        # 지금 속도 그대로 요청해서 보드 ID 확인 (협상을 모르는 펌웨어면 여기서 끝)
+        device_id = request(ser, current)
+        if device_id is None:
+            print(f"[보드레이트] {port}: 보드가 협상을 지원하지 않음 - {current} bps 유지")
+            return current
+        key = f"{port}|{device_id}"
+
+        # 이 포트 + 보드에서 전에 잘 됐던 속도가 있으면 바로 시도
+        # 전에 실패했던 속도는 다시 시도하지 않음 (보드가 바뀌면 ID가 달라서 새로 시도)
+        remembered = load_store().get(key) or {}
+        failed = remembered.get("failed")
+        if failed:
+            max_rate = min(max_rate, failed - 1)
+        if remembered and current < remembered["rate"] <= max_rate:
+            if step(ser, remembered["rate"], current):
+                current = remembered["rate"]
+        for rate in rates:
+            if rate <= current or rate > max_rate:
+                continue
+            if not step(ser, rate, current):
+                failed = rate
+                break
+            current = rate
+        save_rate(key, current, failed)
+    finally:
+        ser.timeout = old_timeout
+    NEGOTIATED.set(current)
+    print(f"[보드레이트] {port}: {current} bps")
+    return current
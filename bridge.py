@@ -0,0 +1,340 @@
+"""
+시리얼 포트 공유 브리지
+
+COM 포트는 한 프로세스만 열 수 있어서 testingGUI / another / another2 를 동시에 못 띄우고
+원격으로 볼 수도 없다. 브리지가 포트를 혼자 열고 받은 줄을 여러 클라이언트에 나눠줌.
+
+    python bridge.py --port COM13                       TCP 7010, WebSocket 7011 (127.0.0.1)
+    python bridge.py --port COM13 --host 0.0.0.0        다른 PC에서도 접속
+    python launcher.py another2 --port bridge://127.0.0.1:7010
+
+TCP        받은 줄을 그대로 한 줄씩 (\\r\\n). 보낸 줄 하나가 명령 하나 (telnet으로도 됨)
+WebSocket  이벤트 하나가 JSON 텍스트 프레임 하나
+           {"t": 수신 시각(epoch), "type": "ADC", "value": 75, "aux": 0, "aux2": 0,
+            "payload": "75", "line": "ADC:75"}, 보낸 텍스트 프레임 하나가 명령 하나
+
+- 줄마다 파싱/인코딩은 한 번만 하고 같은 bytes를 모든 클라이언트가 나눠 씀
+- 클라이언트마다 크기 제한 큐 (가득 차면 가장 오래된 것부터 버림) - 느린 클라이언트가
+  다른 클라이언트나 포트 읽기를 막지 않음
+- 명령은 클라이언트별 대기열에서 돌아가며 하나씩 포트에 씀 (한 클라이언트가 몰아 보내도
+  다른 클라이언트 명령이 밀리지 않음). 줄바꿈 없는 펌웨어에서 두 명령이 붙지 않게
+  명령 사이에 --gap-ms 만큼 쉼 (FRD: 같은 프로토콜 명령은 항상 줄바꿈으로 끝남 - serial_port.FRAMED_COMMANDS)
+"""
+import sys
+import json
+import time
+import base64
+import socket
+import asyncio
+import hashlib
+import argparse
+import threading
+from collections import deque
+
+import events
+import metrics
+import serial_port
+import transports
+
+CLIENTS = metrics.REGISTRY.gauge("bridge_clients", "브리지에 붙은 클라이언트 수")
+DROPPED = metrics.REGISTRY.counter("bridge_dropped_total", "클라이언트 큐가 가득 차서 버린 메시지 수")
+COMMANDS = metrics.REGISTRY.counter("bridge_commands_total", "클라이언트가 보낸 명령 수")
+REJECTED = metrics.REGISTRY.counter("bridge_commands_rejected_total", "대기열이 가득 차서 거절한 명령 수")
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def ws_frame(payload, opcode=0x1):
+    """서버 -> 클라이언트 WebSocket 프레임 (마스킹 없음)"""
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 65536:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, "big")
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, "big")
+    return header + payload
+
+
+async def ws_read_frame(reader):
+    """클라이언트 -> 서버 프레임 하나 (opcode, payload)"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return first & 0x0F, payload
+
+
+class Client:
+    """구독자 하나 - 크기 제한 송신 큐 (drop-oldest)"""
+
+    def __init__(self, name, writer, websocket, queue_size):
+        self.name = name
+        self.writer = writer
+        self.websocket = websocket
+        self.queue = deque(maxlen=queue_size)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.commands = deque()
+        self.task = None  # 연결 처리 코루틴 (브리지가 끝날 때 기다림)
+
+    def offer(self, tcp_data, ws_data):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            DROPPED.inc()
+        self.queue.append(ws_data if self.websocket else tcp_data)
+        self.ready.set()
+
+    async def send_loop(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            # 쌓인 것을 한 번에 써서 시스템 호출 횟수를 줄임
+            chunk = b"".join(self.queue)
+            self.queue.clear()
+            self.writer.write(chunk)
+            await self.writer.drain()
+
+
+class Bridge:
+    def __init__(self, ser, queue_size=4096, gap=0.02, newline=False, command_limit=64):
+        self.ser = ser
+        self.queue_size = queue_size
+        self.gap = gap
+        self.newline = newline
+        self.command_limit = command_limit
+        self.clients = []
+        self.loop = None
+        self.running = True
+        self.command_ready = None
+        self.port_lost = None  # 포트 읽기/쓰기 오류가 나면 set - serve()가 클라이언트를 닫고 끝남
+        self.turn = 0
+
+    # 포트 읽기 (스레드) -> 이벤트 루프
+    def read_loop(self):
+        batch = []
+        while self.running:
+            try:
+                raw = self.ser.readline()
+            except OSError as e:  # serial.SerialException도 OSError (USB 뽑힘 등)
+                if batch:
+                    self.loop.call_soon_threadsafe(self.publish, batch)
+                self.loop.call_soon_threadsafe(self.fail, "읽기", e)
+                return
+            if raw:
+                received = time.monotonic_ns()
+                line = raw.decode("utf-8", errors="ignore").strip()
+                if line:
+                    batch.append(events.parse_line(line, received))
+            # 더 읽을 게 없거나 충분히 모였으면 루프로 넘김 (줄마다 넘기면 루프 깨우기가 비쌈)
+            if batch and (len(batch) >= 256 or not self.ser.in_waiting):
+                self.loop.call_soon_threadsafe(self.publish, batch)
+                batch = []
+
+    def fail(self, what, error):
+        """루프에서 - 포트가 죽으면 클라이언트가 계속 붙어 있어도 받을 게 없으니 서버를 멈춤"""
+        if self.port_lost.is_set():
+            return
+        metrics.SERIAL_ERRORS.inc()
+        print(f"[브리지] 시리얼 {what} 오류: {error} - 종료")
+        self.port_lost.set()
+
+    def publish(self, batch):
+        # 인코딩은 메시지마다 한 번 - 모든 클라이언트가 같은 bytes를 씀
+        tcp_data = []
+        ws_data = []
+        for event in batch:
+            tcp_data.append((event.line + "\r\n").encode("utf-8"))
+            ws_data.append(ws_frame(json.dumps(
+                {"t": events.wall_time(event.t_ns), "type": event.name, "value": event.value, "aux": event.aux,
+                 "aux2": event.aux2, "payload": event.payload, "line": event.line},
+                ensure_ascii=False).encode("utf-8")))
+        for client in self.clients:
+            for tcp, ws in zip(tcp_data, ws_data):
+                client.offer(tcp, ws)
+
+    # 명령 중재
+    def submit(self, client, command):
+        command = command.strip()
+        if not command:
+            return
+        if len(client.commands) >= self.command_limit:
+            REJECTED.inc()
+            return
+        client.commands.append(command)
+        COMMANDS.inc()
+        self.command_ready.set()
+
+    def next_command(self):
+        """클라이언트를 돌아가며 하나씩 (round-robin)"""
+        count = len(self.clients)
+        for i in range(count):
+            client = self.clients[(self.turn + i) % count]
+            if client.commands:
+                self.turn = (self.turn + i + 1) % count
+                return client, client.commands.popleft()
+        return None, None
+
+    async def command_loop(self):
+        while True:
+            await self.command_ready.wait()
+            client, command = self.next_command()
+            if command is None:
+                self.command_ready.clear()
+                continue
+            # 프로토콜 명령(FRD: ...)은 펌웨어가 줄바꿈으로 구분하니 항상 붙임
+            newline = self.newline or command.startswith(serial_port.FRAMED_COMMANDS)
+            data = (command + ("\n" if newline else "")).encode("utf-8")
+            try:
+                await self.loop.run_in_executor(None, self.ser.write, data)
+            except OSError as e:
+                self.fail("쓰기", e)
+                return
+            metrics.COMMANDS_SENT.inc()
+            await asyncio.sleep(self.gap)
+
+    # 연결 처리
+    async def serve_client(self, client, receive):
+        client.task = asyncio.current_task()
+        self.clients.append(client)
+        CLIENTS.set(len(self.clients))
+        print(f"[브리지] 연결: {client.name} ({'WebSocket' if client.websocket else 'TCP'})")
+        sender = asyncio.ensure_future(client.send_loop())
+        try:
+            await receive()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            sender.cancel()
+            self.clients.remove(client)
+            CLIENTS.set(len(self.clients))
+            client.writer.close()
+            print(f"[브리지] 끊김: {client.name}, 버린 메시지 {client.dropped}")
+
+    async def handle_tcp(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = Client(str(writer.get_extra_info("peername")), writer, False, self.queue_size)
+
+        async def receive():
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                self.submit(client, line.decode("utf-8", errors="ignore"))
+
+        await self.serve_client(client, receive)
+
+    async def handle_websocket(self, reader, writer):
+        # HTTP Upgrade 핸드셰이크
+        key = None
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "sec-websocket-key":
+                key = value.strip()
+        if key is None:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+            writer.close()
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        client = Client(str(writer.get_extra_info("peername")), writer, True, self.queue_size)
+
+        async def receive():
+            while True:
+                opcode, payload = await ws_read_frame(reader)
+                if opcode == 0x8:  # close
+                    return
+                if opcode == 0x9:  # ping -> pong
+                    writer.write(ws_frame(payload, 0xA))
+                elif opcode == 0x1:
+                    self.submit(client, payload.decode("utf-8", errors="ignore"))
+
+        await self.serve_client(client, receive)
+
+    async def serve(self, host, tcp_port, ws_port):
+        self.loop = asyncio.get_running_loop()
+        self.command_ready = asyncio.Event()
+        self.port_lost = asyncio.Event()
+        reader = threading.Thread(target=self.read_loop, name="bridge-reader", daemon=True)
+        reader.start()
+        tcp = await asyncio.start_server(self.handle_tcp, host, tcp_port)
+        ws = await asyncio.start_server(self.handle_websocket, host, ws_port)
+        print(f"[브리지] TCP {host}:{tcp_port}, WebSocket ws://{host}:{ws_port}/")
+        commands = asyncio.ensure_future(self.command_loop())
+        servers = asyncio.gather(tcp.serve_forever(), ws.serve_forever())
+        lost = asyncio.ensure_future(self.port_lost.wait())
+        try:
+            await asyncio.wait([servers, lost], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            commands.cancel()
+            servers.cancel()
+            lost.cancel()
+            self.running = False
+            tcp.close()
+            ws.close()
+            clients = list(self.clients)
+            for client in clients:
+                client.writer.close()  # receive()가 EOF를 받고 serve_client가 정리
+            await asyncio.gather(commands, servers, lost, *(client.task for client in clients),
+                                 return_exceptions=True)
+        return not self.port_lost.is_set()
+
+
+class BridgeClient(transports.SocketPort):
+    """bridge://host:port - 브리지에 TCP로 붙어서 시리얼 포트처럼 쓰기 (serial_port.open_port)"""
+
+    @classmethod
+    def from_url(cls, url, timeout=1, **kwargs):
+        host, _, port = url[len("bridge://"):].strip("/").rpartition(":")
+        client = cls(host or "127.0.0.1", int(port or 7010), timeout=timeout, **kwargs)
+        client.port = url
+        return client
+
+    def write(self, data):
+        # 명령 하나 = 한 줄 (줄바꿈은 브리지가 펌웨어에 맞춰 붙임)
+        super().write(bytes(data).rstrip(b"\r\n") + b"\n")
+        return len(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시리얼 포트 하나를 여러 클라이언트(TCP/WebSocket)에 공유")
+    parser.add_argument("--port", default="COM13")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 이면 다른 PC에서도 접속 가능")
+    parser.add_argument("--tcp-port", type=int, default=7010)
+    parser.add_argument("--ws-port", type=int, default=7011)
+    parser.add_argument("--queue", type=int, default=4096, help="클라이언트별 송신 큐 크기 (넘치면 오래된 것부터 버림)")
+    parser.add_argument("--gap-ms", type=float, default=20, help="명령 사이 간격")
+    parser.add_argument("--newline", action="store_true", help="명령 끝에 \\n 붙이기 (another 펌웨어)")
+    parser.add_argument("--metrics-file", help="Prometheus textfile 경로")
+    args = parser.parse_args(argv)
+
+    metrics.start_exporter(args.metrics_file)
+    ser = serial_port.open_port(args.port, args.baud, timeout=0.05)
+    bridge = Bridge(ser, queue_size=args.queue, gap=args.gap_ms / 1000, newline=args.newline)
+    ok = True
+    try:
+        ok = asyncio.run(bridge.serve(args.host, args.tcp_port, args.ws_port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bridge.running = False
+        ser.close()
+        print(f"[브리지] 종료 - 보낸 명령 {int(COMMANDS.value)}, 버린 메시지 {int(DROPPED.value)}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
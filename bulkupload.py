@@ -0,0 +1,203 @@
+"""
+보드로 대량 데이터 올리기 (보정 테이블, 디스플레이 에셋 등)
+
+짧은 제어 명령과 같은 선으로 나가지만, 리더 루프가 한 번 돌 때 패킷을 조금씩만
+내보내므로 BTN/RGB/SEG 같은 명령이 뒤로 밀리지 않는다.
+
+펌웨어 프로토콜 (호스트가 보내는 패킷은 모두 "\n"으로 끝남 - 사이에 끼는 제어 명령과 구분)
+    UBEG:<이름>,<전체 길이>,<crc32 hex>     -> UOK:BEG
+    UPK:<순번>,<base64 데이터>,<crc32 hex>   -> UACK:<순번> / UNAK:<순번>
+    UEND:<패킷 수>                          -> UOK:END / UERR:<이유>
+
+ACK 창(window) 크기만큼 확인 안 된 패킷을 띄워두고, NAK나 시간 초과가 난 패킷만 다시 보냄.
+
+    python bulkupload.py --port COM13 calib.bin
+"""
+import os
+import sys
+import time
+import zlib
+import base64
+import argparse
+
+import metrics
+
+BYTES_UPLOADED = metrics.REGISTRY.counter("bulk_upload_bytes_total", "보드가 ACK한 업로드 바이트 수")
+PACKET_RETRIES = metrics.REGISTRY.counter("bulk_upload_retransmits_total", "다시 보낸 업로드 패킷 수")
+PACKET_ERRORS = metrics.REGISTRY.counter("bulk_upload_bad_replies_total", "순번을 읽을 수 없는 UACK/UNAK 줄 (잘린 줄)")
+
+
+def encode_packet(seq, data):
+    return f"UPK:{seq},{base64.b64encode(data).decode()},{zlib.crc32(data):08X}"
+
+
+def decode_packet(line):
+    """보드 쪽 패킷 해석 (가상 보드/테스트용). 깨졌으면 (순번, None)"""
+    seq_text, payload, crc_text = line[4:].split(",")
+    data = base64.b64decode(payload)
+    return int(seq_text), (data if zlib.crc32(data) == int(crc_text, 16) else None)
+
+
+class BulkUploader:
+    def __init__(self, send, data, name="upload.bin", packet=192, window=8, timeout=1.0,
+                 burst=4, max_retries=8):
+        self.send = send
+        self.data = data
+        self.name = name
+        self.packet = packet
+        self.window = window
+        self.timeout = timeout
+        self.burst = burst  # 루프 한 번에 보낼 최대 패킷 수 (제어 명령 끼어들 틈)
+        self.max_retries = max_retries
+        self.count = (len(data) + packet - 1) // packet
+        self.state = "idle"  # idle -> begin -> sending -> ending -> done / failed
+        self.next_seq = 0
+        self.unacked = {}  # 순번 -> (보낸 시각, 재시도 횟수)
+        self.resend = []  # NAK 받은 순번
+        self.acked = 0
+        self.acked_bytes = 0
+        self.control_sent = 0.0
+        self.started = None
+        self.error = None
+
+    def chunk(self, seq):
+        return self.data[seq * self.packet:(seq + 1) * self.packet]
+
+    def transmit(self, seq, now, retries):
+        self.unacked[seq] = (now, retries)
+        self.send(encode_packet(seq, self.chunk(seq)) + "\n")
+
+    def pump(self, now=None):
+        """리더 루프에서 호출"""
+        now = time.monotonic() if now is None else now
+        if self.state == "idle":
+            self.started = now
+            self.state = "begin"
+            self.control_sent = now
+            self.send(f"UBEG:{self.name},{len(self.data)},{zlib.crc32(self.data):08X}\n")
+            return
+        if self.state in ("begin", "ending"):
+            if now - self.control_sent > self.timeout * 3:
+                self.fail("보드 응답 없음")
+            return
+        if self.state != "sending":
+            return
+
+        sent = 0
+        # NAK/시간 초과 패킷 먼저 (선택적 재전송)
+        for seq, (sent_at, retries) in list(self.unacked.items()):
+            if now - sent_at > self.timeout and seq not in self.resend:
+                self.resend.append(seq)
+        while self.resend and sent < self.burst:
+            seq = self.resend.pop(0)
+            if seq not in self.unacked:
+                continue
+            retries = self.unacked[seq][1] + 1
+            if retries > self.max_retries:
+                self.fail(f"패킷 {seq} 재전송 한도 초과")
+                return
+            PACKET_RETRIES.inc()
+            self.transmit(seq, now, retries)
+            sent += 1
+        while sent < self.burst and len(self.unacked) < self.window and self.next_seq < self.count:
+            self.transmit(self.next_seq, now, 0)
+            self.next_seq += 1
+            sent += 1
+        if self.next_seq >= self.count and not self.unacked:
+            self.state = "ending"
+            self.control_sent = now
+            self.send(f"UEND:{self.count}\n")
+
+    def handle_line(self, line):
+        """업로드 응답이면 처리하고 True"""
+        if line.startswith(("UACK:", "UNAK:")):
+            try:
+                seq = int(line[5:])
+            except ValueError:
+                # 잘린 응답 - 그 패킷은 시간 초과로 다시 보냄
+                PACKET_ERRORS.inc()
+                return True
+            if line.startswith("UNAK:"):
+                if seq in self.unacked and seq not in self.resend:
+                    self.resend.append(seq)
+            elif self.unacked.pop(seq, None) is not None:
+                size = len(self.chunk(seq))
+                self.acked += 1
+                self.acked_bytes += size
+                BYTES_UPLOADED.inc(size)
+            return True
+        if line == "UOK:BEG":
+            self.state = "sending" if self.count else "ending"
+            if not self.count:
+                self.send("UEND:0\n")
+            return True
+        if line.startswith("UOK:END"):
+            self.state = "done"
+            print(f"[업로드] 완료: {self.name} {len(self.data)} bytes")
+            return True
+        if line.startswith("UERR:"):
+            self.fail(line[5:])
+            return True
+        return False
+
+    def fail(self, reason):
+        self.state = "failed"
+        self.error = reason
+        print(f"[업로드] 실패: {reason}")
+
+    @property
+    def finished(self):
+        return self.state in ("done", "failed")
+
+    def throughput(self):
+        elapsed = time.monotonic() - self.started if self.started else 0
+        return self.acked_bytes / elapsed if elapsed > 0 else 0.0
+
+    def status_text(self):
+        total = len(self.data)
+        if self.state == "failed":
+            return f"업로드 실패: {self.error}"
+        if self.state == "done":
+            return f"업로드 완료: {self.name} ({total >> 10} KB)"
+        rate = self.throughput()
+        eta = (total - self.acked_bytes) / rate if rate > 0 else 0
+        percent = self.acked_bytes / total * 100 if total else 100.0
+        return (f"업로드: {percent:.1f}% {self.acked_bytes >> 10}/{total >> 10} KB "
+                f"{rate / 1024:.1f} KB/s 남은 시간 {int(eta) // 60}:{int(eta) % 60:02d}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="보드로 파일 올리기")
+    parser.add_argument("file")
+    parser.add_argument("--port", default="COM13")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--name", help="보드에 저장할 이름 (기본: 파일 이름)")
+    parser.add_argument("--packet", type=int, default=192)
+    parser.add_argument("--window", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    with open(args.file, "rb") as f:
+        data = f.read()
+    import serial_port
+    ser = serial_port.open_port(args.port, args.baud, timeout=0.05)
+    uploader = BulkUploader(lambda command: ser.write(command.encode()), data,
+                            name=args.name or os.path.basename(args.file),
+                            packet=args.packet, window=args.window)
+    last_print = 0.0
+    try:
+        while not uploader.finished:
+            uploader.pump()
+            line = ser.readline().decode("utf-8", errors="ignore").strip()
+            if line:
+                uploader.handle_line(line)
+            if time.monotonic() - last_print > 1.0:
+                last_print = time.monotonic()
+                print(uploader.status_text())
+    finally:
+        ser.close()
+    print(uploader.status_text())
+    return 0 if uploader.state == "done" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+보드 RTC 시계 동기화
+
+매 루프마다 현재 시각을 밀어넣는 대신, 보드가 보내는 RTC/TIME 응답으로
+보드 시계의 오차(offset)와 흐름 차이(drift)를 추정하고 오차가 허용치를 넘을 때만
+보정 명령을 보낸다.
+
+- 질의 명령을 보낸 뒤 받은 응답은 왕복 시간(RTT)의 절반으로 보정해서 표본으로 씀
+- 보드가 알아서 보내는 RTC 줄(RTC 모드)은 수신 시각 그대로 표본으로 씀
+- 응답 해상도(초/분)는 구간 중앙값으로 보정
+- drift는 최근 표본에 대한 최소제곱 기울기 (ppm)
+
+Qt와 무관 - 리더 스레드에서 tick()/handle_line()을 부르면 됨.
+"""
+import re
+import time
+from datetime import datetime, timedelta
+from collections import deque
+
+import metrics
+
+
+class TimeFormat:
+    """보드 시계 응답/보정 명령 형식"""
+
+    def __init__(self, reply_pattern, period, resolution, correction_format):
+        self.reply = re.compile(reply_pattern)
+        self.period = period  # 응답이 한 바퀴 도는 길이 (초)
+        self.resolution = resolution  # 응답 해상도 (초)
+        self.correction_format = correction_format
+
+    def board_seconds(self, line):
+        """응답 줄에서 주기 안의 초 (없으면 None)"""
+        match = self.reply.match(line)
+        if not match:
+            return None
+        a, b = int(match.group(1)), int(match.group(2))
+        if self.period == 3600:  # MMSS
+            return a * 60 + b
+        return a * 3600 + b * 60  # HH:MM
+
+    def host_seconds(self, wall):
+        if self.period == 3600:
+            return wall.minute * 60 + wall.second + wall.microsecond / 1e6
+        return wall.hour * 3600 + wall.minute * 60 + wall.second + wall.microsecond / 1e6
+
+
+# another2 펌웨어: "RTC:MMSS" 응답, "%M%S" 로 설정
+MMSS = TimeFormat(r"RTC:(\d{2})(\d{2})$", 3600, 1.0, "%M%S")
+# testingGUI 펌웨어: "TIME:HH:MM" 응답, "T%H:%M" 로 설정
+HHMM = TimeFormat(r"TIME:(\d{1,2}):(\d{2})$", 86400, 60.0, "T%H:%M")
+
+
+class ClockSync:
+    def __init__(self, send, time_format, query_command, tolerance=None,
+                 poll_interval=30.0, max_poll_interval=600.0, samples=16):
+        self.send = send
+        self.format = time_format
+        self.query_command = query_command
+        # 해상도보다 작은 허용치는 의미가 없음
+        self.tolerance = tolerance if tolerance is not None else 2 * time_format.resolution
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.samples = deque(maxlen=samples)  # (monotonic, offset, rtt)
+        self.query_sent = None  # (monotonic, wall)
+        self.next_poll = 0.0
+        self.force = False  # GUI 스레드에서 보정 요청 (다음 tick에서 처리)
+        self.last_correction = None
+        self.corrections = 0
+        self.offset = None
+        self.drift = 0.0  # 초/초
+        self.rtt = None
+        self.offset_gauge = metrics.REGISTRY.gauge("clock_offset_seconds", "보드 시계 - 호스트 시계")
+        self.drift_gauge = metrics.REGISTRY.gauge("clock_drift_ppm", "보드 시계 흐름 차이 (ppm)")
+        self.rtt_gauge = metrics.REGISTRY.gauge("clock_query_rtt_seconds", "시각 질의 왕복 시간")
+        self.correction_counter = metrics.REGISTRY.counter("clock_corrections_total", "보낸 시각 보정 명령 수")
+
+    def wrap(self, seconds):
+        """주기 안에서 -period/2 ~ period/2 로"""
+        half = self.format.period / 2
+        return (seconds + half) % self.format.period - half
+
+    def tick(self, now=None):
+        """리더 루프에서 주기적으로 호출 - 필요할 때만 질의/보정 명령 전송"""
+        now = time.monotonic() if now is None else now
+        if self.query_sent is not None and now - self.query_sent[0] > 5.0:
+            self.query_sent = None  # 응답 없음
+        if self.force:
+            self.force = False
+            self.correct(now)
+            return
+        if now < self.next_poll or self.query_sent is not None:
+            return
+        predicted = self.predicted_offset(now)
+        if predicted is not None and abs(predicted) > self.tolerance:
+            self.correct(now)
+            return
+        self.query_sent = (now, datetime.now())
+        self.send(self.query_command)
+        self.next_poll = now + self.current_poll_interval()
+
+    def current_poll_interval(self):
+        """drift가 작을수록 드물게 질의 (허용치의 절반을 쓰는 데 걸리는 시간 기준)"""
+        if len(self.samples) < 3 or self.drift == 0:
+            return self.poll_interval
+        return max(self.poll_interval, min(self.max_poll_interval, self.tolerance / 2 / abs(self.drift)))
+
+    def handle_line(self, line, received=None, received_wall=None):
+        """보드 응답 처리. 시각 응답이면 True"""
+        board = self.format.board_seconds(line)
+        if board is None:
+            return False
+        received = time.monotonic() if received is None else received
+        received_wall = datetime.now() if received_wall is None else received_wall
+        # 응답은 해상도 단위로 잘려 있으므로 구간 중앙으로
+        board += self.format.resolution / 2
+
+        rtt = None
+        if self.query_sent is not None:
+            sent, sent_wall = self.query_sent
+            self.query_sent = None
+            rtt = received - sent
+            host_wall = sent_wall + timedelta(seconds=rtt / 2)
+            at = sent + rtt / 2
+        else:
+            host_wall = received_wall
+            at = received
+        offset = self.wrap(board - self.format.host_seconds(host_wall))
+        self.samples.append((at, offset, rtt))
+        self.update_estimate()
+        if abs(self.offset) > self.tolerance:
+            self.correct(received)
+        return True
+
+    def update_estimate(self):
+        # RTT가 큰 표본은 믿기 어려우니 가장 좋은 절반만 사용
+        samples = sorted(self.samples, key=lambda s: s[2] if s[2] is not None else 0.0)
+        samples = sorted(samples[:max(1, (len(samples) + 1) // 2)])
+        self.offset = samples[-1][1]
+        # 해상도 때문에 생기는 양자화 오차가 기울기를 흔들지 않을 만큼 표본이 퍼져 있어야 함
+        if len(samples) >= 3 and samples[-1][0] - samples[0][0] > 30 * self.format.resolution:
+            n = len(samples)
+            mean_t = sum(s[0] for s in samples) / n
+            mean_o = sum(s[1] for s in samples) / n
+            var = sum((s[0] - mean_t) ** 2 for s in samples)
+            if var > 0:
+                self.drift = sum((s[0] - mean_t) * (s[1] - mean_o) for s in samples) / var
+                self.offset = mean_o + self.drift * (samples[-1][0] - mean_t)
+        rtts = [s[2] for s in self.samples if s[2] is not None]
+        self.rtt = min(rtts) if rtts else self.rtt
+        self.offset_gauge.set(round(self.offset, 3))
+        self.drift_gauge.set(round(self.drift * 1e6, 1))
+        if self.rtt is not None:
+            self.rtt_gauge.set(round(self.rtt, 4))
+
+    def predicted_offset(self, now):
+        if not self.samples:
+            return None
+        return self.offset + self.drift * (now - self.samples[-1][0])
+
+    def correct(self, now=None):
+        """호스트 시각으로 보드 시계 설정 (명령이 도착하는 시간만큼 앞당겨 보냄)"""
+        now = time.monotonic() if now is None else now
+        one_way = self.rtt / 2 if self.rtt is not None else 0.0
+        # 명령은 해상도 단위로 잘리므로 반올림이 되게 해상도 절반을 더함
+        target = datetime.now() + timedelta(seconds=one_way + self.format.resolution / 2)
+        command = target.strftime(self.format.correction_format)
+        self.send(command)
+        offset = f"{self.offset:+.1f}s" if self.offset is not None else "-"
+        print(f"[시계 보정] offset {offset} -> {command}")
+        self.corrections += 1
+        self.correction_counter.inc()
+        self.last_correction = now
+        # 보정 후에는 이전 표본이 의미 없음 (drift 추정은 유지)
+        self.samples.clear()
+        self.offset = None
+        self.next_poll = now + self.poll_interval
+
+    def request_correction(self):
+        """다른 스레드에서 즉시 보정 요청"""
+        self.force = True
+
+    def status_text(self):
+        # GUI 스레드에서 - 연결 스레드가 도중에 None으로 바꿀 수 있으니 한 번만 읽음
+        offset, rtt = self.offset, self.rtt
+        if offset is None:
+            return "시계 동기: 보정 후 확인 중" if self.corrections else "시계 동기: 대기 중"
+        rtt = f"{rtt * 1000:.0f}ms" if rtt is not None else "-"
+        state = "양호" if abs(offset) <= self.tolerance else "보정 필요"
+        return (f"시계 동기: {state} | 오차 {offset:+.1f}s | drift {self.drift * 1e6:+.0f}ppm "
+                f"| RTT {rtt} | 보정 {self.corrections}회")
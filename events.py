@@ -0,0 +1,154 @@
+"""
+수신 줄 -> 이벤트 레코드
+
+리더 스레드에서 한 번만 파싱하고 GUI에는 이미 해석된 Event를 넘긴다
+(GUI 스레드에서 split/정규식으로 다시 파싱하지 않도록).
+
+    Event.t_ns     수신 시각 (time.monotonic_ns, readline이 돌아온 직후 - 정수 ns)
+    Event.kind     종류 번호 (ADC, LED, ...) - KIND_NAMES[kind] 가 이름
+    Event.value    주 값 (ADC 값, LED 번호, R, PROG 값, 숫자로 된 TIM/SEG 값)
+    Event.aux      보조 값 (LED 켜짐 1/꺼짐 0, G, 타이머 기준점 종류 TIM_START/STOP/SYNC)
+    Event.aux2     보조 값 (B)
+    Event.payload  ':' 뒤 문자열 ("0012", "12:34" 등 표시용)
+    Event.line     원래 줄 (로그용)
+
+저장/분석용으로 여러 개를 모으면 to_array()로 NumPy structured array로 바꿀 수 있음
+(numpy는 그때 불러옴).
+
+벽시계 시각은 시작할 때 잡은 (time_ns, monotonic_ns) 기준점으로 환산 (wall_time).
+monotonic은 시스템 전체 시계라 리더 프로세스(shm_reader)에서 찍은 값도 그대로 쓸 수 있음.
+"""
+import time
+from datetime import datetime
+
+import metrics
+
+OTHER, ADC, LED, LED_N, RGB, SEG, TIM, TIMER, TIME, RTC, PROG, FLASH_ID = range(12)
+# LED  : "LED:1,ON" (another/another2 펌웨어)
+# LED_N: "LED1:ON"  (testingGUI 펌웨어)
+# 타이머 동기 모드 기준점 "TIM:SYNC,61234" -> aux = TIM_SYNC, value = ms (timer_sync.py)
+TIM_START, TIM_STOP, TIM_SYNC = 1, 2, 3
+TIM_ANCHORS = {"START": TIM_START, "STOP": TIM_STOP, "SYNC": TIM_SYNC}
+KIND_NAMES = ("other", "ADC", "LED", "LED", "RGB", "SEG", "TIM", "TIMER", "TIME", "RTC", "PROG", "0x90")
+_KINDS = {"ADC": ADC, "LED": LED, "RGB": RGB, "SEG": SEG, "TIM": TIM, "TIMER": TIMER,
+          "TIME": TIME, "RTC": RTC, "PROG": PROG}
+
+# NumPy structured array 형식 (payload/line은 넣지 않음)
+DTYPE_FIELDS = [("t_ns", "i8"), ("kind", "u1"), ("value", "i4"), ("aux", "i4"), ("aux2", "i4")]
+
+
+def _anchor():
+    """time_ns와 monotonic_ns를 같은 순간으로 묶기 - 여러 번 재서 가장 짧게 끼인 것"""
+    best = None
+    for _ in range(5):
+        before = time.monotonic_ns()
+        wall = time.time_ns()
+        after = time.monotonic_ns()
+        if best is None or after - before < best[0]:
+            best = (after - before, wall, (before + after) // 2)
+    return best[1], best[2]
+
+
+WALL_ANCHOR_NS, MONO_ANCHOR_NS = _anchor()
+
+
+def wall_time(t_ns):
+    """monotonic_ns -> 벽시계 (epoch 초)"""
+    return (WALL_ANCHOR_NS + (t_ns - MONO_ANCHOR_NS)) / 1e9
+
+
+def format_time(t_ns):
+    """로그 표시용 HH:MM:SS.mmm"""
+    return datetime.fromtimestamp(wall_time(t_ns)).strftime("%H:%M:%S.%f")[:-3]
+
+
+class Event:
+    __slots__ = ("t_ns", "kind", "value", "aux", "aux2", "payload", "line")
+
+    def __init__(self, t_ns, kind, value=0, aux=0, aux2=0, payload="", line=""):
+        self.t_ns = t_ns
+        self.kind = kind
+        self.value = value
+        self.aux = aux
+        self.aux2 = aux2
+        self.payload = payload
+        self.line = line
+
+    @property
+    def name(self):
+        return KIND_NAMES[self.kind]
+
+    def __repr__(self):
+        return f"Event({self.name}, {self.value}, {self.aux}, {self.aux2}, {self.payload!r})"
+
+    def __str__(self):
+        return self.line
+
+
+def _leading_int(text):
+    digits = ""
+    for ch in text:
+        if not ch.isdigit():
+            break
+        digits += ch
+    return int(digits) if digits else None
+
+
+def parse_line(line, t_ns):
+    """한 줄을 Event로. 알려진 종류인데 값이 깨졌으면 OTHER로 두고 PARSE_FAILURES 증가"""
+    if line.startswith("0x90 ID"):
+        metrics.lines_by_type("0x90").inc()
+        return Event(t_ns, FLASH_ID, payload=line, line=line)
+
+    head, _, payload = line.partition(":")
+    head = head.strip()
+    kind = _KINDS.get(head)
+    if kind is None:
+        if head.startswith("ADC"):  # "ADC 75", "ADC75"
+            kind, payload = ADC, line[3:].lstrip(" :")
+        elif head.startswith("LED") and head[3:].isdigit():
+            kind = LED_N
+        else:
+            metrics.lines_by_type(head).inc()
+            return Event(t_ns, OTHER, payload=payload, line=line)
+    event = Event(t_ns, kind, payload=payload, line=line)
+
+    try:
+        if kind == ADC:
+            value = _leading_int(payload.strip())
+            if value is None:
+                raise ValueError(payload)
+            event.value = value
+        elif kind == LED:
+            number, state = payload.split(",")
+            event.value = int(number)
+            event.aux = 1 if state.strip() == "ON" else 0
+        elif kind == LED_N:
+            if payload not in ("ON", "OFF"):
+                raise ValueError(payload)
+            event.value = int(head[3:])
+            event.aux = 1 if payload == "ON" else 0
+        elif kind == RGB:
+            event.value, event.aux, event.aux2 = (int(v) for v in payload.split(","))
+        elif kind == PROG:
+            event.value = int(payload)
+        elif kind in (TIM, TIMER) and "," in payload:
+            anchor, ms = payload.split(",")
+            event.value, event.aux = int(ms), TIM_ANCHORS[anchor]
+        elif payload.isdigit():  # TIM/SEG/RTC 숫자 값
+            event.value = int(payload)
+    except (ValueError, KeyError):
+        metrics.PARSE_FAILURES.inc()
+        event.kind = OTHER
+        return event
+    metrics.lines_by_type(KIND_NAMES[kind]).inc()
+    return event
+
+
+def to_array(events):
+    """Event 목록 -> NumPy structured array (DTYPE_FIELDS)"""
+    import numpy as np
+    array = np.empty(len(events), dtype=DTYPE_FIELDS)
+    for i, e in enumerate(events):
+        array[i] = (e.t_ns, e.kind, e.value, e.aux, e.aux2)
+    return array
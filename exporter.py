@@ -0,0 +1,222 @@
+"""
+세션 기록(session_store SQLite) -> CSV / Parquet 내보내기 (pandas 분석용)
+
+세션 전체를 메모리에 올리지 않고 커서에서 row_group개씩 읽어서 바로 써 나간다.
+(session, t) / (session, type, t) 인덱스 순서로 읽으니 정렬용 임시 테이블도 없음
+-> 몇 GB짜리 세션도 메모리는 일정하고, 속도는 SQLite에서 줄을 꺼내는 속도 정도.
+
+    python exporter.py runs.db out.csv --session 12
+    python exporter.py runs.db out.parquet --session 12 --type ADC --type TIM
+    python exporter.py runs.db out.parquet --split            종류별 파일: out_ADC.parquet, out_TIM.parquet ...
+    python exporter.py runs.db out.csv --since "2026-10-18 20:00" --until "2026-10-19"
+
+형식은 확장자로 (.csv / .parquet), --format으로 바꿀 수 있음.
+Parquet은 pyarrow가 있어야 함 (pip install pyarrow) - CSV만 쓰면 없어도 됨.
+Parquet 한 row group = --row-group줄 (기본 65536), t는 UTC timestamp(us)라 pandas에서 바로 datetime.
+
+    import pandas as pd
+    df = pd.read_parquet("out_ADC.parquet")
+"""
+import os
+import sys
+import csv
+import time
+import heapq
+import argparse
+import itertools
+
+import session_store
+
+COLUMNS = ("t", "session", "type", "value", "aux", "aux2", "payload")
+ROW_GROUP = 65536
+FORMATS = ("csv", "parquet")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet 내보내기에는 pyarrow가 필요함 (pip install pyarrow)") from None
+    return pyarrow, pyarrow.parquet
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w", newline="", encoding="utf-8", buffering=1 << 20)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """write() 한 번 = row group 하나"""
+
+    def __init__(self, path, compression="zstd"):
+        pa, pq = _pyarrow()
+        self.pa = pa
+        self.path = path
+        self.schema = pa.schema([
+            ("t", pa.timestamp("us", tz="UTC")),
+            ("session", pa.int64()),
+            ("type", pa.string()),
+            ("value", pa.int32()),
+            ("aux", pa.int32()),
+            ("aux2", pa.int32()),
+            ("payload", pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        columns[0] = [round(t * 1e6) for t in columns[0]]  # epoch 초 -> us
+        arrays = [self.pa.array(column, type=field.type) for column, field in zip(columns, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def open_sink(path, fmt, compression="zstd"):
+    if fmt == "parquet":
+        return ParquetSink(path, compression)
+    return CsvSink(path)
+
+
+def split_path(path, msg_type):
+    """out.parquet -> out_ADC.parquet"""
+    base, ext = os.path.splitext(path)
+    return f"{base}_{msg_type}{ext}"
+
+
+def _where(session, msg_type, since, until):
+    where, args = [], []
+    for clause, value in (("session = ?", session), ("type = ?", msg_type), ("t >= ?", since), ("t < ?", until)):
+        if value is not None:
+            where.append(clause)
+            args.append(value)
+    return (" WHERE " + " AND ".join(where) if where else ""), args
+
+
+def select(db, session=None, msg_type=None, since=None, until=None):
+    """조건에 맞는 이벤트 커서 - 인덱스 순서대로라 정렬용 임시 테이블 없이 흘려 읽음
+
+    종류 없이: (session, t) 인덱스, 세션 -> 시각 순
+    종류 하나: (session, type, t) / (type, t) 인덱스, 시각 순"""
+    where, args = _where(session, msg_type, since, until)
+    order = " ORDER BY t, rowid" if msg_type is not None else " ORDER BY session, t, rowid"
+    return db.execute("SELECT t, session, type, value, aux, aux2, payload FROM events" + where + order, args)
+
+
+def present_types(db, session=None):
+    """기록에 있는 종류 - 인덱스에서 다음 종류로 건너뛰며 찾음 (전체를 훑지 않음)"""
+    types = []
+    where = "session = ? AND type > ?" if session is not None else "type > ?"
+    last = ""
+    while True:
+        args = (session, last) if session is not None else (last,)
+        last = db.execute(f"SELECT MIN(type) FROM events WHERE {where}", args).fetchone()[0]
+        if last is None:
+            return types
+        types.append(last)
+
+
+def stream(cursor, row_group):
+    while True:
+        rows = cursor.fetchmany(row_group)
+        if not rows:
+            break
+        yield rows
+    cursor.close()
+
+
+def merged(cursors, row_group):
+    """종류별 커서 여러 개를 시각 순으로 합쳐서 row_group줄씩
+    (type IN (...) 한 쿼리로 읽으면 SQLite가 결과 전체를 임시 B-tree로 정렬함)"""
+    rows = heapq.merge(*(itertools.chain.from_iterable(stream(c, row_group)) for c in cursors),
+                       key=lambda row: row[0])
+    while True:
+        chunk = list(itertools.islice(rows, row_group))
+        if not chunk:
+            break
+        yield chunk
+
+
+def _write_all(path, fmt, compression, chunks):
+    sink = open_sink(path, fmt, compression)
+    count = 0
+    try:
+        for rows in chunks:
+            sink.write(rows)
+            count += len(rows)
+    finally:
+        sink.close()
+    return count
+
+
+def export(db, path, fmt="csv", session=None, types=None, since=None, until=None, split=False,
+           row_group=ROW_GROUP, compression="zstd"):
+    """내보내기 -> {파일 경로: 줄 수}
+
+    어느 경우든 메모리에는 row_group줄 (종류 여러 개를 합칠 때는 커서마다 한 묶음) 만 있음."""
+    if fmt == "parquet":
+        _pyarrow()  # 파일을 만들기 전에 없으면 바로 실패
+    if split:
+        counts = {}
+        for msg_type in types or present_types(db, session):
+            out = split_path(path, msg_type)
+            counts[out] = _write_all(out, fmt, compression,
+                                     stream(select(db, session, msg_type, since, until), row_group))
+        return counts
+    if not types:
+        chunks = stream(select(db, session, None, since, until), row_group)
+    elif len(types) == 1:
+        chunks = stream(select(db, session, types[0], since, until), row_group)
+    else:
+        chunks = merged([select(db, session, msg_type, since, until) for msg_type in types], row_group)
+    return {path: _write_all(path, fmt, compression, chunks)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="세션 기록을 CSV / Parquet으로 내보내기")
+    parser.add_argument("db")
+    parser.add_argument("out", help="출력 파일 (--split이면 종류 이름을 붙인 파일 여러 개)")
+    parser.add_argument("--format", choices=FORMATS, help="없으면 출력 파일 확장자로")
+    parser.add_argument("--session", type=int)
+    parser.add_argument("--type", action="append", dest="types", help="메시지 종류 (여러 번 가능)")
+    parser.add_argument("--since", type=session_store.parse_time)
+    parser.add_argument("--until", type=session_store.parse_time)
+    parser.add_argument("--split", action="store_true", help="종류별로 파일 나누기")
+    parser.add_argument("--row-group", type=int, default=ROW_GROUP, help="한 번에 읽고 쓰는 줄 수")
+    parser.add_argument("--compression", default="zstd", help="Parquet 압축 (zstd, snappy, none ...)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.out.lower().endswith(".parquet") else "csv")
+    db = session_store.connect(args.db)
+    started = time.monotonic()
+    try:
+        counts = export(db, args.out, fmt, args.session, args.types, args.since, args.until, args.split,
+                        args.row_group, args.compression)
+    except ImportError as e:
+        print(e)
+        return 1
+    finally:
+        db.close()
+    elapsed = time.monotonic() - started
+    total = sum(counts.values())
+    size = sum(os.path.getsize(p) for p in counts)
+    for p, count in sorted(counts.items()):
+        print(f"{p}  {count}줄  {os.path.getsize(p) / 1e6:.1f} MB")
+    print(f"{total}줄, {size / 1e6:.1f} MB, {elapsed:.1f}초 ({total / max(elapsed, 1e-9):.0f}줄/s, "
+          f"{size / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+외부 Flash 전체 읽기 (덤프)
+
+한 줄씩 왕복하지 않고 여러 청크 요청을 동시에 걸어두는(sliding window) 방식.
+받은 청크는 CRC32로 확인한 뒤 미리 크기를 잡아둔 파일(mmap)에 바로 쓰고,
+중간에 끊기면 .progress 파일에 남은 마지막 정상 위치부터 다시 읽는다.
+
+펌웨어 프로토콜
+    호스트 -> 보드   FRD:<offset hex>,<길이>\n   (창 크기만큼 이어서 보내니 줄바꿈으로 구분)
+    보드 -> 호스트   FDAT:<offset hex>,<base64 데이터>,<crc32 hex>
+                     FERR:<offset hex>,<이유>
+
+    python flashdump.py --port COM13 flash.bin
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import zlib
+import base64
+import argparse
+
+import metrics
+
+# 0x90 ID 응답의 Device ID -> 용량 (Winbond W25Qxx)
+DEVICE_SIZES = {0x13: 1 << 20, 0x14: 2 << 20, 0x15: 4 << 20, 0x16: 8 << 20,
+                0x17: 16 << 20, 0x18: 32 << 20, 0x19: 64 << 20}
+DEFAULT_SIZE = 16 << 20
+
+BYTES_DUMPED = metrics.REGISTRY.counter("flash_dump_bytes_total", "Flash 덤프로 받은 바이트 수")
+CHUNK_ERRORS = metrics.REGISTRY.counter("flash_dump_chunk_errors_total", "CRC/길이 오류 또는 FERR 청크 수")
+CHUNK_RETRIES = metrics.REGISTRY.counter("flash_dump_retries_total", "시간 초과로 다시 요청한 청크 수")
+
+
+def size_from_id_line(line):
+    """'0x90 ID - Manufacturer: EF, Device: 17' 에서 Flash 용량 추정"""
+    if "Device" not in line:
+        return None
+    try:
+        device = int(line.rsplit("Device", 1)[1].strip(" :").split()[0], 16)
+    except (ValueError, IndexError):
+        return None
+    return DEVICE_SIZES.get(device)
+
+
+def encode_chunk(offset, data):
+    """보드 쪽 응답 형식 (가상 보드/테스트용)"""
+    return f"FDAT:{offset:08X},{base64.b64encode(data).decode()},{zlib.crc32(data):08X}"
+
+
+class FlashDumper:
+    def __init__(self, send, path, size=DEFAULT_SIZE, chunk=192, window=16, timeout=1.0, max_retries=5):
+        self.send = send
+        self.path = path
+        self.progress_path = path + ".progress"
+        self.size = size
+        self.chunk = chunk
+        self.window = window
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.good = 0  # 여기까지는 빈틈 없이 받음
+        self.next_offset = 0
+        self.outstanding = {}  # offset -> (요청 시각, 재시도 횟수)
+        self.done_ahead = set()  # good 이후에 먼저 도착한 청크
+        self.started = None
+        self.started_good = 0
+        self.finished = False
+        self.failed = None
+        self.file = None
+        self.map = None
+        self.last_saved = 0.0
+
+    def open(self):
+        """파일을 크기만큼 잡아두고 mmap, 이전 진행 상황이 맞으면 이어서"""
+        resume = 0
+        if os.path.exists(self.path) and os.path.exists(self.progress_path):
+            try:
+                with open(self.progress_path, encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get("size") == self.size and saved.get("chunk") == self.chunk:
+                    resume = int(saved.get("good", 0))
+            except (OSError, ValueError):
+                resume = 0
+        mode = "r+b" if resume else "w+b"
+        self.file = open(self.path, mode)
+        self.file.truncate(self.size)
+        self.map = mmap.mmap(self.file.fileno(), self.size)
+        self.good = self.next_offset = self.started_good = resume
+        self.started = time.monotonic()
+        if resume:
+            print(f"[Flash 덤프] 0x{resume:08X} 부터 이어서 받음")
+
+    def pump(self, now=None):
+        """리더 루프에서 호출 - 시간 초과 청크 재요청, 창(window)이 빌 때까지 새 요청"""
+        if self.finished or self.failed:
+            return
+        now = time.monotonic() if now is None else now
+        for offset, (sent, retries) in list(self.outstanding.items()):
+            if now - sent > self.timeout:
+                if retries >= self.max_retries:
+                    self.fail(f"0x{offset:08X} 응답 없음")
+                    return
+                CHUNK_RETRIES.inc()
+                self.request(offset, now, retries + 1)
+        while len(self.outstanding) < self.window and self.next_offset < self.size:
+            offset = self.next_offset
+            self.next_offset += self.chunk
+            if offset not in self.done_ahead:
+                self.request(offset, now, 0)
+        if now - self.last_saved > 1.0:
+            self.save_progress(now)
+
+    def request(self, offset, now, retries):
+        length = min(self.chunk, self.size - offset)
+        self.outstanding[offset] = (now, retries)
+        self.send(f"FRD:{offset:08X},{length}\n")
+
+    def handle_line(self, line):
+        """FDAT/FERR 줄이면 처리하고 True"""
+        if line.startswith("FERR:"):
+            CHUNK_ERRORS.inc()
+            try:
+                offset = int(line[5:].split(",", 1)[0], 16)
+            except ValueError:
+                return True  # 잘린 줄 - 그 청크는 시간 초과로 다시 요청
+            if offset in self.outstanding:
+                self.outstanding[offset] = (0.0, self.outstanding[offset][1])  # 다음 pump에서 재요청
+            return True
+        if not line.startswith("FDAT:"):
+            return False
+        try:
+            offset_text, payload, crc_text = line[5:].split(",")
+            offset = int(offset_text, 16)
+            data = base64.b64decode(payload)
+            crc = int(crc_text, 16)
+        except (ValueError, TypeError):
+            CHUNK_ERRORS.inc()
+            return True
+        if offset not in self.outstanding:
+            return True  # 이미 받았거나 취소된 청크
+        expected = min(self.chunk, self.size - offset)
+        if len(data) != expected or zlib.crc32(data) != crc:
+            CHUNK_ERRORS.inc()
+            self.outstanding[offset] = (0.0, self.outstanding[offset][1])
+            return True
+        del self.outstanding[offset]
+        self.map[offset:offset + expected] = data
+        BYTES_DUMPED.inc(expected)
+        self.done_ahead.add(offset)
+        while self.good in self.done_ahead:
+            self.done_ahead.discard(self.good)
+            self.good += self.chunk
+        if self.good >= self.size:
+            self.finish()
+        return True
+
+    def save_progress(self, now=None):
+        """마지막 정상 위치 기록 (mmap을 먼저 디스크로 내림)"""
+        self.last_saved = time.monotonic() if now is None else now
+        self.map.flush()
+        tmp_path = self.progress_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"size": self.size, "chunk": self.chunk, "good": min(self.good, self.size)}, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def finish(self):
+        self.finished = True
+        self.close()
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
+        print(f"[Flash 덤프] 완료: {self.path}")
+
+    def fail(self, reason):
+        self.failed = reason
+        print(f"[Flash 덤프] 중단: {reason}")
+        self.close()
+
+    def close(self):
+        if self.map is not None:
+            if not self.finished:
+                self.save_progress()
+            self.map.flush()
+            self.map.close()
+            self.file.close()
+            self.map = None
+
+    def throughput(self):
+        elapsed = time.monotonic() - self.started if self.started else 0
+        return (self.good - self.started_good) / elapsed if elapsed > 0 else 0.0
+
+    def status_text(self):
+        done = min(self.good, self.size)
+        if self.failed:
+            return f"Flash 덤프 중단: {self.failed} ({done / self.size * 100:.0f}%)"
+        if self.finished:
+            return f"Flash 덤프 완료: {self.path} ({self.size >> 10} KB)"
+        rate = self.throughput()
+        eta = (self.size - done) / rate if rate > 0 else 0
+        return (f"Flash 덤프: {done / self.size * 100:.1f}% {done >> 10}/{self.size >> 10} KB "
+                f"{rate / 1024:.1f} KB/s 남은 시간 {int(eta) // 60}:{int(eta) % 60:02d}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="외부 Flash 전체 덤프")
+    parser.add_argument("output", help="저장할 파일 (.progress가 있으면 이어서 받음)")
+    parser.add_argument("--port", default="COM13")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--size", type=lambda v: int(v, 0), default=DEFAULT_SIZE, help="Flash 용량 (바이트)")
+    parser.add_argument("--chunk", type=int, default=192)
+    parser.add_argument("--window", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    import serial_port
+    ser = serial_port.open_port(args.port, args.baud, timeout=0.05)
+    # 요청마다 줄바꿈으로 끝남 (request)
+    dumper = FlashDumper(lambda command: ser.write(command.encode()), args.output,
+                         size=args.size, chunk=args.chunk, window=args.window)
+    dumper.open()
+    last_print = 0.0
+    try:
+        while not dumper.finished and not dumper.failed:
+            dumper.pump()
+            line = ser.readline().decode("utf-8", errors="ignore").strip()
+            if line:
+                dumper.handle_line(line)
+            if time.monotonic() - last_print > 1.0:
+                last_print = time.monotonic()
+                print(dumper.status_text())
+    except KeyboardInterrupt:
+        print("중단 - 다시 실행하면 이어서 받음")
+    finally:
+        dumper.close()
+        ser.close()
+    print(dumper.status_text())
+    return 0 if dumper.finished else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+한 프로세스 안에서 보드 연결 하나를 여러 패널이 같이 쓰기 (publish/subscribe)
+
+예전에는 창(MainWindow/TraceBoard)마다 자기 리더 스레드가 포트를 직접 열어서, 같은 보드에
+패널을 하나 더 띄우면 (another 상태판 + another2 유리 표시판) 두 번째 포트 열기가 실패했다.
+이제 포트마다 Connection 하나가 연결을 갖고 읽기/순번 확인/파싱/세션 기록을 한 번만 한 뒤
+구독한 패널들에 같은 Event를 나눠준다 (패널은 다시 파싱하지 않음).
+
+    sub = hub.subscribe(port, baud, "another2", ("adc", "led", "tim", "log"), wake=link.ready.emit)
+    logs, states, dropped = sub.feed.drain()     GUI 스레드에서 (pipeline.UiFeed)
+    sub.write(b"R00001")
+    hub.unsubscribe(sub)                          마지막 구독이 빠지면 포트를 닫음
+
+주제 (topic)
+    adc    ADC
+    led    LED, LED1~4, RGB
+    tim    TIM, TIMER, TIME, SEG, PROG
+    rtc    RTC
+    flash  Flash ID
+    log    모든 줄 (로그 창/콘솔용, 그 외 종류 포함)
+상태 이벤트는 구독한 주제만 패널의 state 채널로 가고, "log"를 구독하면 모든 이벤트가 log 채널로 감.
+
+덤프/업로드/시계 응답처럼 GUI로 보내지 않고 리더 쪽에서 가로챌 줄은 on_line(line, t_ns)로
+(True를 돌려주면 아무 패널에도 안 감), 리더 루프에서 주기적으로 할 일은 on_tick()으로 넘긴다.
+둘 다 연결 스레드에서 불림. 여기서 난 예외는 세고 넘어감 (hub_handler_errors_total) - 한 패널의 버그로
+같이 쓰는 연결이 죽지 않게. 포트 오류로 연결 스레드가 끝나면 CONNECTIONS에서 빠지고 남은 구독은
+sub.closed가 됨 - 패널은 명령을 보낼 때 hub.resubscribe(sub)로 다시 붙음 (serial_reconnects_total).
+"""
+import time
+import threading
+
+import events
+import integrity
+import metrics
+import pipeline
+import profiling
+import serial_port
+import session_store
+import shm_reader
+
+TOPICS = ("adc", "led", "tim", "rtc", "flash", "log")
+KIND_TOPICS = {
+    events.ADC: "adc",
+    events.LED: "led", events.LED_N: "led", events.RGB: "led",
+    events.TIM: "tim", events.TIMER: "tim", events.TIME: "tim", events.SEG: "tim", events.PROG: "tim",
+    events.RTC: "rtc",
+    events.FLASH_ID: "flash",
+}
+LINES_PER_POLL = 64  # 덤프처럼 줄이 몰려올 때 루프 한 바퀴에 처리할 줄 수
+ERRORS_PRINTED = 10  # 구독자 예외는 패널마다 처음 몇 번만 출력 (나머지는 hub_handler_errors_total로)
+
+SUBSCRIBERS = metrics.REGISTRY.gauge("hub_subscribers", "연결을 같이 쓰는 패널 수")
+
+
+def handler_errors(app):
+    return metrics.REGISTRY.counter("hub_handler_errors_total", "구독자 on_line/on_tick에서 난 예외", app=app)
+
+
+class Subscription:
+    """패널 하나의 구독 - 이벤트는 자기 UiFeed로 받고, wake()는 비어 있다가 처음 들어올 때만 불림"""
+
+    def __init__(self, connection, app, topics, wake, on_line=None, on_tick=None, feed=None):
+        unknown = set(topics) - set(TOPICS)
+        if unknown:
+            raise ValueError(f"알 수 없는 주제: {', '.join(sorted(unknown))}")
+        self.connection = connection
+        self.app = app
+        self.topics = frozenset(topics)
+        self.kinds = frozenset(kind for kind, topic in KIND_TOPICS.items() if topic in self.topics)
+        self.logs = "log" in self.topics
+        self.feed = feed if feed is not None else pipeline.UiFeed(app)
+        self.wake = wake
+        self.on_line = on_line
+        self.on_tick = on_tick
+        self.errors = handler_errors(app)
+        self.closed = False  # 연결 스레드가 끝남 (포트 오류/뽑힘) - hub.resubscribe로 다시 붙음
+
+    def handle_line(self, line, t_ns):
+        """on_line - 한 패널의 버그가 연결(다른 패널들)을 죽이지 않도록 예외는 세고 넘김"""
+        try:
+            return self.on_line(line, t_ns)
+        except Exception as e:
+            self.report(f"on_line 오류 ({line!r}): {e}")
+            return False
+
+    def tick(self):
+        try:
+            self.on_tick()
+        except Exception as e:
+            self.report(f"on_tick 오류: {e}")
+
+    def report(self, message):
+        self.errors.inc()
+        if self.errors.value <= ERRORS_PRINTED:
+            print(f"[hub] {self.app} {message}")
+
+    def offer(self, batch):
+        """연결 스레드에서 - 관심 있는 것만 feed에 넣음 (Event는 모든 패널이 같은 객체를 씀)"""
+        kinds = self.kinds
+        states = [event for event in batch if event.kind in kinds]
+        if not states and not self.logs:
+            return
+        if self.feed.put_batch(batch if self.logs else (), states):
+            self.wake()
+
+    def write(self, data):
+        return self.connection.write(data)
+
+    @property
+    def is_open(self):
+        return not self.closed and self.connection.is_open
+
+
+class Connection(threading.Thread):
+    """포트 하나 - 읽기/순번 확인/파싱/기록은 여기서 한 번만"""
+
+    def __init__(self, port, baudrate):
+        super().__init__(name=f"hub {port}", daemon=True)
+        self.port = port
+        self.baudrate = baudrate
+        self.running = True
+        self.serial = None
+        self.subscribers = ()  # 루프가 잠금 없이 읽도록 바꿀 때마다 새 튜플
+        self.lock = threading.Lock()  # 구독 추가/제거 <-> 루프 한 바퀴 (빠진 구독의 on_line이 더 안 불리게)
+        self.write_lock = threading.Lock()
+        self.open_line = False  # 마지막으로 쓴 게 줄바꿈 없는 예전 명령 (BTN1 ...)
+        # 보드가 순번/체크섬을 붙이면 빠진 줄/깨진 줄을 셈 (integrity.py) - 연결마다 하나
+        self.integrity = integrity.Tracker()
+
+    @property
+    def is_open(self):
+        return self.serial is not None and self.serial.is_open
+
+    def subscribe(self, app, topics, wake, on_line=None, on_tick=None, feed=None):
+        sub = Subscription(self, app, topics, wake, on_line, on_tick, feed)
+        with self.lock:
+            self.subscribers += (sub,)
+        return sub
+
+    def unsubscribe(self, sub):
+        """남은 구독 수"""
+        with self.lock:
+            self.subscribers = tuple(s for s in self.subscribers if s is not sub)
+            return len(self.subscribers)
+
+    def run(self):
+        try:
+            if shm_reader.ENABLED:
+                # 읽기/파싱은 별도 프로세스에서 (공유 메모리 링 버퍼)
+                self.serial = shm_reader.ProcessReader(self.port, self.baudrate)
+                self.serial.start()
+                poll = self.poll_events
+            else:
+                # pyserial은 스레드 안에서 불러옴 (창이 먼저 뜨도록)
+                self.serial = serial_port.open_port(self.port, self.baudrate, timeout=0.1)
+                poll = self.poll
+            print(f"시리얼 포트 {self.port} 연결됨.")
+            with profiling.thread_cprofile("hub"):
+                while self.running:
+                    with self.lock:
+                        poll()
+                        for sub in self.subscribers:
+                            if sub.on_tick is not None:
+                                sub.tick()
+                    time.sleep(0.01)
+        except Exception as e:
+            metrics.SERIAL_ERRORS.inc()
+            print(f"시리얼 통신 오류: {e}")
+        finally:
+            if self.serial is not None:
+                self.serial.close()  # 이미 닫혔어도 (리더 프로세스가 죽음 등) 링/핸들 정리
+            # 죽은 연결이 남아 있으면 이 포트를 구독하는 패널이 아무것도 못 받음 -> 다음 구독이 새로 열게
+            with _lock:
+                if CONNECTIONS.get(self.port) is self:
+                    del CONNECTIONS[self.port]
+                    SUBSCRIBERS.set(sum(len(c.subscribers) for c in CONNECTIONS.values()))
+                # 남은 구독에 알림 - 패널은 명령을 보낼 때 보고 resubscribe
+                for sub in self.subscribers:
+                    sub.closed = True
+
+    def intercept(self, line, t_ns):
+        """구독자의 on_line 중 하나라도 가져가면 True"""
+        for sub in self.subscribers:
+            if sub.on_line is not None and sub.handle_line(line, t_ns):
+                return True
+        return False
+
+    @profiling.span("hub.poll")
+    def poll(self):
+        batch = []
+        for _ in range(LINES_PER_POLL):
+            if self.serial.in_waiting <= 0:
+                break
+            raw = self.serial.readline()
+            received = time.monotonic_ns()  # 바이트가 OS 버퍼에서 나온 시각
+            metrics.BYTES_READ.inc(len(raw))
+            metrics.LINES_READ.inc()
+            try:
+                data = raw.decode('utf-8').strip()
+            except UnicodeDecodeError:
+                # 깨진 바이트 때문에 스레드가 죽지 않도록 버리고 계속
+                metrics.LINES_MANGLED.inc()
+                data = raw.decode('utf-8', errors='ignore').strip()
+            if not data:
+                metrics.LINES_EMPTY.inc()
+                continue
+            # 순번/체크섬부터 떼고 셈 (덤프/업로드 응답도 순번을 쓰므로) - 체크섬이 틀린 줄은 버림
+            data = self.integrity.check(raw, data)
+            if data is None or self.intercept(data, received):
+                continue
+            batch.append(events.parse_line(data, received))
+        if batch:
+            self.publish(batch)
+
+    @profiling.span("hub.poll_events")
+    def poll_events(self):
+        # 리더 프로세스가 이미 파싱한 이벤트 - 가로챌 줄만 여기서 거름
+        batch = [event for event in self.serial.read_batch() if not self.intercept(event.line, event.t_ns)]
+        if batch:
+            self.publish(batch)
+
+    def publish(self, batch):
+        session_store.record_batch(batch)
+        for sub in self.subscribers:
+            sub.offer(batch)
+
+    def write(self, data):
+        """어느 스레드에서나 - 포트가 안 열렸으면 False
+        줄바꿈으로 끝나는 프레임(FRD: ...)은 앞에 줄바꿈 없는 명령이 있었으면 줄을 먼저 끊어줌
+        (UART에서는 "BTN1FRD:..."처럼 붙어서 도착함)"""
+        with self.write_lock:
+            if not self.is_open:
+                return False
+            framed = data.endswith(b"\n")
+            if framed and self.open_line:
+                data = b"\n" + data
+            self.serial.write(data)
+            self.open_line = not framed
+        metrics.COMMANDS_SENT.inc()
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join(timeout=2)
+        elif self.is_open:
+            self.serial.close()
+
+
+CONNECTIONS = {}  # 포트 -> Connection
+_lock = threading.Lock()
+
+
+def subscribe(port, baudrate, app, topics, wake, on_line=None, on_tick=None, feed=None):
+    """포트 연결에 구독 - 그 포트를 처음 구독하는 패널이 연결 스레드를 시작함
+    (feed를 넘기면 그 UiFeed로 받음 - 패널이 구독 전부터 feed를 들고 있을 때)"""
+    with _lock:
+        connection = CONNECTIONS.get(port)
+        if connection is not None and not connection.is_alive():
+            # 연결 스레드가 끝났는데 (포트 오류) 아직 빠지기 전 - 남은 구독은 옮기지 않고 새로 엶
+            connection = None
+        if connection is None:
+            connection = CONNECTIONS[port] = Connection(port, baudrate)
+            connection.start()
+        elif baudrate != connection.baudrate:
+            print(f"[hub] {port}는 이미 {connection.baudrate}bps로 열려 있음 - {baudrate} 무시")
+        sub = connection.subscribe(app, topics, wake, on_line, on_tick, feed)
+        SUBSCRIBERS.set(sum(len(c.subscribers) for c in CONNECTIONS.values()))
+    return sub
+
+
+def unsubscribe(sub):
+    """구독 해제 - 그 포트의 마지막 구독이면 연결을 닫음"""
+    connection = sub.connection
+    with _lock:
+        last = connection.unsubscribe(sub) == 0 and CONNECTIONS.get(connection.port) is connection
+        if last:
+            del CONNECTIONS[connection.port]
+        SUBSCRIBERS.set(sum(len(c.subscribers) for c in CONNECTIONS.values()))
+    if last:
+        connection.stop()  # 잠금 밖에서 (연결 스레드가 끝날 때 _lock을 잡음)
+
+
+def resubscribe(sub):
+    """연결이 끊긴 구독(sub.closed)을 같은 설정으로 다시 - 포트를 새로 엶 (열리는 건 연결 스레드에서)"""
+    unsubscribe(sub)
+    metrics.RECONNECTS.inc()
+    connection = sub.connection
+    return subscribe(connection.port, connection.baudrate, sub.app, sub.topics, sub.wake,
+                     sub.on_line, sub.on_tick, sub.feed)
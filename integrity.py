@@ -0,0 +1,216 @@
+"""
+수신 줄 순번 / 체크섬 확인 - 빠지거나 잘린 줄을 조용히 흘려보내지 않도록
+
+decode(errors='ignore')와 except 때문에 버퍼 넘침이나 USB 끊김으로 잘린 줄은 그냥 사라지거나
+쓰레기 값이 되어 지나갔다. 보드가 메시지 뒤에 순번(선택: 체크섬)을 붙이면 호스트에서
+종류별로 빈 번호를 세서, 처리량이 늘어난 게 진짜인지 조용히 버리고 있는 건지 구분한다.
+
+보드 형식 (붙이지 않는 펌웨어는 예전처럼 그대로 동작)
+    ADC:75#1234        # 뒤 = 그 종류 메시지의 순번 (종류마다 따로, 0~65535 돌아감)
+    ADC:75#1234*5A     * 뒤 16진 두 자리 = '*' 앞 전체 바이트 XOR (NMEA 방식)
+
+종류 = ':' 앞 머리말 (ADC, TIM, UACK, FDAT ...). 끝에 붙은 번호는 하나로 봄 (LED1~4: -> LEDn).
+지표 라벨은 metrics.MESSAGE_TYPES 밖이면 "other". 순번 0은 보드 재시작으로 봄.
+순번이 뒤로 가거나 같으면 순서 바뀜/중복.
+
+지표
+    rx_sequenced_lines_total{type}   순번이 붙어서 온 줄
+    rx_lost_total{type}              순번 빈 곳으로 센 빠진 줄
+    rx_out_of_order_total{type}      순번이 뒤로 가거나 중복
+    rx_seq_resets_total              순번 0 (보드 재시작)
+    rx_partial_lines_total           줄바꿈 없이 끝난 줄 (readline 시간 초과로 잘림)
+    rx_corrupt_lines_total           체크섬이 틀리거나 (체크섬을 쓰는 보드인데) 없어서 버린 줄
+    rx_unsequenced_lines_total       순번을 쓰는 보드인데 순번이 없는 줄 (끝이 잘렸을 가능성)
+UTF-8로 안 풀린 줄은 예전처럼 serial_lines_mangled_total.
+
+    python integrity.py --port "sim://?rate=500&seq=1&drop=0.01&garble=0.005" --seconds 10
+"""
+import sys
+import time
+import argparse
+
+import events
+import metrics
+
+SEQ_MOD = 65536
+TYPES = metrics.MESSAGE_TYPES + ("other",)  # 종류별 합계 리스트 순서 (shm_reader 헤더와 같음)
+MAX_KEYS = 256  # 잘린 머리말로 종류가 끝없이 늘지 않게
+
+PARTIAL = metrics.REGISTRY.counter("rx_partial_lines_total", "줄바꿈 없이 끝난 줄 (잘린 줄)")
+CORRUPT = metrics.REGISTRY.counter("rx_corrupt_lines_total", "체크섬이 틀리거나 없어서 버린 줄")
+UNSEQUENCED = metrics.REGISTRY.counter("rx_unsequenced_lines_total", "순번을 쓰는 보드인데 순번이 없는 줄")
+RESETS = metrics.REGISTRY.counter("rx_seq_resets_total", "순번이 0으로 돌아간 횟수 (보드 재시작)")
+
+
+def sequenced_by_type(msg_type):
+    return metrics.REGISTRY.counter("rx_sequenced_lines_total", "순번이 붙어서 온 줄", type=msg_type)
+
+
+def lost_by_type(msg_type):
+    return metrics.REGISTRY.counter("rx_lost_total", "순번 빈 곳으로 센 빠진 줄", type=msg_type)
+
+
+def out_of_order_by_type(msg_type):
+    return metrics.REGISTRY.counter("rx_out_of_order_total", "순번이 뒤로 가거나 중복된 줄", type=msg_type)
+
+
+def checksum(text):
+    value = 0
+    for byte in text.encode("utf-8"):
+        value ^= byte
+    return value
+
+
+def type_key(body):
+    head = body.partition(":")[0]
+    if head[-1:].isdigit():
+        head = head.rstrip("0123456789") + "n"
+    return head
+
+
+def type_label(key):
+    if key in metrics.MESSAGE_TYPES:
+        return key
+    if key == "LEDn":
+        return "LED"
+    if key.startswith("0x90"):
+        return "0x90"
+    return "other"
+
+
+def split(line):
+    """(본문, 순번 또는 None, 체크섬 결과: True 맞음 / False 틀림 / None 없음)"""
+    ok = None
+    if len(line) > 3 and line[-3] == "*":
+        try:
+            expected = int(line[-2:], 16)
+        except ValueError:
+            pass
+        else:
+            ok = checksum(line[:-3]) == expected
+            line = line[:-3]
+    body, sep, seq = line.rpartition("#")
+    if not sep or not seq.isdigit():
+        return line, None, ok
+    return body, int(seq) % SEQ_MOD, ok
+
+
+class Tracker:
+    """리더 하나에 하나 (같은 스레드에서만 부름)
+
+    종류별 합계를 리스트로도 들고 있어서 shm_reader 자식 프로세스가 공유 메모리 헤더로 넘길 수 있음."""
+
+    def __init__(self):
+        self.last = {}  # 종류 키 -> 마지막 순번
+        self.sequenced = False  # 순번 붙은 줄을 한 번이라도 봤는지
+        self.checksummed = False  # 체크섬 붙은 줄을 한 번이라도 봤는지 (그 뒤로는 없으면 깨진 줄)
+        self.seq_counts = [0] * len(TYPES)
+        self.lost = [0] * len(TYPES)
+        self.out_of_order = [0] * len(TYPES)
+        self.partial = 0
+        self.corrupt = 0
+        self.unsequenced = 0
+        self.resets = 0
+
+    def check(self, raw, text):
+        """디코드한 줄 -> 순번/체크섬을 떼어낸 본문 (깨진 줄이면 None). 순번이 있으면 종류별로 셈"""
+        if raw and not raw.endswith(b"\n"):
+            self.partial += 1
+            PARTIAL.inc()
+        body, seq, ok = split(text)
+        if ok:
+            self.checksummed = True
+        elif ok is False or self.checksummed:
+            self.corrupt += 1
+            CORRUPT.inc()
+            return None
+        if seq is None:
+            if self.sequenced:
+                self.unsequenced += 1
+                UNSEQUENCED.inc()
+        else:
+            self.sequenced = True
+            self.account(body, seq)
+        return body
+
+    def parse(self, raw, text, t_ns):
+        body = self.check(raw, text)
+        return None if body is None else events.parse_line(body, t_ns)
+
+    def account(self, body, seq):
+        key = type_key(body)
+        if not key[:1].isalpha() and not key.startswith("0x"):
+            return  # 잘린 줄 뒷부분 같은 쓰레기 - 종류를 알 수 없음
+        label = type_label(key)
+        index = TYPES.index(label)
+        self.seq_counts[index] += 1
+        sequenced_by_type(label).inc()
+        last = self.last.get(key)
+        if last is None:
+            if len(self.last) < MAX_KEYS:
+                self.last[key] = seq
+            return
+        gap = (seq - last) % SEQ_MOD
+        if gap == 1:
+            self.last[key] = seq
+        elif seq == 0:
+            self.resets += 1
+            RESETS.inc()
+            self.last[key] = seq
+        elif gap == 0 or gap > SEQ_MOD // 2:
+            # 늦게 온 줄 / 중복 - 마지막 순번은 그대로
+            self.out_of_order[index] += 1
+            out_of_order_by_type(label).inc()
+        else:
+            self.lost[index] += gap - 1
+            lost_by_type(label).inc(gap - 1)
+            self.last[key] = seq
+
+    def summary(self):
+        lines = []
+        for index, name in enumerate(TYPES):
+            if self.seq_counts[index] or self.lost[index]:
+                total = self.seq_counts[index] + self.lost[index]
+                lines.append(f"{name:<6} 받음 {self.seq_counts[index]:7d}  빠짐 {self.lost[index]:5d} "
+                             f"({self.lost[index] / total:6.2%})  순서 바뀜 {self.out_of_order[index]}")
+        lines.append(f"잘린 줄 {self.partial}, 체크섬 오류 {self.corrupt}, 순번 없음 {self.unsequenced}, "
+                     f"재시작 {self.resets}, UTF-8 깨짐 {metrics.LINES_MANGLED.value}")
+        return lines
+
+
+def main(argv=None):
+    import serial_port
+    parser = argparse.ArgumentParser(description="포트에서 읽으면서 종류별 빠진 줄/잘린 줄 세기")
+    parser.add_argument("--port", default="sim://?rate=500&seq=1&drop=0.01&garble=0.005")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args(argv)
+
+    ser = serial_port.open_port(args.port, args.baud, timeout=0.1)
+    tracker = Tracker()
+    lines = 0
+    end = time.monotonic() + args.seconds
+    try:
+        while time.monotonic() < end:
+            raw = ser.readline()
+            if not raw:
+                continue
+            received = time.monotonic_ns()
+            lines += 1
+            try:
+                text = raw.decode("utf-8").strip()
+            except UnicodeDecodeError:
+                metrics.LINES_MANGLED.inc()
+                text = raw.decode("utf-8", errors="ignore").strip()
+            if text:
+                tracker.parse(raw, text, received)
+    finally:
+        ser.close()
+    print(f"{args.port} - {args.seconds:g}초 동안 {lines}줄")
+    for line in tracker.summary():
+        print("  " + line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
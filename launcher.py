@@ -0,0 +1,158 @@
+"""
+빠른 시작 런처
+
+창을 먼저 띄우고 시리얼 포트는 첫 프레임 이후에 연다.
+
+    python launcher.py another2 --port COM13
+    python launcher.py another2 --measure-startup      # 첫 프레임까지 걸린 시간
+    python launcher.py another2 --importtime           # -X importtime 프로파일 요약
+    python launcher.py another2 --port sim://          # 가상 보드 (sim_board.py)
+    python launcher.py another2 another --port COM13   # 패널 두 개가 연결 하나를 같이 씀 (hub.py)
+"""
+import os
+import sys
+import time
+import argparse
+import importlib
+import subprocess
+
+# 인터프리터가 이 파일을 읽기 시작한 시점 (첫 프레임 시간의 기준)
+_T0 = time.perf_counter()
+
+APPS = ("testingGUI", "another", "another2")
+QT_BINDINGS = {"testingGUI": "PySide6", "another": "PyQt5", "another2": "PyQt5"}  # 한 프로세스에는 하나만
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="STM32 보드 GUI 런처")
+    parser.add_argument("apps", nargs="+", choices=APPS, metavar="app",
+                        help="실행할 GUI 스크립트 (여러 개면 같은 포트 연결을 같이 씀, PyQt5/PySide6 섞기는 안 됨)")
+    parser.add_argument("--port", default="COM13", help="시리얼 포트 (기본 COM13, sim://, bridge://host:7010)")
+    parser.add_argument("--baud", type=int, default=115200, help="보드레이트 (기본 115200)")
+    parser.add_argument("--negotiate-baud", action="store_true",
+                        help="연결 후 보드와 보드레이트를 가능한 만큼 올림 (TESTINGGUI_BAUD_NEGOTIATE)")
+    parser.add_argument("--max-baud", type=int, help="협상할 최대 보드레이트 (어댑터 한계)")
+    parser.add_argument("--reader", choices=("thread", "process"), default="thread",
+                        help="process: 읽기/파싱을 별도 프로세스 + 공유 메모리에서 (TESTINGGUI_READER)")
+    parser.add_argument("--session-db", help="수신 이벤트를 기록할 SQLite 파일 (TESTINGGUI_SESSION_DB)")
+    parser.add_argument("--metrics-file", help="Prometheus textfile 경로 (TESTINGGUI_METRICS_FILE)")
+    parser.add_argument("--profile", help="타이밍 구간 출력 파일 (*.json: Chrome trace, *.speedscope.json: speedscope)")
+    parser.add_argument("--cprofile", help="리더 스레드 cProfile 출력 파일 (.prof)")
+    parser.add_argument("--run-seconds", type=float,
+                        help="지정한 시간 뒤 자동 종료 (가상 보드로 프로파일링할 때)")
+    parser.add_argument("--measure-startup", action="store_true",
+                        help="첫 프레임이 그려지면 시간 출력 후 종료")
+    parser.add_argument("--importtime", action="store_true",
+                        help="-X importtime으로 다시 실행해서 import 비용 상위 목록 출력")
+    parser.add_argument("--top", type=int, default=15, help="--importtime 출력 개수")
+    args = parser.parse_args(argv)
+    if len({QT_BINDINGS[app] for app in args.apps}) > 1:
+        parser.error("PyQt5 앱(another, another2)과 PySide6 앱(testingGUI)은 한 프로세스에 같이 띄울 수 없음")
+    return args
+
+
+def summarize_importtime(stderr_text, top=15):
+    """-X importtime 출력에서 누적 시간이 큰 모듈 목록 만들기"""
+    rows = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us = int(fields[0])
+            cumulative_us = int(fields[1])
+        except ValueError:
+            continue  # 헤더 줄
+        rows.append((cumulative_us, self_us, fields[2].strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def run_importtime(args):
+    cmd = [sys.executable, "-X", "importtime", __file__, *args.apps,
+           "--measure-startup", "--port", args.port, "--baud", str(args.baud)]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    print(proc.stdout, end="")
+    print(f"{'누적(ms)':>10} {'자체(ms)':>10}  모듈")
+    for cumulative_us, self_us, name in summarize_importtime(proc.stderr, args.top):
+        print(f"{cumulative_us / 1000:10.1f} {self_us / 1000:10.1f}  {name}")
+    return proc.returncode
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.importtime:
+        return run_importtime(args)
+
+    # 프로파일링 데코레이터는 import 시점에 적용되므로 환경 변수를 먼저 설정
+    if args.negotiate_baud:
+        os.environ["TESTINGGUI_BAUD_NEGOTIATE"] = "1"
+    if args.max_baud:
+        os.environ["TESTINGGUI_MAX_BAUD"] = str(args.max_baud)
+    if args.reader == "process":
+        os.environ["TESTINGGUI_READER"] = "process"
+    if args.session_db:
+        os.environ["TESTINGGUI_SESSION_DB"] = args.session_db
+    if args.metrics_file:
+        os.environ["TESTINGGUI_METRICS_FILE"] = args.metrics_file
+    if args.profile:
+        os.environ["TESTINGGUI_PROFILE"] = args.profile
+    if args.cprofile:
+        os.environ["TESTINGGUI_CPROFILE"] = args.cprofile
+
+    t_import = time.perf_counter()
+    modules = [importlib.import_module(name) for name in args.apps]
+    module = modules[0]
+    t_imported = time.perf_counter()
+
+    app = module.QApplication(sys.argv[:1])
+    QtCore = importlib.import_module(QT_BINDINGS[args.apps[0]] + ".QtCore")
+    # 같은 포트를 쓰는 창은 hub 연결 하나를 같이 씀 (포트를 두 번 열지 않음)
+    windows = [m.create_window(port=args.port, baudrate=args.baud) for m in modules]
+
+    def close_all():
+        for window in windows:
+            window.close()
+
+    class FirstPaint(QtCore.QObject):
+        """창마다 첫 Paint 이벤트를 기다렸다가 전부 그려지면 시간을 잼
+        (show() 뒤 0ms 타이머는 창이 노출/페인트된 뒤라는 보장이 없음)"""
+
+        def __init__(self):
+            super().__init__()
+            self.waiting = set(windows)
+
+        def eventFilter(self, watched, event):
+            if event.type() == QtCore.QEvent.Paint and watched in self.waiting:
+                self.waiting.discard(watched)
+                watched.removeEventFilter(self)
+                if not self.waiting:
+                    on_first_frame(time.perf_counter())
+            return False
+
+    def on_first_frame(t_frame):
+        print(f"[시작 시간] import {(t_imported - t_import) * 1000:.1f} ms, "
+              f"창 생성 {(t_shown - t_imported) * 1000:.1f} ms, "
+              f"첫 프레임까지 {(t_frame - _T0) * 1000:.1f} ms")
+        if args.measure_startup:
+            # 페인트 도중에 창을 닫지 않게 이벤트 루프로 넘김
+            QtCore.QTimer.singleShot(0, close_all)
+            QtCore.QTimer.singleShot(0, app.quit)
+
+    first_paint = FirstPaint()
+    for window in windows:
+        window.installEventFilter(first_paint)
+        window.show()
+    t_shown = time.perf_counter()
+    if args.run_seconds:
+        module.QTimer.singleShot(int(args.run_seconds * 1000), close_all)
+
+    run_loop = getattr(app, "exec", None) or app.exec_
+    return run_loop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+파이프라인 지표 (카운터 / 게이지 / 히스토그램)
+
+리더 스레드, 파서, 명령 대기열, UI 갱신 경로에서 공통으로 쓰는 지표 모음.
+Qt와 상관없는 순수 파이썬 모듈이라 세 GUI 어디서나 불러 쓸 수 있다.
+
+    python launcher.py another2 --metrics-file /var/lib/node_exporter/testinggui.prom
+
+TESTINGGUI_METRICS_FILE 환경 변수가 있으면 그 경로에 Prometheus 텍스트 형식으로
+주기적으로 기록한다 (node exporter textfile collector 용).
+"""
+import os
+import bisect
+import threading
+
+# 지연 시간 히스토그램 기본 구간 (초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _label_value(value):
+    """Prometheus 라벨 값 이스케이프 (역슬래시, 큰따옴표, 줄바꿈) - Windows 포트 경로 등이 형식을 깨지 않게"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels) + "}"
+
+
+class Counter:
+    """증가만 하는 값. +=는 읽기/더하기/쓰기라 GIL이 있어도 스레드 사이에 값을 잃을 수 있어서 잠금"""
+    __slots__ = ("name", "labels", "value", "lock")
+    kind = "counter"
+
+    def __init__(self, name, labels=()):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Gauge:
+    """현재 값 (대기열 길이 등) - inc/dec는 Counter처럼 잠금"""
+    __slots__ = ("name", "labels", "value", "lock")
+    kind = "gauge"
+
+    def __init__(self, name, labels=()):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Histogram:
+    """고정 구간 히스토그램 - observe()는 bisect 한 번 (여러 스레드에서 불리므로 잠금)"""
+    __slots__ = ("name", "labels", "buckets", "counts", "sum", "count", "lock")
+    kind = "histogram"
+
+    def __init__(self, name, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """구간 상한으로 근사한 분위수"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def samples(self):
+        running = 0
+        for bound, c in zip(self.buckets, self.counts):
+            running += c
+            yield self.name + "_bucket", self.labels + (("le", repr(bound)),), running
+        yield self.name + "_bucket", self.labels + (("le", "+Inf"),), self.count
+        yield self.name + "_sum", self.labels, self.sum
+        yield self.name + "_count", self.labels, self.count
+
+
+class Registry:
+    def __init__(self, prefix="testinggui_"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.metrics = {}  # (name, labels) -> metric
+        self.help = {}  # name -> (kind, help)
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        name = self.prefix + name
+        key = (name, tuple(sorted(labels.items())))
+        metric = self.metrics.get(key)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.get(key)
+                if metric is None:
+                    metric = cls(name, key[1], **kwargs)
+                    self.metrics[key] = metric
+                    self.help.setdefault(name, (cls.kind, help_text))
+        return metric
+
+    def counter(self, name, help_text="", **labels):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", **labels):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", buckets=LATENCY_BUCKETS, **labels):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 노출 형식"""
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda m: (m.name, m.labels))
+        lines = []
+        seen = set()
+        for metric in metrics:
+            if metric.name not in seen:
+                seen.add(metric.name)
+                kind, help_text = self.help[metric.name]
+                if help_text:
+                    lines.append(f"# HELP {metric.name} {help_text}")
+                lines.append(f"# TYPE {metric.name} {kind}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self):
+        """통계 패널용 짧은 요약"""
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda m: (m.name, m.labels))
+        lines = []
+        for metric in metrics:
+            name = metric.name[len(self.prefix):] + _label_text(metric.labels)
+            if metric.kind == "histogram":
+                lines.append(f"{name}: n={metric.count} p50={metric.quantile(0.5) * 1000:.1f}ms "
+                             f"p99={metric.quantile(0.99) * 1000:.1f}ms")
+            else:
+                lines.append(f"{name}: {metric.value}")
+        return lines
+
+
+REGISTRY = Registry()
+
+# 리더 스레드
+BYTES_READ = REGISTRY.counter("serial_bytes_read_total", "시리얼에서 읽은 바이트 수")
+LINES_READ = REGISTRY.counter("serial_lines_read_total", "읽은 줄 수")
+LINES_EMPTY = REGISTRY.counter("serial_lines_empty_total", "공백뿐이라 버려진 줄 수")
+LINES_MANGLED = REGISTRY.counter("serial_lines_mangled_total", "UTF-8 디코딩 실패로 바이트가 잘려나간 줄 수")
+RECONNECTS = REGISTRY.counter("serial_reconnects_total", "포트를 다시 연 횟수")
+SERIAL_ERRORS = REGISTRY.counter("serial_errors_total", "시리얼 예외 횟수")
+
+# 파서
+PARSE_FAILURES = REGISTRY.counter("parse_failures_total", "파싱 중 예외가 난 줄 수")
+
+# 명령 스케줄러
+COMMANDS_SENT = REGISTRY.counter("commands_sent_total", "보드로 보낸 명령 수")
+COMMAND_QUEUE_DEPTH = REGISTRY.gauge("command_queue_depth", "보내기 전 대기 중인 명령 수")
+
+# UI
+SIGNAL_LATENCY = REGISTRY.histogram("signal_latency_seconds", "줄 수신(readline 직후)부터 GUI 슬롯 실행까지")
+UI_UPDATE_SECONDS = REGISTRY.histogram("ui_update_seconds", "수신 처리 슬롯 실행 시간")
+
+
+# 보드가 보내는 메시지 종류 (나머지는 "other"로 묶어서 라벨 개수 폭주 방지)
+MESSAGE_TYPES = ("ADC", "LED", "RGB", "SEG", "TIM", "RTC", "PROG", "TIMER", "TIME", "0x90")
+
+
+def lines_by_type(msg_type):
+    if msg_type not in MESSAGE_TYPES:
+        msg_type = "other"
+    return REGISTRY.counter("lines_parsed_total", "메시지 종류별 파싱된 줄 수", type=msg_type)
+
+
+class TextfileExporter(threading.Thread):
+    """주기적으로 .prom 파일을 통째로 다시 씀 (임시 파일 + rename이라 반쯤 쓴 파일은 안 보임)"""
+
+    def __init__(self, path, interval=5.0, registry=REGISTRY):
+        super().__init__(daemon=True, name="metrics-textfile")
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self.stop_event = threading.Event()
+
+    def write_once(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.registry.render_prometheus())
+        os.replace(tmp_path, self.path)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.write_once()
+            except OSError as e:
+                print(f"지표 파일 기록 실패: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+        try:
+            self.write_once()
+        except OSError:
+            pass
+
+
+_exporter = None
+
+
+def start_exporter(path=None, interval=None):
+    """TESTINGGUI_METRICS_FILE이 있으면 textfile exporter 시작 (여러 번 불러도 하나만)"""
+    global _exporter
+    path = path or os.environ.get("TESTINGGUI_METRICS_FILE")
+    if not path or _exporter is not None:
+        return _exporter
+    if interval is None:
+        interval = float(os.environ.get("TESTINGGUI_METRICS_INTERVAL", "5"))
+    _exporter = TextfileExporter(path, interval)
+    _exporter.start()
+    return _exporter
@@ -0,0 +1,271 @@
+"""
+커스텀 위젯 그리기 벤치마크 + 골든 이미지 비교
+
+화면 없이 (QT_QPA_PLATFORM=offscreen) 위젯을 QImage에 수천 번 그려서 프레임당 시간을 재고,
+값별로 그린 결과를 golden/<앱>/ 의 PNG와 비교한다. 그리기 최적화를 하다가 모양이
+바뀌면 여기서 걸림.
+
+    another2    SegmentDigit, SegmentDisplay, RGBLed, ADCBarGraph, GlassDisplay
+    another     SegmentDisplay, RGBLed
+    testingGUI  SevenSegmentDisplay
+
+    python paint_bench.py                           세 앱 모두 (PyQt5/PySide6라 앱마다 별도 프로세스)
+    python paint_bench.py --app another2 --frames 5000
+    python paint_bench.py --update-golden           지금 모양을 골든으로 저장 (모양을 일부러 바꿨을 때만)
+    python paint_bench.py --json before.json        결과 저장 (최적화 전후 비교용)
+
+글자가 들어간 위젯(ADCBarGraph, GlassDisplay, SevenSegmentDisplay)은 설치된 글꼴에 따라
+모양이 달라지므로 골든은 같은 환경(CI 머신)에서 만든 것과 비교해야 함.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import importlib
+import subprocess
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+APPS = {"another2": "PyQt5", "another": "PyQt5", "testingGUI": "PySide6"}
+GOLDEN_VALUES = 6  # 골든 이미지에 넣을 값 개수 (스윕에서 고르게)
+
+
+def cases(app):
+    """(위젯 이름, 만드는 함수, 크기 목록, 값 목록, 값 넣는 함수)"""
+    m = importlib.import_module(app)
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (0, 0, 0), (255, 255, 255),
+              (128, 64, 32), (10, 200, 150)]
+    if app == "another2":
+        return [
+            ("SegmentDigit", m.SegmentDigit, [(60, 100), (30, 50), (120, 200)], list(range(10)),
+             lambda w, v: w.set_digit(v)),
+            ("SegmentDisplay", m.SegmentDisplay, [(300, 120), (600, 200)],
+             [f"{n:04d}" for n in range(0, 10000, 1111)], lambda w, v: w.set_value(v)),
+            ("RGBLed", m.RGBLed, [(80, 80), (40, 40)], colors, lambda w, v: w.set_color(*v)),
+            ("ADCBarGraph", m.ADCBarGraph, [(300, 40), (600, 60)], list(range(0, 101, 5)),
+             lambda w, v: w.set_value(v)),
+            ("GlassDisplay", m.GlassDisplay, [(200, 100), (400, 160)],
+             [("ADC", "75"), ("TIMER", "00:12"), ("RTC", "1234"), ("0x90", ""), ("IDLE", "")],
+             lambda w, v: w.set_mode(*v)),
+        ]
+    if app == "another":
+        return [
+            ("SegmentDisplay", m.SegmentDisplay, [(200, 80), (400, 160)],
+             [f"{n:04d}" for n in range(0, 10000, 1111)], lambda w, v: w.set_value(v)),
+            ("RGBLed", m.RGBLed, [(60, 60), (30, 30)], colors, lambda w, v: w.set_color(*v)),
+        ]
+    if app == "testingGUI":
+        return [
+            ("SevenSegmentDisplay", m.SevenSegmentDisplay, [(200, 50), (400, 100)],
+             ["12:34:56", "00:00", "23:59", "0012", "75", ""], lambda w, v: w.update_display(v)),
+        ]
+    raise ValueError(app)
+
+
+class Renderer:
+    def __init__(self, app):
+        qt = APPS[app]
+        gui = importlib.import_module(f"{qt}.QtGui")
+        self.QWidget = importlib.import_module(f"{qt}.QtWidgets").QWidget
+        self.QImage = gui.QImage
+        self.QPainter = gui.QPainter
+        self.QColor = gui.QColor
+        self.format = gui.QImage.Format_ARGB32
+
+    def new_image(self, width, height):
+        image = self.QImage(width, height, self.format)
+        image.fill(self.QColor(255, 255, 255))
+        return image
+
+    def prepare(self, widget, size):
+        widget.setFixedSize(*size)
+        layout = self.QWidget.layout(widget)  # SevenSegmentDisplay는 self.layout을 속성으로 덮어씀
+        if layout is not None:
+            layout.activate()
+        widget.ensurePolished()
+
+    def strip(self, widget, size, values, apply):
+        """값 여러 개를 가로로 이어 그린 이미지 (골든용)"""
+        width, height = size
+        image = self.new_image(width * len(values), height)
+        painter = self.QPainter(image)
+        for i, value in enumerate(values):
+            apply(widget, value)
+            part = self.new_image(width, height)
+            widget.render(part)
+            painter.drawImage(i * width, 0, part)
+        painter.end()
+        return image
+
+
+def pick(values, count):
+    if len(values) <= count:
+        return list(values)
+    step = (len(values) - 1) / (count - 1)
+    return [values[round(i * step)] for i in range(count)]
+
+
+def image_bytes(image):
+    bits = image.constBits()
+    if hasattr(bits, "asstring"):  # PyQt5 sip.voidptr
+        return bits.asstring(image.sizeInBytes())
+    return bytes(bits)  # PySide6 memoryview
+
+
+def compare(actual, golden, channel_tolerance):
+    """다른 픽셀 수 (크기가 다르면 전체)"""
+    if actual.size() != golden.size():
+        return actual.width() * actual.height()
+    a = image_bytes(actual)
+    g = image_bytes(golden.convertToFormat(actual.format()))
+    if a == g:
+        return 0
+    differing = 0
+    for i in range(0, len(a), 4):
+        if a[i:i + 4] != g[i:i + 4] and max(abs(x - y) for x, y in zip(a[i:i + 4], g[i:i + 4])) > channel_tolerance:
+            differing += 1
+    return differing
+
+
+def leaks_none_refs(renderer):
+    """PySide6 6.12 + Python 3.11 에서는 None을 돌려주는 호출마다 None 참조가 하나씩 줄어드는
+    바인딩 버그가 있어서 수천 번 그리면 인터프리터가 죽음 (none_dealloc).
+    몇 번 불러보고 참조가 줄면 True - 벤치마크는 그 앱을 건너뛰고 알림 (참조를 올려서 가리지 않음)"""
+    probe = renderer.new_image(1, 1)
+    color = renderer.QColor(0, 0, 0)
+    before = sys.getrefcount(None)
+    for _ in range(100):
+        probe.fill(color)
+    return before - sys.getrefcount(None) >= 50
+
+
+def run_app(app, frames, update_golden, tolerance, channel_tolerance):
+    module = importlib.import_module(app)
+    qt_app = module.QApplication.instance() or module.QApplication([])
+    renderer = Renderer(app)
+    # 프레임마다 render + 값 넣기(setText, update 등)로 None 반환 호출이 여러 번 - 끝까지 못 돌림
+    if leaks_none_refs(renderer):
+        return [], 0, "None 참조 누수가 있는 Qt 바인딩 (PySide6 6.12) - 바인딩을 바꿔서 다시 실행"
+    results = []
+    failures = 0
+    golden_dir = os.path.join(GOLDEN_DIR, app)
+    if update_golden:
+        os.makedirs(golden_dir, exist_ok=True)
+
+    for name, factory, sizes, values, apply in cases(app):
+        widget = factory()
+        for size in sizes:
+            renderer.prepare(widget, size)
+
+            # 1) 골든 비교
+            tag = f"{name}_{size[0]}x{size[1]}"
+            path = os.path.join(golden_dir, tag + ".png")
+            strip = renderer.strip(widget, size, pick(values, GOLDEN_VALUES), apply)
+            if update_golden:
+                strip.save(path)
+                golden_status = "저장"
+            elif not os.path.exists(path):
+                golden_status = "골든 없음"
+                failures += 1
+            else:
+                differing = compare(strip, renderer.QImage(path), channel_tolerance)
+                total = strip.width() * strip.height()
+                if differing > total * tolerance:
+                    actual = os.path.join(tempfile.gettempdir(), f"paint_bench_{app}_{tag}.png")
+                    strip.save(actual)
+                    golden_status = f"다름 {differing}px ({actual})"
+                    failures += 1
+                else:
+                    golden_status = "같음" if differing == 0 else f"같음 (허용 {differing}px)"
+
+            # 2) 시간 측정 - 값을 돌려가며 frames번
+            image = renderer.new_image(*size)
+            for value in values[:3]:  # 예열
+                apply(widget, value)
+                widget.render(image)
+            laps = []
+            for i in range(frames):
+                apply(widget, values[i % len(values)])
+                started = time.perf_counter_ns()
+                widget.render(image)
+                laps.append(time.perf_counter_ns() - started)
+            laps.sort()
+            results.append({
+                "app": app, "widget": name, "size": f"{size[0]}x{size[1]}", "frames": frames,
+                "mean_us": round(sum(laps) / len(laps) / 1000, 1),
+                "p50_us": round(laps[len(laps) // 2] / 1000, 1),
+                "p99_us": round(laps[min(len(laps) - 1, int(len(laps) * 0.99))] / 1000, 1),
+                "max_us": round(laps[-1] / 1000, 1),
+                "golden": golden_status,
+            })
+        widget.deleteLater()
+    qt_app.processEvents()
+    return results, failures, None
+
+
+def print_table(results):
+    print(f"{'앱':<11} {'위젯':<20} {'크기':>8} {'프레임':>7} {'평균':>9} {'p50':>9} {'p99':>9} {'max':>9}  골든")
+    for r in results:
+        print(f"{r['app']:<11} {r['widget']:<20} {r['size']:>8} {r['frames']:7d} {r['mean_us']:7.1f}us "
+              f"{r['p50_us']:7.1f}us {r['p99_us']:7.1f}us {r['max_us']:7.1f}us  {r['golden']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="커스텀 위젯 그리기 벤치마크 / 골든 이미지 비교")
+    parser.add_argument("--app", choices=tuple(APPS), help="한 앱만 (없으면 세 앱을 각각 별도 프로세스로)")
+    parser.add_argument("--frames", type=int, default=2000, help="위젯/크기마다 그릴 횟수")
+    parser.add_argument("--update-golden", action="store_true", help="지금 결과를 골든 이미지로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="다른 픽셀 허용 비율 (0 = 정확히 같아야 함)")
+    parser.add_argument("--channel-tolerance", type=int, default=2, help="채널 값 차이가 이 이하면 같은 픽셀로 봄")
+    parser.add_argument("--json", help="결과 저장")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    skipped = {}  # 앱 -> 건너뛴 이유
+    if args.app:
+        results, failures, reason = run_app(args.app, args.frames, args.update_golden,
+                                            args.tolerance, args.channel_tolerance)
+        if args.child:
+            print(json.dumps({"results": results, "failures": failures, "skipped": reason}), flush=True)
+            return 0
+        if reason:
+            skipped[args.app] = reason
+    else:
+        # PyQt5와 PySide6를 한 프로세스에 올리지 않도록 앱마다 따로 실행
+        results, failures = [], 0
+        for app in APPS:
+            command = [sys.executable, os.path.abspath(__file__), "--app", app, "--child",
+                       "--frames", str(args.frames), "--tolerance", str(args.tolerance),
+                       "--channel-tolerance", str(args.channel_tolerance)]
+            if args.update_golden:
+                command.append("--update-golden")
+            done = subprocess.run(command, stdout=subprocess.PIPE, universal_newlines=True)
+            lines = done.stdout.strip().splitlines()
+            try:
+                child = json.loads(lines[-1])
+            except (IndexError, ValueError):
+                print(f"{app}: 실행 실패 (종료 코드 {done.returncode})")
+                failures += 1
+                continue
+            results += child["results"]
+            failures += child["failures"]
+            if child.get("skipped"):
+                skipped[app] = child["skipped"]
+
+    print_table(results)
+    for app, reason in skipped.items():
+        print(f"{app}: 건너뜀 - {reason}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+    if failures:
+        print(f"골든 이미지와 다른 위젯 {failures}개")
+    # 건너뛴 앱은 확인하지 못했으니 통과로 치지 않음
+    return 1 if failures or skipped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+리더 스레드 -> GUI / 기록 사이의 크기 제한 채널
+
+예전에는 리더가 줄마다 Qt 시그널을 emit해서, GUI가 밀리면 queued connection 대기열이
+끝없이 늘어나고 화면은 몇 분씩 늦게 따라갔다. 이제 단계 사이에 크기가 정해진 채널을 두고
+메시지 종류마다 정책을 고른다.
+
+    LATEST       상태 (LED/RGB/SEG/ADC/TIM...) - 키별 마지막 값만. 밀리면 중간 값은 건너뜀
+    DROP_OLDEST  로그 줄 - 가득 차면 오래된 것부터 버리고 pipeline_dropped_total 증가
+    NEVER_DROP   기록(session_store) - 절대 안 버림. 가득 차면 넣는 쪽이 기다림
+
+GUI는 UiFeed를 씀: 리더가 put()하면 GUI가 drain()하기 전까지 처음 한 번만 True를 돌려주니
+그때만 시그널을 emit하면 Qt 대기열에는 깨우기 신호가 많아야 하나. GUI 슬롯이 drain()으로
+로그/상태를 한 번에 가져감.
+
+채널 채움 정도는 pipeline_queue_depth / pipeline_queue_fill{channel=...} 게이지 (통계 패널에 보임).
+
+    TESTINGGUI_LOG_QUEUE=1000          GUI 로그 채널 크기
+    TESTINGGUI_RECORD_QUEUE=200000     기록 채널 크기
+"""
+import os
+import time
+import threading
+from collections import deque
+
+import events
+import metrics
+
+LATEST, DROP_OLDEST, NEVER_DROP = "latest", "drop-oldest", "never-drop"
+
+LOG_CAPACITY = int(os.environ.get("TESTINGGUI_LOG_QUEUE", "1000"))
+RECORD_CAPACITY = int(os.environ.get("TESTINGGUI_RECORD_QUEUE", "200000"))
+STATE_CAPACITY = 64  # 상태 키 개수 (종류 + LED 번호) 보다 넉넉하게
+
+
+def state_key(event):
+    """같은 위젯을 바꾸는 메시지끼리 같은 키 - LED는 번호별로 따로"""
+    if event.kind in (events.LED, events.LED_N):
+        return event.kind, event.value
+    return event.kind
+
+
+class Channel:
+    """정책이 있는 크기 제한 채널 - put은 어느 스레드에서나, get_all은 소비하는 쪽 한 곳에서"""
+
+    def __init__(self, name, capacity, policy, key=None):
+        if policy not in (LATEST, DROP_OLDEST, NEVER_DROP):
+            raise ValueError(f"알 수 없는 정책: {policy}")
+        self.name = name
+        self.capacity = capacity
+        self.policy = policy
+        self.key = key or state_key
+        self.items = {} if policy == LATEST else deque()
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+        self.closed = False
+        self.depth = metrics.REGISTRY.gauge("pipeline_queue_depth", "채널에 쌓인 메시지 수", channel=name)
+        self.fill = metrics.REGISTRY.gauge("pipeline_queue_fill", "채널 채움 비율 (0~1)", channel=name)
+        self.dropped = metrics.REGISTRY.counter("pipeline_dropped_total", "정책에 따라 버리거나 덮어쓴 메시지 수",
+                                                channel=name)
+        self.blocked = None
+        if policy == NEVER_DROP:
+            self.blocked = metrics.REGISTRY.counter("pipeline_blocked_seconds_total",
+                                                    "채널이 가득 차서 넣는 쪽이 기다린 시간", channel=name)
+
+    def __len__(self):
+        return len(self.items)
+
+    def put(self, item):
+        """넣기 - 넣기 전에 비어 있었으면 True (소비하는 쪽을 깨울 때)"""
+        with self.lock:
+            was_empty = not self.items
+            self._put(item)
+            self._gauge()
+        return was_empty
+
+    def put_many(self, items):
+        with self.lock:
+            was_empty = not self.items
+            for item in items:
+                self._put(item)
+            self._gauge()
+        return was_empty
+
+    def _put(self, item):
+        items = self.items
+        if self.policy == LATEST:
+            key = self.key(item)
+            if items.pop(key, None) is not None:
+                self.dropped.inc()  # 중간 값 덮어씀
+            elif len(items) >= self.capacity:
+                del items[next(iter(items))]
+                self.dropped.inc()
+            items[key] = item  # 다시 넣어서 도착 순서 맨 뒤로
+        elif self.policy == DROP_OLDEST:
+            if len(items) >= self.capacity:
+                items.popleft()
+                self.dropped.inc()
+            items.append(item)
+        else:
+            if len(items) >= self.capacity and not self.closed:
+                started = time.monotonic()
+                while len(items) >= self.capacity and not self.closed:
+                    self.not_full.wait(0.5)
+                self.blocked.inc(time.monotonic() - started)
+            items.append(item)
+
+    def get_all(self, limit=None):
+        """쌓인 것 전부 (limit이 있으면 그만큼만) - 도착 순서"""
+        with self.lock:
+            if self.policy == LATEST:
+                taken = list(self.items.values())
+                self.items = {}
+            elif limit is None or len(self.items) <= limit:
+                taken = list(self.items)
+                self.items.clear()
+            else:
+                taken = [self.items.popleft() for _ in range(limit)]
+            self._gauge()
+            self.not_full.notify_all()
+        return taken
+
+    def close(self):
+        """기다리던 put을 풀어줌 (종료할 때)"""
+        with self.lock:
+            self.closed = True
+            self.not_full.notify_all()
+
+    def _gauge(self):
+        self.depth.set(len(self.items))
+        self.fill.set(round(len(self.items) / self.capacity, 3))
+
+
+class UiFeed:
+    """리더 -> GUI: 상태는 LATEST, 로그는 DROP_OLDEST
+
+    모든 이벤트가 로그 채널로 가고 (출력/텍스트 로그용), 상태 채널에는 키별 마지막 것만 남음
+    (위젯 갱신용). 깨우기는 drain()이 가져가기 전까지 한 번만."""
+
+    def __init__(self, app, log_capacity=LOG_CAPACITY):
+        self.state = Channel(f"{app}.state", STATE_CAPACITY, LATEST)
+        self.log = Channel(f"{app}.log", log_capacity, DROP_OLDEST)
+        self.lock = threading.Lock()
+        self.wake_pending = False
+        self.dropped_seen = 0
+
+    def put(self, event):
+        self.log.put(event)
+        self.state.put(event)
+        return self._wake()
+
+    def put_batch(self, batch, states=None):
+        """states가 있으면 상태 채널에는 그것만 (hub 구독처럼 로그와 위젯 주제가 다를 때)"""
+        self.log.put_many(batch)
+        self.state.put_many(batch if states is None else states)
+        return self._wake()
+
+    def _wake(self):
+        with self.lock:
+            if self.wake_pending:
+                return False
+            self.wake_pending = True
+            return True
+
+    def drain(self):
+        """(로그 이벤트, 상태 이벤트, 지난번 이후 버려진 로그 수) - GUI 스레드에서"""
+        with self.lock:
+            self.wake_pending = False
+        logs = self.log.get_all()
+        states = self.state.get_all()
+        dropped = self.log.dropped.value - self.dropped_seen
+        self.dropped_seen += dropped
+        return logs, states, dropped
@@ -0,0 +1,136 @@
+"""
+선택적 프로파일링 (리더 루프 / 수신 처리 / paintEvent)
+
+환경 변수나 런처 옵션으로 켠다. 꺼져 있으면 @span 데코레이터가 원래 함수를
+그대로 돌려주므로 핫패스에 추가 비용이 전혀 없다.
+
+    python launcher.py another2 --port sim:// --profile trace.json
+    python launcher.py another2 --port sim:// --profile trace.speedscope.json
+    python launcher.py another2 --port sim:// --cprofile reader.prof
+
+TESTINGGUI_PROFILE    타이밍 구간 출력 파일
+                      *.speedscope.json 이면 speedscope 형식, 나머지는 Chrome trace 형식
+                      (chrome://tracing, https://ui.perfetto.dev 에서 열기)
+TESTINGGUI_CPROFILE   리더 스레드 cProfile 결과(.prof) 파일
+"""
+import os
+import json
+import time
+import atexit
+import cProfile
+import threading
+import functools
+import contextlib
+from collections import deque
+
+PROFILE_PATH = os.environ.get("TESTINGGUI_PROFILE")
+CPROFILE_PATH = os.environ.get("TESTINGGUI_CPROFILE")
+ENABLED = bool(PROFILE_PATH)
+
+# (이름, 스레드 id, 시작 ns, 끝 ns) - 너무 오래 켜두면 오래된 것부터 버림
+_spans = deque(maxlen=int(os.environ.get("TESTINGGUI_PROFILE_MAX", "2000000")))
+_thread_names = {}
+
+
+def span(name):
+    """함수 실행 구간 기록 데코레이터 (꺼져 있으면 함수를 그대로 돌려줌)"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tid = threading.get_ident()
+                if tid not in _thread_names:
+                    _thread_names[tid] = threading.current_thread().name
+                _spans.append((name, tid, start, time.perf_counter_ns()))
+        return wrapper
+    return decorate
+
+
+def thread_cprofile(label):
+    """리더 스레드 run() 전체를 cProfile로 감싸기 (TESTINGGUI_CPROFILE 없으면 아무것도 안 함)"""
+    if not CPROFILE_PATH:
+        return contextlib.nullcontext()
+    return _ThreadProfile(label)
+
+
+class _ThreadProfile:
+    def __init__(self, label):
+        self.label = label
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        # cProfile은 enable()을 부른 스레드만 측정
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        self.profile.dump_stats(CPROFILE_PATH)
+        print(f"[프로파일] {self.label} cProfile 저장: {CPROFILE_PATH}")
+        return False
+
+
+def chrome_trace(spans):
+    pid = os.getpid()
+    events = [{"name": name, "ph": "X", "ts": start / 1000, "dur": (end - start) / 1000,
+               "pid": pid, "tid": tid} for name, tid, start, end in spans]
+    for tid, thread_name in _thread_names.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                       "args": {"name": thread_name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def speedscope(spans):
+    frames = []
+    frame_index = {}
+    by_thread = {}
+    for name, tid, start, end in spans:
+        if name not in frame_index:
+            frame_index[name] = len(frames)
+            frames.append({"name": name})
+        by_thread.setdefault(tid, []).append((start, end, frame_index[name]))
+
+    profiles = []
+    for tid, items in by_thread.items():
+        # 바깥 구간이 먼저 오도록 (시작 오름차순, 끝 내림차순)
+        items.sort(key=lambda item: (item[0], -item[1]))
+        events = []
+        stack = []
+        for start, end, frame in items:
+            while stack and stack[-1][0] <= start:
+                closed_end, closed_frame = stack.pop()
+                events.append({"type": "C", "frame": closed_frame, "at": closed_end / 1000})
+            events.append({"type": "O", "frame": frame, "at": start / 1000})
+            stack.append((end, frame))
+        while stack:
+            closed_end, closed_frame = stack.pop()
+            events.append({"type": "C", "frame": closed_frame, "at": closed_end / 1000})
+        profiles.append({"type": "evented", "name": _thread_names.get(tid, str(tid)),
+                         "unit": "microseconds",
+                         "startValue": items[0][0] / 1000, "endValue": events[-1]["at"],
+                         "events": events})
+    return {"$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames}, "profiles": profiles,
+            "name": "testingGUI", "exporter": "testingGUI profiling.py"}
+
+
+def export(path=None):
+    path = path or PROFILE_PATH
+    spans = list(_spans)
+    if path.endswith(".speedscope.json"):
+        document = speedscope(spans)
+    else:
+        document = chrome_trace(spans)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f)
+    print(f"[프로파일] 구간 {len(spans)}개 저장: {path}")
+
+
+if ENABLED:
+    atexit.register(export)
@@ -0,0 +1,127 @@
+"""
+창이 안 보일 때 화면 갱신 멈추기
+
+긴 테스트 중에는 창을 최소화해두는 일이 많은데, 그래도 메시지마다 setStyleSheet,
+update(), QTextEdit.append가 불려서 아무도 안 보는 위젯을 계속 다시 그렸음.
+RenderGate는 창이 숨김/최소화/가려짐(isExposed False) 상태면 위젯 갱신을 실행하지 않고
+키마다 마지막 값만 들고 있다가, 다시 보이면 한 번에 적용한다.
+
+    gate.apply(("led", 1), widget.setStyleSheet, style)   보이면 바로, 아니면 키별 마지막 값만 보관
+    gate.log(text_edit.append, line)                      로그 줄 - 안 보일 때는 최근 LOG_LIMIT줄만
+    gate.add_timer(timer, refresh)                        화면용 주기 타이머 - 안 보이면 멈춤
+    gate.update(window)                                   창 상태 확인 (changeEvent/showEvent/폴링에서)
+
+창 클래스는 GatedWindow를 먼저 상속하면 show/hide/최소화 때 self.render_gate 상태가 바뀐다.
+
+    class MainWindow(render_gate.GatedWindow, QMainWindow): ...
+
+수신, 파싱, 기록(session_store), 지표, 알람은 위젯과 상관없이 그대로 돈다.
+Qt를 import하지 않으니 PyQt5/PySide6 앱 어디서나 씀.
+"""
+import time
+from collections import deque
+
+import metrics
+
+LOG_LIMIT = 500  # 안 보이는 동안 모아둘 로그 줄 수
+POLL_MS = 500  # 가려짐은 이벤트가 없어서 폴링으로 확인
+WINDOW_STATE_CHANGE = 105  # QEvent.WindowStateChange (PyQt5/PySide6 같은 값)
+
+
+def window_shown(window):
+    """창이 실제로 화면에 보이는지 (숨김, 최소화, 가려짐이면 False)"""
+    if not window.isVisible() or window.isMinimized():
+        return False
+    handle = window.windowHandle()
+    return handle is None or handle.isExposed()
+
+
+class RenderGate:
+    def __init__(self, app, log_limit=LOG_LIMIT):
+        self.visible = True
+        self.pending = {}  # 키 -> (함수, 인자) - 나중에 온 값이 뒤로 감
+        self.log_lines = deque(maxlen=log_limit)
+        self.log_append = None
+        self.log_skipped = 0
+        self.timers = []  # (타이머, 다시 보일 때 한 번 부를 함수 또는 None)
+        self.paused_at = None
+        self.paused_gauge = metrics.REGISTRY.gauge("ui_render_paused", "창이 안 보여서 화면 갱신을 멈춘 상태 (1)",
+                                                   app=app)
+        self.deferred = metrics.REGISTRY.counter("ui_updates_deferred_total",
+                                                 "창이 안 보여서 미뤄진 위젯 갱신 수", app=app)
+
+    def apply(self, key, func, *args):
+        if self.visible:
+            func(*args)
+            return
+        self.pending.pop(key, None)
+        self.pending[key] = (func, args)
+        self.deferred.inc()
+
+    def log(self, append, line):
+        if self.visible:
+            append(line)
+            return
+        if len(self.log_lines) == self.log_lines.maxlen:
+            self.log_skipped += 1
+        self.log_lines.append(line)
+        self.log_append = append
+        self.deferred.inc()
+
+    def add_timer(self, timer, refresh=None):
+        self.timers.append((timer, refresh))
+
+    def update(self, window):
+        """창 상태를 다시 보고 바뀌었으면 True"""
+        return self.set_visible(window_shown(window))
+
+    def set_visible(self, visible):
+        if visible == self.visible:
+            return False
+        self.visible = visible
+        self.paused_gauge.set(0 if visible else 1)
+        if visible:
+            paused = time.monotonic() - self.paused_at
+            print(f"[화면] 다시 보임 - {paused:.1f}초 동안 멈춤, 모인 갱신 {len(self.pending)}개 적용")
+            self.flush()
+            for timer, refresh in self.timers:
+                if refresh is not None:
+                    refresh()
+                timer.start()
+        else:
+            self.paused_at = time.monotonic()
+            print("[화면] 창이 안 보임 - 위젯 갱신 멈춤")
+            for timer, _ in self.timers:
+                timer.stop()
+        return True
+
+    def flush(self):
+        """모아둔 마지막 상태를 한 번에 적용"""
+        pending, self.pending = self.pending, {}
+        for func, args in pending.values():
+            func(*args)
+        if self.log_lines:
+            lines = list(self.log_lines)
+            if self.log_skipped:
+                lines.insert(0, f"... 창이 안 보이는 동안 {self.log_skipped}줄 생략")
+            self.log_append("\n".join(lines))
+            self.log_lines.clear()
+            self.log_skipped = 0
+
+
+class GatedWindow:
+    """창 이벤트에서 self.render_gate 켜고 끄기 - QWidget 서브클래스 앞에 섞어서 씀"""
+
+    def showEvent(self, event):
+        # 막 보일 때는 아직 expose 전이라 최소화 여부만 보고, 가려짐은 폴링에서 확인
+        super().showEvent(event)
+        self.render_gate.set_visible(not self.isMinimized())
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.render_gate.set_visible(False)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == WINDOW_STATE_CHANGE:
+            self.render_gate.set_visible(self.isVisible() and not self.isMinimized())
@@ -0,0 +1,238 @@
+"""
+시나리오(테스트 시퀀스) 실행기
+
+SW1~SW4, RESET, SERVER TIME을 손으로 누르는 대신 JSON 스크립트로 적어두고 실행.
+같은 스크립트를 여러 보드에 동시에 돌릴 수 있음 (보드마다 연결 하나, 스레드 하나).
+
+스크립트
+    {
+      "name": "기본 점검",
+      "newline": false,                  명령 끝에 \\n 붙이기 (another 펌웨어는 true)
+      "continue_on_fail": false,         실패해도 다음 단계 계속
+      "steps": [
+        {"name": "RTC 읽기", "send": "BTN1", "expect": "^RTC:(\\\\d{4})$", "timeout": 2},
+        {"name": "ADC 범위", "send": "BTN4", "expect": "^ADC:(\\\\d+)$", "range": [0, 100]},
+        {"name": "Flash ID", "send": "BTN3", "expect": "Device: (\\\\w+)", "equals": "17"},
+        {"wait": 0.5}
+      ]
+    }
+
+    send     보낼 명령 (없으면 기다리기만). "{now:%M%S}" 처럼 쓰면 보내는 순간의 시각
+    expect   응답 줄 정규식 - 맞는 줄이 올 때까지 다른 줄은 무시
+    timeout  expect 기다리는 시간 (초, 기본 1)
+    range    첫 번째 그룹을 숫자로 보고 [최소, 최대] 안인지
+    equals   첫 번째 그룹이 이 문자열인지
+    wait     그냥 기다리기 (초)
+
+    python sequence_runner.py sequences/smoke.json --port COM13 --port COM14 --report result.json
+"""
+import re
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from datetime import datetime
+
+import metrics
+
+
+def load_script(path):
+    with open(path, encoding="utf-8") as f:
+        script = json.load(f)
+    for index, step in enumerate(script.get("steps", [])):
+        if "expect" in step:
+            step["_pattern"] = re.compile(step["expect"])
+        step.setdefault("name", step.get("send") or f"wait {step.get('wait', 0)}s")
+        if "send" not in step and "expect" not in step and "wait" not in step:
+            raise ValueError(f"단계 {index + 1}: send/expect/wait 중 하나는 있어야 함")
+    script.setdefault("name", path)
+    return script
+
+
+class PortLink:
+    """시퀀스 전용으로 포트를 직접 여는 연결 (CLI, 여러 보드)"""
+
+    def __init__(self, port, baudrate=115200):
+        import serial_port
+        self.name = port
+        self.serial = serial_port.open_port(port, baudrate, timeout=0.05)
+
+    def send(self, command):
+        self.serial.write(command.encode("utf-8"))
+
+    def drain(self):
+        self.serial.reset_input_buffer()
+
+    def readline(self, timeout):
+        # timeout 안에서 한 줄 (없으면 None)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            line = self.serial.readline().decode("utf-8", errors="ignore").strip()
+            if line:
+                return line
+        return None
+
+    def close(self):
+        self.serial.close()
+
+
+class FeedLink:
+    """GUI가 이미 연 연결을 빌려 쓰기 - 리더 스레드가 feed()로 줄을 넣어줌"""
+
+    def __init__(self, name, send):
+        self.name = name
+        self.send = send
+        self.lines = queue.SimpleQueue()
+
+    def feed(self, line):
+        self.lines.put(line)
+
+    def drain(self):
+        try:
+            while True:
+                self.lines.get_nowait()
+        except queue.Empty:
+            pass
+
+    def readline(self, timeout):
+        try:
+            return self.lines.get(timeout=max(timeout, 0))
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+def check_step(step, match):
+    """응답이 맞은 뒤 range/equals 확인 - (통과 여부, 값, 오류)"""
+    value = match.group(1) if match.groups() else match.group(0)
+    if "range" in step:
+        low, high = step["range"]
+        try:
+            number = float(value)
+        except ValueError:
+            return False, value, f"숫자가 아님: {value}"
+        if not low <= number <= high:
+            return False, value, f"{value} 가 범위 [{low}, {high}] 밖"
+    if "equals" in step and value != str(step["equals"]):
+        return False, value, f"{value} != {step['equals']}"
+    return True, value, None
+
+
+def run_steps(script, link, stop=None, on_step=None):
+    """보드 하나에 스크립트 실행 - 단계별 결과 목록"""
+    results = []
+    newline = "\n" if script.get("newline") else ""
+    failed = False
+    for index, step in enumerate(script["steps"]):
+        result = {"step": index + 1, "name": step["name"], "status": "skip",
+                  "elapsed_ms": 0.0, "reply": None, "value": None, "error": None}
+        if (failed and not script.get("continue_on_fail")) or (stop is not None and stop.is_set()):
+            results.append(result)
+            continue
+        started = time.monotonic()
+        if "wait" in step:
+            time.sleep(step["wait"])
+        if "send" in step:
+            if "expect" in step:
+                link.drain()  # 이전에 쌓인 줄을 응답으로 착각하지 않게
+            command = step["send"]
+            if "{now" in command:
+                command = command.format(now=datetime.now())
+            link.send(command + newline)
+        ok = True
+        if "expect" in step:
+            ok = False
+            deadline = started + step.get("timeout", 1.0)
+            while True:
+                line = link.readline(deadline - time.monotonic())
+                if line is None:
+                    result["error"] = f"{step.get('timeout', 1.0)}초 안에 응답 없음"
+                    break
+                match = step["_pattern"].search(line)
+                if match:
+                    result["reply"] = line
+                    ok, result["value"], result["error"] = check_step(step, match)
+                    break
+        result["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+        result["status"] = "pass" if ok else "fail"
+        metrics.REGISTRY.counter("sequence_steps_total", "시퀀스 단계 결과", result=result["status"]).inc()
+        failed = failed or not ok
+        results.append(result)
+        if on_step is not None:
+            on_step(link.name, result)
+    return {"board": link.name, "passed": not failed and all(r["status"] != "skip" for r in results),
+            "steps": results}
+
+
+def run_parallel(script, links, on_step=None):
+    """여러 보드에 동시에 실행 (보드마다 스레드 하나)"""
+    reports = [None] * len(links)
+
+    def worker(index, link):
+        try:
+            reports[index] = run_steps(script, link, on_step=on_step)
+        except Exception as e:
+            reports[index] = {"board": link.name, "passed": False, "steps": [], "error": str(e)}
+
+    threads = [threading.Thread(target=worker, args=(i, link), name=f"sequence-{link.name}")
+               for i, link in enumerate(links)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return reports
+
+
+def format_report(script, reports):
+    lines = [f"시퀀스: {script['name']}"]
+    for report in reports:
+        lines.append(f"[{'PASS' if report['passed'] else 'FAIL'}] {report['board']}"
+                     + (f" - {report['error']}" if report.get("error") else ""))
+        for r in report["steps"]:
+            detail = r["error"] or (r["reply"] or "")
+            lines.append(f"  {r['step']:2d}. {r['status']:<4} {r['elapsed_ms']:8.1f} ms  {r['name']:<16} {detail}")
+    passed = sum(1 for report in reports if report["passed"])
+    lines.append(f"보드 {len(reports)}개 중 {passed}개 통과")
+    return "\n".join(lines)
+
+
+def write_report(path, script, reports):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"script": script["name"], "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                   "boards": reports}, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="테스트 시퀀스를 여러 보드에 실행")
+    parser.add_argument("script", help="JSON 시나리오 파일")
+    parser.add_argument("--port", action="append", required=True,
+                        help="보드 포트 (여러 번 쓰면 동시에 실행)")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--report", help="결과를 JSON으로 저장")
+    args = parser.parse_args(argv)
+
+    script = load_script(args.script)
+    links = []
+    reports = []
+    for port in args.port:
+        try:
+            links.append(PortLink(port, args.baud))
+        except Exception as e:
+            reports.append({"board": port, "passed": False, "steps": [], "error": f"포트 열기 실패: {e}"})
+    try:
+        reports = run_parallel(script, links) + reports
+    finally:
+        for link in links:
+            link.close()
+    print(format_report(script, reports))
+    if args.report:
+        write_report(args.report, script, reports)
+    return 0 if all(report["passed"] for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
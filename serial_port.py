@@ -0,0 +1,41 @@
+"""
+시리얼 포트 열기 (세 GUI 공통)
+
+    COM13, /dev/ttyACM0   실제 포트 (pyserial)
+    sim://?rate=50        가상 보드 (sim_board.py)
+    bridge://host:7010    포트를 공유하는 브리지에 붙기 (bridge.py)
+    socket://host:4001    시리얼 장치 서버 raw TCP (transports.py)
+    rfc2217://host:2217   시리얼 장치 서버 RFC 2217 (transports.py)
+
+TESTINGGUI_BAUD_NEGOTIATE=1 이면 연 다음 보드와 보드레이트를 올려봄 (baudrate.py)
+
+예전 명령(R00001, BTN1, LED1:ON ...)은 줄바꿈 없이 write 한 번이 명령 하나지만,
+여러 개를 이어서 보내는 프로토콜 명령(덤프/업로드 패킷)은 "\n"으로 끝남 (UART에서는 write 경계가 안 남고
+소켓 쪽은 여러 write가 한 세그먼트로 합쳐짐) - 펌웨어는 이 머리말이면 줄바꿈까지 모아서 처리.
+"""
+import os
+
+FRAMED_COMMANDS = ("FRD:", "UBEG", "UPK:", "UEND", "PING:", "BAUD?")  # Flash 덤프, 업로드, 보드레이트 협상
+
+
+def open_port(port, baudrate=115200, timeout=1):
+    if port.startswith("sim://"):
+        from sim_board import SimulatedBoard
+        ser = SimulatedBoard.from_url(port, timeout=timeout, baudrate=baudrate)
+    elif port.startswith("bridge://"):
+        # 보드레이트는 브리지가 정하므로 협상하지 않음
+        from bridge import BridgeClient
+        return BridgeClient.from_url(port, timeout=timeout)
+    elif port.startswith(("socket://", "rfc2217://")):
+        import transports
+        ser = transports.open_url(port, baudrate, timeout=timeout)
+    else:
+        # pyserial은 실제로 포트를 열 때 불러옴 (시작 시간 단축)
+        import serial
+        ser = serial.Serial(port, baudrate, timeout=timeout)
+
+    # raw TCP는 장치 서버 쪽 보드레이트를 바꿀 수 없어서 협상 안 함 (rfc2217은 가능)
+    if os.environ.get("TESTINGGUI_BAUD_NEGOTIATE") == "1" and not port.startswith("socket://"):
+        import baudrate as baud_negotiation
+        baud_negotiation.negotiate(ser, port)
+    return ser
@@ -0,0 +1,349 @@
+"""
+수신 이벤트를 SQLite에 저장 (세션 기록)
+
+콘솔 출력을 grep 하지 않고 "어젯밤 돌린 동안 ADC가 20 밑으로 내려간 값" 같은 걸 찾기 위함.
+TESTINGGUI_SESSION_DB=경로 (런처 --session-db) 이면 GUI를 켤 때마다 세션 하나를 만들고
+리더가 파싱한 이벤트를 모두 기록한다.
+
+- WAL 모드 + synchronous=NORMAL (GUI/조회 쪽이 쓰기 때문에 막히지 않음)
+- 리더 스레드는 큐에 넣기만 하고, 백그라운드 스레드가 모아서 한 트랜잭션에 executemany
+  (큐는 pipeline.NEVER_DROP 채널 - 기록은 버리지 않고, 가득 차면 리더가 기다림)
+- 인덱스: (session, t), (type, t), (session, type, t)
+- 기록 보기(testingGUI '기록' 탭)는 page()로 (t, rowid) 기준 keyset 페이지를 읽음
+  (OFFSET/COUNT 없이 인덱스에서 바로 찾아가서 5천만 줄이어도 한 페이지는 금방)
+- t는 벽시계 시각 (UNIX 초) - Event.t_ns(monotonic_ns)를 events.wall_time으로 변환
+
+    python session_store.py runs.db --type ADC --below 20 --since "2026-10-18 20:00"
+    python session_store.py runs.db --sessions
+    python session_store.py bench.db --bench          초당 1만 이벤트 저장 시험
+    python session_store.py big.db --fill 50000000    페이지 시험용 가짜 기록 채우기
+    python session_store.py big.db --page-bench       처음/중간/끝 페이지 읽는 시간
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+
+import events
+import metrics
+import pipeline
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    app TEXT,
+    port TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    session INTEGER NOT NULL,
+    t REAL NOT NULL,
+    type TEXT NOT NULL,
+    value INTEGER,
+    aux INTEGER,
+    aux2 INTEGER,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS events_session_t ON events (session, t);
+CREATE INDEX IF NOT EXISTS events_type_t ON events (type, t);
+CREATE INDEX IF NOT EXISTS events_session_type_t ON events (session, type, t);
+"""
+
+EVENTS_STORED = metrics.REGISTRY.counter("session_events_stored_total", "SQLite에 저장한 이벤트 수")
+WRITE_QUEUE = metrics.REGISTRY.gauge("session_write_queue", "저장 대기 중인 이벤트 수")
+COMMIT_SECONDS = metrics.REGISTRY.histogram("session_commit_seconds", "한 번에 모아 쓰는 트랜잭션 시간")
+
+
+def connect(path):
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+class SessionStore(threading.Thread):
+    """백그라운드 기록 스레드 - add()는 어느 스레드에서 불러도 됨"""
+
+    def __init__(self, path, app="", port="", batch=2000, interval=0.2):
+        super().__init__(name="session-store", daemon=True)
+        self.path = path
+        self.batch = batch
+        self.interval = interval
+        self.queue = pipeline.Channel("recorder", pipeline.RECORD_CAPACITY, pipeline.NEVER_DROP)
+        self.stop_event = threading.Event()
+        self.db = connect(path)
+        self.started = time.time()
+        with self.db:
+            self.session = self.db.execute(
+                "INSERT INTO sessions (started, app, port) VALUES (?, ?, ?)",
+                (self.started, app, port)).lastrowid
+        self.stored = 0
+
+    def add(self, event):
+        # 수신 시각(monotonic_ns)을 벽시계 epoch 초로 (REAL이라 us 이하까지 남음)
+        self.queue.put((self.session, events.wall_time(event.t_ns), event.name,
+                        event.value, event.aux, event.aux2, event.payload))
+
+    def add_batch(self, batch):
+        wall_time = events.wall_time
+        self.queue.put_many([(self.session, wall_time(event.t_ns), event.name,
+                              event.value, event.aux, event.aux2, event.payload) for event in batch])
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.stop_event.wait(self.interval)
+            self.flush()
+        self.flush()
+        self.db.close()
+
+    def flush(self):
+        while True:
+            rows = self.queue.get_all(self.batch)
+            if not rows:
+                break
+            self.write(rows)
+        WRITE_QUEUE.set(len(self.queue))
+
+    def write(self, rows):
+        started = time.monotonic()
+        with self.db:
+            self.db.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        COMMIT_SECONDS.observe(time.monotonic() - started)
+        EVENTS_STORED.inc(len(rows))
+        self.stored += len(rows)
+
+    def close(self):
+        self.stop_event.set()
+        self.join(timeout=5)
+        self.queue.close()
+
+
+STORE = None
+
+
+def start(app, port):
+    """TESTINGGUI_SESSION_DB가 있으면 세션 기록 시작"""
+    global STORE
+    path = os.environ.get("TESTINGGUI_SESSION_DB")
+    if not path or STORE is not None:
+        return STORE
+    import atexit
+    STORE = SessionStore(path, app=app, port=port)
+    STORE.start()
+    atexit.register(STORE.close)
+    print(f"[세션 기록] {path} 세션 {STORE.session}")
+    return STORE
+
+
+def record(event):
+    """리더 스레드에서 호출 - 기록을 안 켰으면 아무것도 안 함"""
+    if STORE is not None:
+        STORE.add(event)
+
+
+def record_batch(batch):
+    if STORE is not None:
+        STORE.add_batch(batch)
+
+
+def parse_time(text):
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"시각 형식: YYYY-MM-DD [HH:MM[:SS]] ({text})")
+
+
+def query(db, session=None, type=None, since=None, until=None, below=None, above=None, limit=1000):
+    """조건에 맞는 이벤트 (t, session, type, value, aux, aux2, payload)"""
+    where, args = [], []
+    for clause, value in (("session = ?", session), ("type = ?", type), ("t >= ?", since),
+                          ("t < ?", until), ("value < ?", below), ("value > ?", above)):
+        if value is not None:
+            where.append(clause)
+            args.append(value)
+    sql = "SELECT t, session, type, value, aux, aux2, payload FROM events"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY t LIMIT ?"
+    return db.execute(sql, args + [limit]).fetchall()
+
+
+def sessions(db):
+    """(id, started, app, port) 최근 세션부터"""
+    return db.execute("SELECT id, started, app, port FROM sessions ORDER BY id DESC").fetchall()
+
+
+def _page_query(db, session, type, since, until, after, before, limit):
+    where, args = [], []
+    for clause, value in (("session = ?", session), ("type = ?", type),
+                          ("t >= ?", since), ("t < ?", until)):
+        if value is not None:
+            where.append(clause)
+            args.append(value)
+    if after is not None:
+        where.append("(t, rowid) > (?, ?)")
+        args.extend(after)
+    if before is not None:
+        where.append("(t, rowid) < (?, ?)")
+        args.extend(before)
+    order = "DESC" if before is not None else "ASC"
+    sql = "SELECT rowid, t, type, value, aux, aux2, payload FROM events"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY t {order}, rowid {order} LIMIT ?"
+    return db.execute(sql, args + [limit]).fetchall()
+
+
+def page(db, session=None, types=None, since=None, until=None, after=None, before=None, limit=200):
+    """keyset 페이지 - after=(t, rowid) 다음 또는 before=(t, rowid) 이전 limit개 (항상 t 오름차순)
+
+    종류를 여러 개 고르면 종류마다 인덱스로 limit개씩 읽어서 합침
+    (type IN (...) 으로 한 번에 읽으면 정렬 때문에 전체를 훑을 수 있음).
+    """
+    if before is not None and after is not None:
+        raise ValueError("after와 before는 동시에 쓸 수 없음")
+    if not types:
+        rows = _page_query(db, session, None, since, until, after, before, limit)
+    elif len(types) == 1:
+        rows = _page_query(db, session, types[0], since, until, after, before, limit)
+    else:
+        import heapq
+        parts = [_page_query(db, session, type_, since, until, after, before, limit) for type_ in types]
+        rows = list(heapq.merge(*parts, key=lambda row: (row[1], row[0]), reverse=before is not None))[:limit]
+    if before is not None:
+        rows.reverse()
+    return rows
+
+
+def fill(path, count):
+    """페이지 시험용 가짜 기록 (세션 하나에 count개)"""
+    db = connect(path)
+    kinds = ("ADC", "ADC", "ADC", "TIM", "TIM", "RTC", "LED", "RGB", "TIMER", "0x90")
+    with db:
+        session = db.execute("INSERT INTO sessions (started, app, port) VALUES (?, ?, ?)",
+                             (time.time() - count / 1000, "fill", "fill")).lastrowid
+    t0 = time.time() - count / 1000
+    chunk = 100000
+    started = time.monotonic()
+    for first in range(0, count, chunk):
+        rows = [(session, t0 + i / 1000, kinds[i % 10], i % 100, i % 2, 0, str(i % 100))
+                for i in range(first, min(count, first + chunk))]
+        with db:
+            db.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        if first // chunk % 20 == 0:
+            print(f"{first + len(rows)}/{count} ({time.monotonic() - started:.0f}s)")
+    db.close()
+    return session
+
+
+def page_bench(path):
+    db = connect(path)
+    session = sessions(db)[0][0]
+    first, last = db.execute("SELECT MIN(t), MAX(t) FROM events WHERE session = ?", (session,)).fetchone()
+    for label, kwargs in (("처음", {}),
+                          ("중간", {"since": (first + last) / 2}),
+                          ("끝 (before)", {"before": (float("inf"), 0)}),
+                          ("중간 ADC", {"types": ["ADC"], "since": (first + last) / 2}),
+                          ("중간 TIM+RTC+0x90", {"types": ["TIM", "RTC", "0x90"], "since": (first + last) / 2})):
+        t = time.perf_counter()
+        rows = page(db, session=session, **kwargs)
+        # 이어서 다음(끝에서는 이전) 페이지 (keyset)
+        if "before" in kwargs:
+            rows = page(db, session=session, before=(rows[0][1], rows[0][0]))
+        else:
+            rows = page(db, session=session, types=kwargs.get("types"), after=(rows[-1][1], rows[-1][0]))
+        print(f"{label:<20} 2페이지 {len(rows)}줄 {(time.perf_counter() - t) * 1000:.2f} ms")
+    db.close()
+
+
+def bench(path, rate, seconds):
+    """rate 이벤트/초로 넣으면서 '메인 스레드'가 얼마나 막히는지 확인"""
+    if os.path.exists(path):
+        os.remove(path)
+    store = SessionStore(path, app="bench", port="bench")
+    store.start()
+    event = events.parse_line("ADC:42", 0)
+    laps = []
+    produced = 0
+    started = time.monotonic()
+    end = started + seconds
+    while time.monotonic() < end:
+        lap = time.monotonic()
+        # 10ms마다 그동안 들어왔어야 할 만큼 넣음 (리더 스레드 흉내)
+        due = int((lap - started) * rate)
+        while produced < due:
+            event.t_ns = time.monotonic_ns()
+            event.value = produced % 100
+            event.payload = str(event.value)
+            store.add(event)
+            produced += 1
+        time.sleep(0.01)
+        laps.append(time.monotonic() - lap)
+    put_done = time.monotonic()
+    store.close()
+    drained = time.monotonic() - put_done
+    laps.sort()
+    db = connect(path)
+    count = db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    t0 = time.perf_counter()
+    low = len(query(db, type="ADC", below=20, limit=10 ** 9))
+    query_ms = (time.perf_counter() - t0) * 1000
+    db.close()
+    print(f"목표 {rate:.0f} 이벤트/s, {seconds:.0f}초: 저장 {count}개 ({count / seconds:.0f}/s), "
+          f"종료 시 남은 큐 처리 {drained * 1000:.0f} ms")
+    print(f"메인 루프(10ms sleep) p50 {laps[len(laps) // 2] * 1000:.1f} ms, "
+          f"p99 {laps[int(len(laps) * 0.99)] * 1000:.1f} ms, max {laps[-1] * 1000:.1f} ms")
+    print(f"커밋 {COMMIT_SECONDS.count}번, p50 {COMMIT_SECONDS.quantile(0.5) * 1000:.1f} ms, "
+          f"p99 {COMMIT_SECONDS.quantile(0.99) * 1000:.1f} ms")
+    print(f"조회 ADC < 20: {low}개 {query_ms:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="세션 기록 조회")
+    parser.add_argument("db")
+    parser.add_argument("--sessions", action="store_true", help="세션 목록")
+    parser.add_argument("--session", type=int)
+    parser.add_argument("--type", help="메시지 종류 (ADC, LED, TIM ...)")
+    parser.add_argument("--since", type=parse_time)
+    parser.add_argument("--until", type=parse_time)
+    parser.add_argument("--below", type=int, help="value < 값")
+    parser.add_argument("--above", type=int, help="value > 값")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--bench", action="store_true", help="저장 속도 시험 (db 파일을 새로 만듦)")
+    parser.add_argument("--rate", type=float, default=10000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--fill", type=int, metavar="N", help="가짜 기록 N개로 세션 하나 채우기")
+    parser.add_argument("--page-bench", action="store_true", help="keyset 페이지 읽기 시간")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args.db, args.rate, args.seconds)
+        return 0
+    if args.fill:
+        fill(args.db, args.fill)
+        return 0
+    if args.page_bench:
+        page_bench(args.db)
+        return 0
+    db = connect(args.db)
+    if args.sessions:
+        for session, started, app, port, count in db.execute(
+                "SELECT s.id, s.started, s.app, s.port, "
+                "(SELECT COUNT(*) FROM events e WHERE e.session = s.id) FROM sessions s ORDER BY s.id"):
+            print(f"{session:5d}  {datetime.fromtimestamp(started):%Y-%m-%d %H:%M:%S}  {app:<10} {port:<20} {count}개")
+        return 0
+    for t, session, type_, value, aux, aux2, payload in query(
+            db, args.session, args.type, args.since, args.until, args.below, args.above, args.limit):
+        stamp = datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        print(f"{stamp}  #{session}  {type_:<6} {value:6d}  {payload}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""
+별도 프로세스 리더 + 공유 메모리 링 버퍼
+
+메시지가 많으면 리더 스레드와 Qt 메인 스레드가 GIL을 두고 다퉈서 그리기가 끊기고
+읽기가 밀린다. TESTINGGUI_READER=process (런처 --reader process) 이면
+포트 읽기 + 디코드 + 파싱(events.parse_line)을 자식 프로세스에서 하고,
+결과를 multiprocessing.shared_memory 링 버퍼에 고정 크기 레코드로 넣는다.
+GUI 쪽은 같은 메모리를 열어 head/tail만 보고 한 번에 여러 개 꺼냄 (pickle 없음).
+
+    헤더 (u64 x 80)  head(자식만 씀) / tail(GUI만 씀) / 용량 / 카운터들 / 종류별 줄 수 /
+                     종류별 순번 통계 (integrity.Tracker - 자식이 2ms마다 복사)
+    레코드 (384 B)   t_ns i8, kind u1, value/aux/aux2 i4, 줄 길이 u2, payload 위치 u2, 줄(utf-8)
+
+생산자 하나 / 소비자 하나라서 잠금 없이 head/tail 인덱스만으로 동작.
+레코드를 다 쓴 뒤에 head를 올리므로 GUI는 완성된 레코드만 봄.
+링이 가득 차면 새 줄은 버리고 dropped를 올림 (리더가 막히지 않게).
+명령 전송(쓰기)은 양이 적어서 multiprocessing.Queue로 자식에게 넘김.
+
+    python shm_reader.py --bench           스레드 모드 / 프로세스 모드 비교
+"""
+import os
+import sys
+import time
+import struct
+import argparse
+
+import events
+import integrity
+import metrics
+
+ENABLED = os.environ.get("TESTINGGUI_READER") == "process"
+
+HEADER = struct.Struct("<80Q")
+HEAD, TAIL, CAPACITY, DROPPED, BYTES, LINES, MANGLED, EMPTY, FAILURES, ALIVE = range(10)
+PARTIAL, CORRUPT, UNSEQUENCED, RESETS = range(10, 14)
+KIND_COUNTS = 16  # 16 + kind 위치에 종류별 줄 수
+# integrity.TYPES 순서로 종류별 순번 통계
+SEQ_COUNTS, LOST_COUNTS, OUT_OF_ORDER_COUNTS = (32 + i * len(integrity.TYPES) for i in range(3))
+RECORD = struct.Struct("<qBiiiHH")
+RECORD_SIZE = 384
+LINE_MAX = RECORD_SIZE - RECORD.size
+
+DROPPED_LINES = metrics.REGISTRY.counter("shm_ring_dropped_total", "링 버퍼가 가득 차서 버린 줄 수")
+RING_FILL = metrics.REGISTRY.gauge("shm_ring_fill", "링 버퍼에 쌓인 레코드 수")
+
+
+class RingBuffer:
+    """공유 메모리 링 버퍼 (생산자 1, 소비자 1)"""
+
+    def __init__(self, shm, create=False, capacity=0):
+        self.shm = shm
+        self.header = shm.buf[:HEADER.size].cast("Q")
+        self.data = shm.buf[HEADER.size:]
+        if create:
+            for i in range(len(self.header)):
+                self.header[i] = 0
+            self.header[CAPACITY] = capacity
+        self.capacity = self.header[CAPACITY]
+
+    @classmethod
+    def create(cls, capacity=8192):
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(create=True, size=HEADER.size + capacity * RECORD_SIZE)
+        return cls(shm, create=True, capacity=capacity)
+
+    @classmethod
+    def attach(cls, name):
+        from multiprocessing import shared_memory
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def push(self, event):
+        head = self.header[HEAD]
+        if head - self.header[TAIL] >= self.capacity:
+            self.header[DROPPED] += 1
+            return False
+        line = event.line.encode("utf-8")[:LINE_MAX]
+        offset = (head % self.capacity) * RECORD_SIZE
+        payload_at = len(event.line) - len(event.payload)
+        RECORD.pack_into(self.data, offset, event.t_ns, event.kind, event.value, event.aux, event.aux2,
+                         len(line), payload_at)
+        start = offset + RECORD.size
+        self.data[start:start + len(line)] = line
+        self.header[HEAD] = head + 1  # 레코드를 다 쓴 다음에 공개
+        return True
+
+    def pop_batch(self, limit=512):
+        head = self.header[HEAD]
+        tail = self.header[TAIL]
+        end = min(head, tail + limit)
+        batch = []
+        for index in range(tail, end):
+            offset = (index % self.capacity) * RECORD_SIZE
+            t_ns, kind, value, aux, aux2, length, payload_at = RECORD.unpack_from(self.data, offset)
+            start = offset + RECORD.size
+            line = bytes(self.data[start:start + length]).decode("utf-8", errors="ignore")
+            batch.append(events.Event(t_ns, kind, value, aux, aux2, line[payload_at:], line))
+        self.header[TAIL] = end
+        return batch
+
+    def fill(self):
+        return self.header[HEAD] - self.header[TAIL]
+
+    def close(self, unlink=False):
+        self.header.release()
+        self.data.release()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def reader_main(ring_name, port, baudrate, commands, stop):
+    """자식 프로세스: 포트 읽기 + 파싱 -> 링 버퍼"""
+    import queue
+    import serial_port
+    ring = RingBuffer.attach(ring_name)
+    header = ring.header
+    tracker = integrity.Tracker()
+    ser = None
+    next_check = 0.0
+    try:
+        ser = serial_port.open_port(port, baudrate, timeout=0.05)
+        header[ALIVE] = 1
+        while True:
+            # 명령 대기열/종료 확인은 비싸서 (잠금 + 파이프) 2ms에 한 번만
+            now = time.monotonic()
+            if now >= next_check:
+                next_check = now + 0.002
+                export_integrity(tracker, header)
+                if stop.is_set():
+                    break
+                try:
+                    while True:
+                        ser.write(commands.get_nowait())
+                except queue.Empty:
+                    pass
+            raw = ser.readline()
+            if not raw:
+                continue
+            received = time.monotonic_ns()  # 시스템 전체 시계라 GUI 프로세스에서도 그대로 씀
+            header[BYTES] += len(raw)
+            header[LINES] += 1
+            try:
+                data = raw.decode("utf-8").strip()
+            except UnicodeDecodeError:
+                header[MANGLED] += 1
+                data = raw.decode("utf-8", errors="ignore").strip()
+            if not data:
+                header[EMPTY] += 1
+                continue
+            event = tracker.parse(raw, data, received)
+            if event is None:
+                continue  # 체크섬 오류 (tracker가 셈)
+            header[KIND_COUNTS + event.kind] += 1
+            ring.push(event)
+            header[FAILURES] = metrics.PARSE_FAILURES.value  # parse_line이 이 프로세스 metrics에 셈
+    finally:
+        export_integrity(tracker, header)
+        header[ALIVE] = 0
+        if ser is not None:
+            ser.close()
+        ring.close()
+
+
+def export_integrity(tracker, header):
+    header[PARTIAL] = tracker.partial
+    header[CORRUPT] = tracker.corrupt
+    header[UNSEQUENCED] = tracker.unsequenced
+    header[RESETS] = tracker.resets
+    for base, counts in ((SEQ_COUNTS, tracker.seq_counts), (LOST_COUNTS, tracker.lost),
+                         (OUT_OF_ORDER_COUNTS, tracker.out_of_order)):
+        for index, value in enumerate(counts):
+            header[base + index] = value
+
+
+class ProcessReader:
+    """GUI 프로세스 쪽 - 시리얼 객체 대신 쓸 수 있게 write/is_open/close 제공"""
+
+    def __init__(self, port, baudrate=115200, capacity=8192):
+        self.port = port
+        self.baudrate = baudrate
+        self.capacity = capacity
+        self.ring = None
+        self.process = None
+        self.commands = None
+        self.stop_event = None
+        self.seen = [0] * (HEADER.size // 8)  # 자식 카운터 중 이미 metrics에 더한 값
+
+    def start(self):
+        import multiprocessing
+        # Qt 스레드가 여럿 도는 프로세스에서 fork하면 자식이 잠긴 잠금을 물려받을 수 있어서 spawn
+        context = multiprocessing.get_context("spawn")
+        self.ring = RingBuffer.create(self.capacity)
+        self.commands = context.Queue()
+        self.stop_event = context.Event()
+        self.process = context.Process(
+            target=reader_main, name="serial-reader", daemon=True,
+            args=(self.ring.name, self.port, self.baudrate, self.commands, self.stop_event))
+        self.process.start()
+        print(f"[리더 프로세스] pid {self.process.pid}, 링 {self.capacity} x {RECORD_SIZE} B")
+
+    @property
+    def is_open(self):
+        """자식이 포트를 열었고 아직 살아 있음 (포트 열기 실패/뽑힘이면 자식이 끝남)"""
+        return self.process is not None and self.process.is_alive() and self.ring.header[ALIVE] == 1
+
+    @property
+    def in_waiting(self):
+        return self.ring.fill() if self.ring is not None else 0
+
+    def write(self, data):
+        self.commands.put(bytes(data))
+        return len(data)
+
+    def read_batch(self, limit=512):
+        if self.ring is None:
+            return []  # 이미 닫힘 (다른 스레드에서 stop)
+        alive = self.process.is_alive()  # 링을 비우기 전에 봐야 자식이 마지막에 넣은 줄까지 꺼냄
+        batch = self.ring.pop_batch(limit)
+        self.sync_metrics()
+        if not batch and not alive:
+            # 포트를 못 열었거나 읽다가 죽음 - 연결 스레드가 오류로 보고하고 정리하게
+            raise OSError(f"리더 프로세스가 끝남 (종료 코드 {self.process.exitcode})")
+        return batch
+
+    def sync_metrics(self):
+        """자식 프로세스의 카운터를 이 프로세스 metrics로 옮김"""
+        header = self.ring.header
+        for index, counter in ((BYTES, metrics.BYTES_READ), (LINES, metrics.LINES_READ),
+                               (MANGLED, metrics.LINES_MANGLED), (EMPTY, metrics.LINES_EMPTY),
+                               (FAILURES, metrics.PARSE_FAILURES), (DROPPED, DROPPED_LINES),
+                               (PARTIAL, integrity.PARTIAL), (CORRUPT, integrity.CORRUPT),
+                               (UNSEQUENCED, integrity.UNSEQUENCED), (RESETS, integrity.RESETS)):
+            value = header[index]
+            if value != self.seen[index]:
+                counter.inc(value - self.seen[index])
+                self.seen[index] = value
+        for kind, name in enumerate(events.KIND_NAMES):
+            index = KIND_COUNTS + kind
+            value = header[index]
+            if value != self.seen[index]:
+                metrics.lines_by_type(name).inc(value - self.seen[index])
+                self.seen[index] = value
+        for base, counter in ((SEQ_COUNTS, integrity.sequenced_by_type), (LOST_COUNTS, integrity.lost_by_type),
+                              (OUT_OF_ORDER_COUNTS, integrity.out_of_order_by_type)):
+            for offset, name in enumerate(integrity.TYPES):
+                index = base + offset
+                value = header[index]
+                if value != self.seen[index]:
+                    counter(name).inc(value - self.seen[index])
+                    self.seen[index] = value
+        RING_FILL.set(self.ring.fill())
+
+    def close(self):
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        self.stop_event.set()
+        process.join(timeout=2)
+        if process.is_alive():
+            process.terminate()
+        self.sync_metrics()
+        ring, self.ring = self.ring, None
+        ring.close(unlink=True)
+        print("[리더 프로세스] 종료")
+
+
+def bench_gui_work(duration, consume):
+    """GUI 스레드 흉내: 5ms짜리 CPU 작업(그리기) + consume() 반복, 한 바퀴 시간 기록"""
+    laps = []
+    received = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        started = time.perf_counter()
+        spin = started + 0.005
+        x = 0
+        while time.perf_counter() < spin:
+            x += 1
+        received += consume()
+        laps.append(time.perf_counter() - started)
+    laps.sort()
+    return received, laps
+
+
+def bench(rate, duration):
+    import threading
+    import serial_port
+    port = f"sim://?rate={rate}&seed=1"
+    results = []
+
+    # 1) 지금 방식: 같은 프로세스의 리더 스레드
+    pending = []
+    stop = threading.Event()
+
+    def thread_reader():
+        ser = serial_port.open_port(port, 115200, timeout=0.05)
+        while not stop.is_set():
+            raw = ser.readline()
+            if raw:
+                data = raw.decode("utf-8", errors="ignore").strip()
+                pending.append(events.parse_line(data, time.monotonic_ns()))
+        ser.close()
+
+    def take_thread():
+        count = len(pending)
+        del pending[:count]
+        return count
+
+    reader = threading.Thread(target=thread_reader, daemon=True)
+    reader.start()
+    time.sleep(0.2)
+    results.append(("thread",) + bench_gui_work(duration, take_thread))
+    stop.set()
+    reader.join()
+
+    # 2) 별도 프로세스 + 공유 메모리
+    process_reader = ProcessReader(port)
+    process_reader.start()
+    time.sleep(0.5)
+    process_reader.read_batch(1 << 20)
+    results.append(("process",) + bench_gui_work(duration, lambda: len(process_reader.read_batch(4096))))
+    process_reader.close()
+
+    print(f"가상 보드 {rate} msg/s, {duration:.0f}초, GUI 작업 5ms/바퀴")
+    print(f"{'모드':<8} {'받은 이벤트/s':>14} {'바퀴 p50':>10} {'p99':>8} {'max':>8}")
+    for mode, received, laps in results:
+        p50 = laps[len(laps) // 2] * 1000
+        p99 = laps[min(len(laps) - 1, int(len(laps) * 0.99))] * 1000
+        print(f"{mode:<8} {received / duration:14.0f} {p50:9.2f}ms {p99:7.2f}ms {laps[-1] * 1000:7.2f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="리더 프로세스 / 링 버퍼 벤치마크")
+    parser.add_argument("--bench", action="store_true", help="스레드 모드와 프로세스 모드 비교")
+    parser.add_argument("--rate", type=float, default=20000, help="가상 보드 초당 메시지 수")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+    bench(args.rate, args.seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+가상 STM32 보드
+
+실제 보드 없이 GUI를 돌려보기 위한 시리얼 흉내 객체.
+pyserial Serial에서 GUI가 쓰는 부분(readline / write / in_waiting / is_open / close)만 구현.
+
+    python launcher.py another2 --port "sim://?rate=50"
+
+URL 옵션
+    rate   초당 보내는 메시지 수 (기본 20)
+    speed  시간 배속 (기본 1, 타이머/RTC 값이 이 배속으로 흘러감)
+    seed   난수 시드
+    drift  보드 RTC가 더 빨리/느리게 가는 정도 (ppm)
+    skew   보드 RTC 초기 오차 (초)
+    corrupt  Flash 덤프 응답을 망가뜨리거나 업로드 패킷을 NAK할 확률 (0~1)
+    max_baud 이 속도보다 빠르면 PING 응답이 깨짐 (보드레이트 협상 시험용)
+    seq      1이면 줄마다 종류별 순번을 붙임 ("ADC:75#12", integrity.py)
+    checksum 1이면 순번 뒤에 XOR 체크섬도 ("ADC:75#12*5A")
+    drop     줄을 (순번은 쓴 채로) 안 보낼 확률 (0~1)
+    garble   줄 중간 바이트가 빠질 확률 (0~1, 버퍼 넘침 흉내)
+    timer    stream(기본): TIM/TIMER 값을 계속 보냄, sync: 시작/멈춤/기준점만 (timer_sync.py)
+    anchor   timer=sync일 때 기준점 간격 (보드 시간 초, 기본 30)
+"""
+import time
+import random
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qs
+
+from serial_port import FRAMED_COMMANDS
+
+
+class SimulatedBoard:
+    def __init__(self, rate=20.0, speed=1.0, seed=None, timeout=1.0, baudrate=115200,
+                 drift=0.0, skew=0.0, corrupt=0.0, max_baud=921600, seq=False, checksum=False,
+                 drop=0.0, garble=0.0, timer="stream", anchor=30.0):
+        self.rate = float(rate)
+        self.speed = float(speed)
+        self.timeout = timeout
+        self.baudrate = baudrate
+        self.is_open = True
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.replies = deque()  # 명령에 대한 즉시 응답
+        self.started = time.monotonic()
+        self.next_due = self.started
+        self.timer_running = True
+        self.timer_base = 0.0  # 보드 시간 기준 타이머 시작점
+        self.led = [False] * 4
+        self.written = bytearray()
+        # 보드 RTC: 마지막으로 맞춘 시각 + 그 뒤 흐른 시간 * (1 + drift)
+        self.drift = float(drift) * 1e-6
+        self.rtc_set_wall = datetime.now() + timedelta(seconds=float(skew))
+        self.rtc_set_mono = self.started
+        self.corrupt = float(corrupt)
+        self.max_baud = int(max_baud)
+        self.board_baud = baudrate
+        # 업로드 받은 데이터
+        self.upload = None  # (이름, 길이, crc, {순번: 데이터})
+        self.uploads = {}
+        # 순번 / 손실 흉내
+        self.seq = seq
+        self.checksum = checksum
+        self.drop = float(drop)
+        self.garble = float(garble)
+        self.seq_counters = {}
+        # 타이머 동기 모드 - 값 대신 START/STOP/SYNC 기준점만
+        self.timer_sync = timer == "sync"
+        self.anchor_every = float(anchor)
+        self.next_anchor = None  # 첫 기준점은 START
+
+    @classmethod
+    def from_url(cls, url, timeout=1.0, baudrate=115200):
+        query = parse_qs(urlsplit(url).query)
+        options = {key: values[-1] for key, values in query.items()}
+        return cls(rate=float(options.get("rate", 20)),
+                   speed=float(options.get("speed", 1)),
+                   seed=options.get("seed"),
+                   timeout=timeout, baudrate=baudrate,
+                   drift=float(options.get("drift", 0)),
+                   skew=float(options.get("skew", 0)),
+                   corrupt=float(options.get("corrupt", 0)),
+                   max_baud=int(options.get("max_baud", 921600)),
+                   seq=options.get("seq") == "1", checksum=options.get("checksum") == "1",
+                   drop=float(options.get("drop", 0)), garble=float(options.get("garble", 0)),
+                   timer=options.get("timer", "stream"), anchor=float(options.get("anchor", 30)))
+
+    # 보드 쪽 시간 (speed 배속)
+    def board_elapsed(self):
+        return (time.monotonic() - self.started) * self.speed
+
+    def board_now(self):
+        elapsed = (time.monotonic() - self.rtc_set_mono) * self.speed * (1 + self.drift)
+        return self.rtc_set_wall + timedelta(seconds=elapsed)
+
+    def set_rtc(self, wall):
+        self.rtc_set_wall = wall
+        self.rtc_set_mono = time.monotonic()
+
+    def timer_anchors(self, anchor):
+        """타이머 동기 모드 기준점 (another2 TIM, testingGUI TIMER 둘 다)"""
+        ms = int((self.board_elapsed() - self.timer_base) * 1000) if self.timer_running else 0
+        return [f"TIM:{anchor},{ms}", f"TIMER:{anchor},{ms}"]
+
+    def due_anchors(self):
+        elapsed = self.board_elapsed()
+        if self.next_anchor is None:
+            self.next_anchor = elapsed + self.anchor_every
+            return self.timer_anchors("START" if self.timer_running else "STOP")
+        if elapsed < self.next_anchor:
+            return []
+        self.next_anchor = elapsed + self.anchor_every
+        return self.timer_anchors("SYNC") if self.timer_running else []
+
+    def next_message(self):
+        """주기적으로 흘러나오는 메시지 하나 (세 GUI 형식 모두 섞어서 보냄)"""
+        elapsed = self.board_elapsed()
+        kind = self.random.random()
+        if self.timer_sync and 0.35 <= kind < 0.65:
+            kind = 0.0  # 타이머 값 자리는 ADC로 (기준점은 due_anchors에서 따로)
+        if kind < 0.35:
+            value = int(50 + 45 * self.random.uniform(-1, 1))
+            return f"ADC:{value}"
+        if kind < 0.55:
+            seconds = int(elapsed - self.timer_base) if self.timer_running else 0
+            return f"TIM:{(seconds // 60) % 100:02d}{seconds % 60:02d}"
+        if kind < 0.65:
+            seconds = int(elapsed - self.timer_base)
+            return f"TIMER:{(seconds // 60) % 100:02d}:{seconds % 60:02d}"
+        if kind < 0.75:
+            return f"RTC:{self.board_now().strftime('%M%S')}"
+        if kind < 0.80:
+            return f"TIME:{self.board_now().strftime('%H:%M')}"
+        if kind < 0.90:
+            index = self.random.randrange(4)
+            self.led[index] = not self.led[index]
+            state = "ON" if self.led[index] else "OFF"
+            if self.random.random() < 0.5:
+                return f"LED:{index + 1},{state}"
+            return f"LED{index + 1}:{state}"
+        if kind < 0.97:
+            return f"RGB:{self.random.randrange(256)},{self.random.randrange(256)},{self.random.randrange(256)}"
+        return "0x90 ID - Manufacturer: EF, Device: 17"
+
+    @staticmethod
+    def flash_bytes(offset, length):
+        """가상 Flash 내용 (위치로 정해지는 패턴)"""
+        return bytes(((offset + i) * 131 + ((offset + i) >> 8)) & 0xFF for i in range(length))
+
+    def receive_upload(self, command):
+        import zlib
+        from bulkupload import decode_packet
+        if command.startswith("UBEG:"):
+            name, size, crc = command[5:].split(",")
+            self.upload = (name, int(size), int(crc, 16), {})
+            return ["UOK:BEG"]
+        if self.upload is None:
+            return ["UERR:no transfer"]
+        name, size, crc, packets = self.upload
+        if command.startswith("UPK:"):
+            try:
+                seq, data = decode_packet(command)
+            except ValueError:
+                return []
+            if data is None or self.random.random() < self.corrupt:
+                return [f"UNAK:{seq}"]
+            packets[seq] = data
+            return [f"UACK:{seq}"]
+        # UEND
+        data = b"".join(packets[i] for i in sorted(packets))
+        self.upload = None
+        if len(data) != size or zlib.crc32(data) != crc:
+            return ["UERR:crc mismatch"]
+        self.uploads[name] = data
+        return [f"UOK:END,{crc:08X}"]
+
+    def reply_to(self, command):
+        """명령에 대한 응답 (펌웨어 동작 흉내)"""
+        if command[:4] in ("UBEG", "UPK:", "UEND"):
+            return self.receive_upload(command)
+        if command.startswith("BAUD?"):
+            self.board_baud = int(command[5:])
+            return [f"BAUD:OK,{self.board_baud},SIM0001"]
+        if command.startswith("PING:"):
+            if self.baudrate != self.board_baud or self.baudrate > self.max_baud:
+                return ["PONG:\ufffd\ufffd"]  # 속도가 안 맞거나 너무 빨라서 깨진 응답
+            return ["PONG:" + command[5:]]
+        if command.startswith("FRD:"):
+            from flashdump import encode_chunk
+            offset_text, length_text = command[4:].split(",")
+            offset = int(offset_text, 16)
+            line = encode_chunk(offset, self.flash_bytes(offset, int(length_text)))
+            if self.random.random() < self.corrupt:
+                line = line[:len(line) // 2]  # 중간에 잘린 줄
+            return [line]
+        if command.startswith("BTN1") or command == "RTC?":
+            return [f"RTC:{self.board_now().strftime('%M%S')}"]
+        if command == "R00005":
+            return [f"TIME:{self.board_now().strftime('%H:%M')}"]
+        if len(command) == 4 and command.isdigit():
+            # another2 시각 설정 (%M%S)
+            self.set_rtc(self.board_now().replace(minute=int(command[:2]) % 60,
+                                                  second=int(command[2:]) % 60, microsecond=0))
+            return []
+        if len(command) == 6 and command[0] == "T" and command[3] == ":":
+            # testingGUI 시각 설정 (T%H:%M)
+            self.set_rtc(self.board_now().replace(hour=int(command[1:3]) % 24,
+                                                  minute=int(command[4:6]) % 60, second=0, microsecond=0))
+            return []
+        if command.startswith("BTN2") or command == "R00002":
+            self.timer_running = not self.timer_running
+            self.timer_base = self.board_elapsed()
+            if self.timer_sync:
+                self.next_anchor = self.board_elapsed() + self.anchor_every
+                return self.timer_anchors("START" if self.timer_running else "STOP")
+            return ["TIM:0000"]
+        if command.startswith("BTN3"):
+            return ["0x90 ID - Manufacturer: EF, Device: 17"]
+        if command.startswith("BTN4") or command == "R00001":
+            return [f"ADC:{self.random.randrange(101)}"]
+        if command == "R00004":
+            self.led = [False] * 4
+            return [f"LED{i + 1}:OFF" for i in range(4)]
+        if command.startswith("LED") and ":" in command:
+            return [command]
+        if command.startswith("RGB:") or command.startswith("SEG:"):
+            return [command]
+        return []
+
+    def frame(self, line):
+        """보낼 줄에 순번/체크섬을 붙이고 drop/garble 확률로 빼거나 망가뜨림 (None이면 안 보냄)"""
+        if self.seq:
+            # 종류 = 머리말 (LED1~4는 하나로) - 호스트 integrity.type_key와 같은 구분
+            from integrity import type_key
+            key = type_key(line)
+            number = self.seq_counters.get(key, 0)
+            self.seq_counters[key] = (number + 1) % 65536
+            line = f"{line}#{number}"
+            if self.checksum:
+                from integrity import checksum
+                line = f"{line}*{checksum(line):02X}"
+        if self.drop and self.random.random() < self.drop:
+            return None
+        if self.garble and self.random.random() < self.garble and len(line) > 2:
+            start = self.random.randrange(1, len(line) - 1)
+            line = line[:start] + line[start + self.random.randint(1, len(line) - start):]
+        return (line + "\r\n").encode()
+
+    # pyserial 흉내
+    @property
+    def in_waiting(self):
+        with self.lock:
+            if self.replies:
+                return len(self.replies[0])
+        return 1 if time.monotonic() >= self.next_due else 0
+
+    def readline(self):
+        deadline = time.monotonic() + (self.timeout if self.timeout is not None else 1e9)
+        while self.is_open:
+            with self.lock:
+                if self.replies:
+                    return self.replies.popleft()
+            now = time.monotonic()
+            if now >= self.next_due:
+                if self.timer_sync:
+                    anchors = [self.frame(line) for line in self.due_anchors()]
+                    if anchors:
+                        with self.lock:
+                            self.replies.extend(data for data in anchors if data is not None)
+                        continue
+                self.next_due = max(self.next_due + 1.0 / self.rate, now - 1.0)
+                data = self.frame(self.next_message())
+                if data is not None:
+                    return data
+                continue
+            if now >= deadline:
+                return b""
+            time.sleep(min(self.next_due, deadline) - now)
+        return b""
+
+    def write(self, data):
+        if not self.is_open:
+            raise OSError("simulated port is closed")
+        self.written += data
+        # 펌웨어처럼 줄바꿈으로 나눔 - 프로토콜 명령(FRD: ...)은 줄바꿈까지 기다리고,
+        # 줄바꿈 없는 예전 명령(another2/testingGUI)은 write 한 번을 명령 하나로 봄
+        *lines, rest = bytes(self.written).split(b"\n")
+        self.written.clear()
+        rest_text = rest.decode("utf-8", errors="ignore").strip()
+        if rest_text.startswith(FRAMED_COMMANDS):
+            self.written += rest
+        elif rest_text:
+            lines.append(rest)
+        with self.lock:
+            for raw in lines:
+                text = raw.decode("utf-8", errors="ignore").strip()
+                if not text:
+                    continue
+                for line in self.reply_to(text):
+                    framed = self.frame(line)
+                    if framed is not None:
+                        self.replies.append(framed)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        with self.lock:
+            self.replies.clear()
+        self.next_due = time.monotonic()
+
+    def close(self):
+        self.is_open = False
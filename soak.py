@@ -0,0 +1,279 @@
+"""
+장시간 소크(soak) 시험 - 가상 보드를 실제보다 몇백 배 빠르게 돌려서 메모리 증가 찾기
+
+며칠 돌려야 보이던 누수(QTextEdit 로그, 쌓이는 시그널, command_queue 등)를 몇 분 안에 보려고
+가상 보드(sim://)가 --rate 줄/초로 쏟아내고 버튼 명령도 같은 배속으로 보낸다.
+"시뮬레이션 시간" = 지금까지 읽은 줄 수 / --real-rate (실제 보드가 초당 보내는 줄 수).
+
+--sample-s 마다 GUI 스레드에서
+    RSS (/proc/self/statm), 파이썬 힙 (tracemalloc), Qt 객체 수 (창 아래 QObject 전부),
+    gc 객체 수, 앱별 컨테이너 크기 (testingGUI 로그 줄 수, command_queue 길이 등)
+를 재고, 예열(--warmup) 이후 표본으로 시뮬레이션 1시간당 기울기(최소제곱)를 구해서
+--max-*-per-hour 를 넘으면 종료 코드 1.
+
+    python soak.py --app another2 --hours 24
+    python soak.py --app testingGUI --hours 24 --max-minutes 5 --report soak_tg.json
+    python soak.py --app another --max-heap-mb-per-hour 0.5 --trace-frames 10
+
+결과: --report JSON (표본 + 기울기 + 판정) 과 같은 이름의 .sites.txt
+(예열 끝 스냅숏 대비 할당 위치별로 늘어난 메모리, 큰 순서).
+리더 속도가 --rate를 못 따라가면 (another는 poll당 한 줄, testingGUI는 1초에 한 줄)
+목표 시간을 다 못 채우고 --max-minutes에서 끝나며, 실제로 채운 시뮬레이션 시간을 출력한다.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import importlib
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+APPS = {"another2": "PyQt5", "another": "PyQt5", "testingGUI": "PySide6"}
+# 실제 보드에서 사람이 누르는 정도의 명령 (앱마다 펌웨어 명령이 다름)
+COMMANDS = {
+    "another2": ["BTN1", "BTN2", "BTN3", "BTN4", "RGB:10,20,30", "SEG:1234"],
+    "another": ["BTN1", "BTN4", "RGB:10,20,30", "SEG:1234"],
+    "testingGUI": ["R00001", "R00002", "R00004", "R00005"],
+}
+BASE_KEYS = ("wall_s", "sim_h", "progress")
+SHOWN_KEYS = ("rss", "heap", "qobjects", "gc_objects")
+# 예열 뒤 구간 전체에서 이만큼도 안 늘었으면 기울기가 커도 잡음으로 봄 (짧게 돌릴 때 1~2개 출렁임)
+FLOORS = {"rss": 2e6, "heap": 256e3, "qobjects": 2, "gc_objects": 500}
+DEFAULT_FLOOR = 20
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        # /proc가 없으면 최대 RSS로 대신 (줄어들지는 않지만 증가는 보임)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def qt_object_count(qt_app, QObject):
+    return sum(len(widget.findChildren(QObject)) + 1 for widget in qt_app.topLevelWidgets())
+
+
+def probes(app, window):
+    """앱별로 커질 수 있는 것들"""
+    found = {}
+    if app == "testingGUI":
+        found["log_blocks"] = window.text_edit.document().blockCount()
+        found["command_queue"] = len(window.serial_worker.command_queue)
+        feed = window.serial_worker.feed
+    else:
+        feed = window.board_link.feed
+    found["feed_log"] = len(feed.log)
+    found["render_pending"] = len(window.render_gate.pending)
+    return found
+
+
+def slope(points):
+    """최소제곱 기울기 (x, y) - 표본이 두 개 미만이면 0"""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+class Soak:
+    def __init__(self, args):
+        self.args = args
+        self.app = args.app
+        self.speedup = args.rate / args.real_rate  # 리더가 따라가면 이만큼 빨리 감
+        self.module = importlib.import_module(self.app)
+        qt = APPS[self.app]
+        self.QObject = importlib.import_module(f"{qt}.QtCore").QObject
+        self.qt_app = self.module.QApplication.instance() or self.module.QApplication([])
+        self.samples = []
+        self.baseline = None  # 예열 끝 tracemalloc 스냅숏
+        self.command_index = 0
+        self.started = None
+        self.window = None
+        # 앱이 줄마다 찍는 출력은 버림 (초당 수천 줄이라 터미널이 병목이 됨)
+        self.out = sys.stdout
+        if not args.verbose:
+            sys.stdout = open(os.devnull, "w")
+
+    def log(self, text):
+        print(text, file=self.out, flush=True)
+
+    def sim_hours(self):
+        import metrics
+        return metrics.LINES_READ.value / self.args.real_rate / 3600
+
+    def start(self):
+        m = self.module
+        # speed는 안 줌 - 보드 RTC가 배속으로 가면 시계 동기가 계속 보정 명령을 보냄
+        port = f"sim://?rate={self.args.rate:g}&seed={self.args.seed}"
+        self.log(f"[soak] {self.app} {port} - 목표 {self.args.hours:g}시간 (실제 {self.args.real_rate:g}줄/초 기준 "
+              f"x{self.speedup:g}), 최대 {self.args.max_minutes:g}분")
+        tracemalloc.start(self.args.trace_frames)
+        self.window = m.create_window(port=port)
+        self.window.show()
+        self.started = time.monotonic()
+
+        self.sample_timer = m.QTimer()
+        self.sample_timer.timeout.connect(self.sample)
+        self.sample_timer.start(int(self.args.sample_s * 1000))
+        # 시뮬레이션 시간으로 --command-every 초마다 버튼 하나 (리더가 느려도 줄 수 대비 명령 비율은 그대로)
+        self.command_timer = m.QTimer()
+        self.command_timer.timeout.connect(self.send_commands)
+        self.command_timer.start(20)
+        self.sample()
+
+    def send_commands(self):
+        commands = COMMANDS[self.app]
+        worker = getattr(self.window, "board_link", None) or self.window.serial_worker
+        due = int(self.sim_hours() * 3600 / self.args.command_every)
+        # 한 번에 너무 많이 몰리지 않게 틱당 최대 10개
+        for _ in range(min(10, due - self.command_index)):
+            worker.send_command(commands[self.command_index % len(commands)])
+            self.command_index += 1
+
+    def sample(self):
+        gc.collect()
+        elapsed = time.monotonic() - self.started
+        heap, _ = tracemalloc.get_traced_memory()
+        sim_h = self.sim_hours()
+        row = {
+            "wall_s": round(elapsed, 2),
+            "sim_h": round(sim_h, 4),
+            # 목표 시간과 --max-minutes 중 먼저 끝나는 쪽 기준 진행률 (예열 구분용)
+            "progress": round(max(sim_h / self.args.hours, elapsed / (self.args.max_minutes * 60)), 4),
+            "rss": rss_bytes(),
+            "heap": heap,
+            "qobjects": qt_object_count(self.qt_app, self.QObject),
+            "gc_objects": len(gc.get_objects()),
+        }
+        row.update(probes(self.app, self.window))
+        self.samples.append(row)
+        self.log(f"[soak] {elapsed:6.0f}s  sim {row['sim_h']:7.2f}h  rss {row['rss'] / 1e6:7.1f}MB  "
+              f"heap {row['heap'] / 1e6:7.2f}MB  qobj {row['qobjects']:5d}  gc {row['gc_objects']:7d}  "
+              + "  ".join(f"{k} {v}" for k, v in row.items() if k not in BASE_KEYS + SHOWN_KEYS))
+
+        if self.baseline is None and row["progress"] >= self.args.warmup:
+            self.baseline = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        if row["progress"] >= 1:
+            self.finish()
+
+    def finish(self):
+        self.sample_timer.stop()
+        self.command_timer.stop()
+        self.window.close()
+        self.qt_app.quit()
+        if sys.stdout is not self.out:
+            sys.stdout.close()
+            sys.stdout = self.out
+
+    def result(self):
+        args = self.args
+        steady = [s for s in self.samples if s["progress"] >= args.warmup] or self.samples
+        limits = {"rss": args.max_rss_mb_per_hour * 1e6, "heap": args.max_heap_mb_per_hour * 1e6,
+                  "qobjects": args.max_qobjects_per_hour}
+        slopes = {}
+        failed = []
+        span = steady[-1]["sim_h"] - steady[0]["sim_h"]
+        for key in self.samples[-1]:
+            if key in BASE_KEYS:
+                continue
+            slopes[key] = slope([(s["sim_h"], s[key]) for s in steady])
+            limit = limits.get(key, args.max_count_per_hour)
+            if slopes[key] > limit and slopes[key] * span > FLOORS.get(key, DEFAULT_FLOOR):
+                failed.append(key)
+        return {"app": self.app, "target_hours": args.hours, "sim_hours": self.samples[-1]["sim_h"],
+                "wall_seconds": self.samples[-1]["wall_s"], "rate": args.rate, "real_rate": args.real_rate,
+                "slopes_per_hour": slopes, "limits_per_hour": limits, "failed": failed,
+                "samples": self.samples}
+
+    def write_sites(self, path, top=40):
+        """예열 끝 대비 할당 위치별 증가량"""
+        if self.baseline is None:
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        key_type = "traceback" if self.args.trace_frames > 1 else "lineno"
+        stats = snapshot.compare_to(self.baseline, key_type)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# {self.app} - 예열 끝부터 {self.samples[-1]['sim_h']:.2f} 시뮬레이션 시간까지 "
+                    f"할당 위치별 증가 (큰 순서)\n")
+            for stat in stats[:top]:
+                if stat.size_diff <= 0:
+                    break
+                f.write(f"{stat.size_diff / 1024:+10.1f} KiB  {stat.count_diff:+8d} blocks  "
+                        f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}\n")
+                if key_type == "traceback":
+                    for line in stat.traceback.format()[2:]:
+                        f.write(f"        {line}\n")
+
+
+def print_result(result):
+    print(f"[soak] {result['app']}: 시뮬레이션 {result['sim_hours']:.2f}시간 / 목표 {result['target_hours']:g}시간 "
+          f"({result['wall_seconds']:.0f}초)")
+    if result["sim_hours"] < result["target_hours"]:
+        print("[soak] 리더가 --rate를 못 따라가서 목표 시간을 다 못 채움")
+    for key, value in result["slopes_per_hour"].items():
+        unit, scale = ("MB", 1e6) if key in ("rss", "heap") else ("", 1)
+        mark = "  <- 초과" if key in result["failed"] else ""
+        print(f"    {key:<15} {value / scale:+12.3f}{unit} / 시간{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 보드로 빠르게 돌리는 장시간 메모리 증가 시험")
+    parser.add_argument("--app", choices=tuple(APPS), required=True)
+    parser.add_argument("--hours", type=float, default=24, help="채울 시뮬레이션 시간")
+    parser.add_argument("--real-rate", type=float, default=5, help="실제 보드가 초당 보내는 줄 수")
+    parser.add_argument("--rate", type=float, default=3000, help="가상 보드가 초당 보내는 줄 수")
+    parser.add_argument("--command-every", type=float, default=10,
+                        help="시뮬레이션 시간으로 몇 초마다 버튼 명령을 하나씩 보낼지")
+    parser.add_argument("--max-minutes", type=float, default=10, help="실제로 돌릴 최대 시간")
+    parser.add_argument("--sample-s", type=float, default=2, help="표본 간격 (실제 초)")
+    parser.add_argument("--warmup", type=float, default=0.2, help="기울기에서 뺄 앞부분 비율")
+    parser.add_argument("--trace-frames", type=int, default=1, help="tracemalloc 스택 깊이 (>1이면 위치별 보고에 스택)")
+    parser.add_argument("--max-rss-mb-per-hour", type=float, default=2.0)
+    parser.add_argument("--max-heap-mb-per-hour", type=float, default=0.5)
+    parser.add_argument("--max-qobjects-per-hour", type=float, default=1.0)
+    parser.add_argument("--max-count-per-hour", type=float, default=50.0,
+                        help="gc 객체 수, 로그 줄 수, 대기열 길이 같은 개수 기울기 한도")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="앱 출력도 보여줌")
+    parser.add_argument("--report", help="결과 JSON (기본 soak_<앱>.json)")
+    args = parser.parse_args(argv)
+
+    soak = Soak(args)
+    soak.module.QTimer.singleShot(0, soak.start)
+    exec_ = getattr(soak.qt_app, "exec", None) or soak.qt_app.exec_
+    exec_()
+
+    result = soak.result()
+    report = args.report or f"soak_{args.app}.json"
+    with open(report, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=1)
+    sites = os.path.splitext(report)[0] + ".sites.txt"
+    soak.write_sites(sites)
+    print_result(result)
+    print(f"[soak] 결과 {report}, 할당 위치별 증가 {sites}")
+    if result["failed"]:
+        print(f"[soak] 증가 기울기 초과: {', '.join(result['failed'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
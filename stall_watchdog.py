@@ -0,0 +1,160 @@
+"""
+GUI 이벤트 루프 멈춤 감시
+
+메인 스레드의 QTimer가 주기적으로 beat()를 부르고, 별도 감시 스레드가
+마지막 beat 이후 시간이 기준을 넘으면 메인 스레드의 파이썬 스택을 떠서
+그때 실행 중이던 슬롯과 메시지 종류를 함께 기록한다.
+
+    TESTINGGUI_WATCHDOG=0           끄기 (@slot 데코레이터가 함수를 그대로 돌려줌)
+    TESTINGGUI_STALL_MS=250         멈춤으로 볼 기준 (ms)
+    TESTINGGUI_STALL_LOG=stalls.jsonl   멈춤 기록을 JSON 줄로 추가 저장
+
+이벤트 루프 지연(타이머가 늦게 불린 정도)은 event_loop_lag_seconds 히스토그램,
+멈춤 횟수는 event_loop_stalls_total{slot=...} 카운터로 metrics에 남는다.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import inspect
+import functools
+import traceback
+from collections import deque
+
+import metrics
+
+ENABLED = os.environ.get("TESTINGGUI_WATCHDOG", "1") != "0"
+
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def message_type(message):
+    """'ADC:75' -> 'ADC' (멈춤 기록용). events.Event나 그 목록도 받음"""
+    if isinstance(message, list):
+        return f"{message_type(message[0])} x{len(message)}" if message else "list"
+    if hasattr(message, "name"):
+        return message.name
+    if not isinstance(message, str):
+        return type(message).__name__
+    return message.split(":", 1)[0][:16]
+
+
+class StallWatchdog:
+    def __init__(self, threshold=None, beat_interval=0.05):
+        if threshold is None:
+            threshold = float(os.environ.get("TESTINGGUI_STALL_MS", "250")) / 1000
+        self.threshold = threshold
+        self.beat_interval = beat_interval
+        self.log_path = os.environ.get("TESTINGGUI_STALL_LOG")
+        self.main_thread_id = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        # (슬롯 이름, 메시지 인자, 시작 시각) - 메인 스레드에서만 바뀜
+        self.current = None
+        self.pending = None  # 아직 끝나지 않은 멈춤 기록
+        self.lock = threading.Lock()  # last_beat/pending - beat(메인)와 watch(감시 스레드)가 같이 바꿈
+        self.reports = deque(maxlen=100)
+        self.lag = metrics.REGISTRY.histogram("event_loop_lag_seconds", "하트비트 타이머 지연",
+                                              buckets=LAG_BUCKETS)
+        self.timer = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def attach(self, timer_cls):
+        """메인 스레드에서 호출 - 하트비트 타이머와 감시 스레드 시작 (QTimer 클래스를 넘김)"""
+        if not ENABLED or self.thread is not None:
+            return
+        self.main_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.timer = timer_cls()
+        self.timer.timeout.connect(self.beat)
+        self.timer.start(int(self.beat_interval * 1000))
+        self.thread = threading.Thread(target=self.watch, daemon=True, name="stall-watchdog")
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.timer is not None:
+            self.timer.stop()
+
+    def beat(self):
+        now = time.monotonic()
+        with self.lock:
+            lag = now - self.last_beat - self.beat_interval
+            self.last_beat = now
+            report, self.pending = self.pending, None
+        self.lag.observe(max(0.0, lag))
+        if report is not None:
+            # 멈춤이 끝남 - 전체 길이 기록
+            report["duration_ms"] = round((now - report["_started"]) * 1000, 1)
+            del report["_started"]
+            self.finish(report)
+
+    def watch(self):
+        check = min(self.threshold / 4, 0.05)
+        while not self.stop_event.wait(check):
+            last_beat = self.last_beat
+            if time.monotonic() - last_beat < self.threshold or self.pending is not None:
+                continue
+            frame = sys._current_frames().get(self.main_thread_id)
+            current = self.current
+            slot, message, slot_started = current if current else (None, None, None)
+            report = {
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "slot": slot,
+                "message_type": message_type(message) if message is not None else None,
+                "message": str(message)[:80] if message is not None else None,
+                "slot_running_ms": round((time.monotonic() - slot_started) * 1000, 1) if slot_started else None,
+                "stack": traceback.format_stack(frame) if frame is not None else [],
+                "_started": last_beat,
+            }
+            with self.lock:
+                # 스택을 뜨는 사이에 beat()가 돌았으면 이미 끝난 멈춤 - 버림
+                if self.last_beat != last_beat or self.pending is not None:
+                    continue
+                self.pending = report
+            metrics.REGISTRY.counter("event_loop_stalls_total", "이벤트 루프 멈춤 횟수",
+                                     slot=slot or "unknown").inc()
+
+    def finish(self, report):
+        self.reports.append(report)
+        print(f"[멈춤 감지] {report['duration_ms']} ms - 슬롯: {report['slot']}, "
+              f"메시지: {report['message_type']}")
+        if report["stack"]:
+            print("".join(report["stack"][-6:]), end="")
+        if self.log_path:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(report, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"멈춤 기록 저장 실패: {e}")
+
+
+WATCHDOG = StallWatchdog()
+
+
+def slot(name, message_arg=None):
+    """슬롯 실행 중임을 감시기에 알리는 데코레이터 (message_arg: 메시지가 들어있는 인자 위치, self 제외)"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        # Qt는 시그널 인자를 슬롯이 받는 만큼만 넘기는데, 래퍼는 *args라서 직접 잘라줌
+        # (예: valueChanged(int) -> update_rgb(self))
+        code = inspect.unwrap(func).__code__
+        takes = None if code.co_flags & 0x04 else code.co_argcount - 1  # 0x04: *args
+
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            if takes is not None:
+                args = args[:takes]
+            # 슬롯 안에서 다른 슬롯이 불릴 수 있으니 이전 값을 되돌려 놓음
+            previous = WATCHDOG.current
+            WATCHDOG.current = (name, args[message_arg] if message_arg is not None else None,
+                                time.monotonic())
+            try:
+                return func(self, *args)
+            finally:
+                WATCHDOG.current = previous
+        return wrapper
+    return decorate
@@ -0,0 +1,34 @@
+"""
+파이프라인 지표 패널 (metrics.REGISTRY 요약을 1초마다 표시)
+
+PyQt5 앱(another, another2)과 PySide6 앱(testingGUI)이 같이 쓰므로 Qt를 import하지 않고
+앱이 자기 바인딩의 QLabel/QTimer 클래스를 넘긴다 (stall_watchdog.WATCHDOG.attach(QTimer)처럼).
+
+    StatsPanel = stats_panel.panel_class(QLabel, QTimer)
+    self.stats_panel = StatsPanel()
+    gate.add_timer(self.stats_panel.refresh_timer, self.stats_panel.refresh)
+"""
+import metrics
+
+REFRESH_MS = 1000
+STYLE = "font-family: 'Courier'; font-size: 10px; color: dimgrey;"
+
+
+def panel_class(label_cls, timer_cls):
+    """바인딩의 QLabel을 상속한 StatsPanel 클래스 만들기"""
+
+    class StatsPanel(label_cls):
+        """파이프라인 지표 패널 (1초마다 갱신)"""
+
+        def __init__(self, parent=None):
+            super().__init__(parent)
+            self.setStyleSheet(STYLE)
+            self.refresh_timer = timer_cls(self)
+            self.refresh_timer.timeout.connect(self.refresh)
+            self.refresh_timer.start(REFRESH_MS)
+            self.refresh()
+
+        def refresh(self):
+            self.setText("\n".join(metrics.REGISTRY.summary_lines()))
+
+    return StatsPanel
@@ -0,0 +1,316 @@
+"""
+명령 폭주(stress) 시험
+
+보드가 답하는 것보다 빠르게 명령이 들어올 때 펌웨어가 어떻게 되는지 보기 위한 도구.
+BTN1~BTN4, R00001~R00005, RGB:, SEG: 를 정한 비율로 목표 속도만큼 보내고
+명령 종류별 왕복 시간을 HDR 히스토그램에 기록, 잃어버린/늦은 응답을 센다.
+
+    python stress.py --port COM13 --rate 200 --seconds 30 --mix BTN1=2,BTN4=2,RGB=1,SEG=1
+    python stress.py --port COM13 --export build_a.json
+    python stress.py --compare build_a.json build_b.json
+
+응답 짝짓기
+    RGB:/SEG: 는 값을 매번 다르게 보내서 그대로 돌아온 줄과 정확히 짝을 지음.
+    나머지는 응답 종류(RTC:, ADC: ...)별로 먼저 보낸 명령부터 짝을 지음 (FIFO).
+    보드가 같은 종류의 줄을 스스로도 보내면 그 줄과 짝이 지어질 수 있어서,
+    정확한 숫자가 필요하면 RGB/SEG 위주로 섞는 게 좋음.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import deque
+
+# 명령 -> 응답 줄이 시작하는 문자열 (None이면 보낸 명령 그대로 돌아옴, ""이면 응답 없음)
+REPLIES = {
+    "BTN1": "RTC:", "BTN2": "TIM:", "BTN3": "0x90 ID", "BTN4": "ADC:",
+    "R00001": "ADC:", "R00002": "TIM:", "R00003": "", "R00004": "LED1:", "R00005": "TIME:",
+    "RGB": None, "SEG": None,
+}
+DEFAULT_MIX = "BTN1=1,BTN2=1,BTN3=1,BTN4=1,R00001=1,R00005=1,RGB=2,SEG=2"
+QUANTILES = (0.5, 0.99, 0.999)
+
+
+class HdrHistogram:
+    """HDR 방식 히스토그램 (정밀도 유효숫자 2자리, 1us ~ 수십 초, 메모리 고정)
+
+    256 미만은 1us 단위 그대로, 그 위로는 2배마다 128칸씩 (상대 오차 < 1%).
+    """
+    SUB = 256
+    HALF = 128
+
+    def __init__(self, highest_us=60 * 10 ** 6):
+        self.counts = [0] * (self.index(highest_us) + 1)
+        self.highest = highest_us
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def index(cls, value):
+        if value < cls.SUB:
+            return value
+        shift = value.bit_length() - 8
+        return cls.SUB + (shift - 1) * cls.HALF + (value >> shift) - cls.HALF
+
+    @classmethod
+    def value_at(cls, index):
+        """칸의 가운데 값 (us)"""
+        if index < cls.SUB:
+            return index
+        shift = (index - cls.SUB) // cls.HALF + 1
+        low = ((index - cls.SUB) % cls.HALF + cls.HALF) << shift
+        return low + (1 << shift) // 2
+
+    def record(self, seconds):
+        value = min(max(int(seconds * 1e6), 0), self.highest)
+        self.counts[self.index(value)] += 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        if not self.total:
+            return 0.0
+        rank = max(1, int(q * self.total + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.value_at(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def to_dict(self):
+        return {"total": self.total, "max_us": self.max,
+                "buckets": {str(i): c for i, c in enumerate(self.counts) if c}}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        for index, count in data["buckets"].items():
+            histogram.counts[int(index)] = count
+        histogram.total = data["total"]
+        histogram.max = data["max_us"]
+        return histogram
+
+
+class CommandStats:
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.lost = 0
+        self.late = 0
+        self.latency = HdrHistogram()
+
+
+def parse_mix(text):
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip().rstrip(":")
+        if name not in REPLIES:
+            raise argparse.ArgumentTypeError(f"모르는 명령: {name} (가능: {', '.join(REPLIES)})")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+class StressTest:
+    def __init__(self, ser, mix, rate, timeout=1.0, late=0.2, newline="", seed=None):
+        self.ser = ser
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.rate = rate
+        self.timeout = timeout
+        self.late = late
+        self.newline = newline
+        self.random = random.Random(seed)
+        self.stats = {name: CommandStats() for name in self.names}
+        self.pending = {}  # 응답 접두어 -> deque[(명령, 보낸 시각)]
+        self.echo = {}  # 그대로 돌아올 명령 문자열 -> (명령, 보낸 시각)
+        self.lock = threading.Lock()
+        self.running = False
+        self.unmatched = 0
+        self.counter = 0
+
+    def make_command(self, name):
+        self.counter += 1
+        if name == "RGB":
+            # 매번 다른 값이라 돌아온 줄로 정확히 짝지을 수 있음
+            n = self.counter
+            return f"RGB:{n % 256},{(n >> 8) % 256},{(n >> 16) % 256}"
+        if name == "SEG":
+            return f"SEG:{self.counter % 10000:04d}"
+        return name
+
+    def send_loop(self, seconds):
+        interval = 1.0 / self.rate
+        started = time.monotonic()
+        next_send = started
+        while self.running and time.monotonic() - started < seconds:
+            now = time.monotonic()
+            if now < next_send:
+                time.sleep(next_send - now)
+                continue
+            next_send += interval
+            name = self.random.choices(self.names, self.weights)[0]
+            command = self.make_command(name)
+            with self.lock:
+                sent = time.monotonic()
+                if REPLIES[name] is None:
+                    self.echo[command] = (name, sent)
+                elif REPLIES[name]:
+                    self.pending.setdefault(REPLIES[name], deque()).append((name, sent))
+                self.stats[name].sent += 1
+            self.ser.write((command + self.newline).encode())
+            self.expire(sent)
+
+    def expire(self, now):
+        """timeout이 지나도 응답이 없으면 잃어버린 것으로"""
+        with self.lock:
+            for queue in self.pending.values():
+                while queue and now - queue[0][1] > self.timeout:
+                    self.stats[queue.popleft()[0]].lost += 1
+            for command, (name, sent) in list(self.echo.items()):
+                if now - sent > self.timeout:
+                    del self.echo[command]
+                    self.stats[name].lost += 1
+
+    def read_loop(self):
+        while self.running:
+            raw = self.ser.readline()
+            if not raw:
+                continue
+            received = time.monotonic()
+            line = raw.decode("utf-8", errors="ignore").strip()
+            self.match(line, received)
+
+    def match(self, line, received):
+        with self.lock:
+            entry = self.echo.pop(line, None)
+            if entry is None:
+                for prefix, queue in self.pending.items():
+                    if queue and line.startswith(prefix):
+                        entry = queue.popleft()
+                        break
+            if entry is None:
+                self.unmatched += 1
+                return
+            name, sent = entry
+            stats = self.stats[name]
+            stats.received += 1
+            stats.latency.record(received - sent)
+            if received - sent > self.late:
+                stats.late += 1
+
+    def run(self, seconds, live=True):
+        self.running = True
+        reader = threading.Thread(target=self.read_loop, name="stress-reader", daemon=True)
+        reader.start()
+        sender = threading.Thread(target=self.send_loop, args=(seconds,), name="stress-sender", daemon=True)
+        sender.start()
+        started = time.monotonic()
+        while sender.is_alive():
+            sender.join(1.0)
+            if live:
+                print(f"--- {time.monotonic() - started:5.1f}s")
+                print(self.table())
+        # 마지막 응답을 기다린 뒤 정리
+        time.sleep(self.timeout)
+        self.expire(time.monotonic() + self.timeout)
+        self.running = False
+        reader.join(timeout=2)
+
+    def table(self):
+        lines = [f"{'명령':<8} {'보냄':>7} {'받음':>7} {'분실':>6} {'늦음':>6} "
+                 f"{'p50':>8} {'p99':>8} {'p999':>8} {'max':>8}"]
+        with self.lock:
+            for name in self.names:
+                s = self.stats[name]
+                q = [s.latency.quantile(x) * 1000 for x in QUANTILES]
+                lines.append(f"{name:<8} {s.sent:7d} {s.received:7d} {s.lost:6d} {s.late:6d} "
+                             f"{q[0]:7.1f}ms {q[1]:7.1f}ms {q[2]:7.1f}ms {s.latency.max / 1000:7.1f}ms")
+        return "\n".join(lines)
+
+    def export(self, path, info):
+        data = dict(info, time=time.strftime("%Y-%m-%d %H:%M:%S"), unmatched=self.unmatched, commands={})
+        for name in self.names:
+            s = self.stats[name]
+            data["commands"][name] = {
+                "sent": s.sent, "received": s.received, "lost": s.lost, "late": s.late,
+                "quantiles_ms": {str(q): round(s.latency.quantile(q) * 1000, 3) for q in QUANTILES},
+                "histogram": s.latency.to_dict(),
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        print(f"결과 저장: {path}")
+
+
+def compare(path_a, path_b):
+    """두 결과 파일 비교 (펌웨어 빌드 비교용)"""
+    with open(path_a, encoding="utf-8") as f:
+        a = json.load(f)
+    with open(path_b, encoding="utf-8") as f:
+        b = json.load(f)
+    print(f"A: {path_a} ({a.get('label') or a['time']})")
+    print(f"B: {path_b} ({b.get('label') or b['time']})")
+    print(f"{'명령':<8} {'':>6} {'p50':>9} {'p99':>9} {'p999':>9} {'분실률':>8}")
+    for name in sorted(set(a["commands"]) | set(b["commands"])):
+        for label, data in (("A", a), ("B", b)):
+            c = data["commands"].get(name)
+            if c is None:
+                print(f"{name:<8} {label:>6} {'-':>9}")
+                continue
+            h = HdrHistogram.from_dict(c["histogram"])
+            q = [h.quantile(x) * 1000 for x in QUANTILES]
+            loss = c["lost"] / c["sent"] * 100 if c["sent"] else 0.0
+            print(f"{name:<8} {label:>6} {q[0]:8.1f}ms {q[1]:8.1f}ms {q[2]:8.1f}ms {loss:7.2f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="명령 폭주 시험")
+    parser.add_argument("--port", default="COM13")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--rate", type=float, default=50, help="초당 보낼 명령 수")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"명령=비율 목록 (기본 {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=1.0, help="이 시간 안에 응답이 없으면 분실 (초)")
+    parser.add_argument("--late-ms", type=float, default=200, help="이보다 늦은 응답은 '늦음'으로 셈")
+    parser.add_argument("--newline", action="store_true", help="명령 끝에 \\n 붙이기 (another 펌웨어)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--label", help="결과 파일에 남길 이름 (펌웨어 빌드 등)")
+    parser.add_argument("--export", help="결과를 JSON으로 저장 (히스토그램 포함)")
+    parser.add_argument("--compare", nargs=2, metavar=("A", "B"), help="저장한 결과 두 개 비교")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    import serial_port
+    ser = serial_port.open_port(args.port, args.baud, timeout=0.05)
+    test = StressTest(ser, args.mix, args.rate, timeout=args.timeout, late=args.late_ms / 1000,
+                      newline="\n" if args.newline else "", seed=args.seed)
+    try:
+        test.run(args.seconds)
+    except KeyboardInterrupt:
+        test.running = False
+    finally:
+        ser.close()
+    print("=== 결과")
+    print(test.table())
+    print(f"짝이 없는 줄: {test.unmatched}")
+    if args.export:
+        test.export(args.export, {"label": args.label, "port": args.port, "rate": args.rate,
+                                  "seconds": args.seconds, "mix": dict(args.mix)})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
-import serial
+import os
 import time
 import sys
-import re
 import threading
 from datetime import datetime
+
+import events
+import metrics
+import pipeline
+import clocksync
+import profiling
+import render_gate
+import stall_watchdog
+import stats_panel
+import timer_sync
 from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                                QPushButton, QLabel, QTextEdit, QCheckBox,
-                               QProgressBar, QFrame)
-from PySide6.QtCore import Signal, QObject, Qt
+                               QProgressBar, QFrame, QTabWidget, QTableView,
+                               QComboBox, QLineEdit, QHeaderView)
+from PySide6.QtCore import Slot, QObject, QMetaObject, Qt, QTimer, QAbstractTableModel, QModelIndex
 
 #이거는 기존 시스템처럼 해둔거
 
@@ -29,127 +39,342 @@ class SevenSegmentDisplay(QFrame):
         self.display_label.setText(text)
 
 
+StatsPanel = stats_panel.panel_class(QLabel, QTimer)  # 지표 패널 (stats_panel.py)
+
+
+class HistoryModel(QAbstractTableModel):
+    """기록 테이블 - 보이는 근처 몇 페이지만 메모리에 두는 창(window)
+
+    스크롤이 끝에 닿으면 (t, rowid) 기준 다음/이전 페이지를 읽고 반대쪽 끝을 버림.
+    전체 줄 수를 세지 않으므로 세션 크기와 상관없이 가볍다.
+    """
+    HEADERS = ("시각", "종류", "값", "보조", "내용")
+
+    def __init__(self, db, page_size=200, max_rows=1000, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.rows = []  # (rowid, t, type, value, aux, aux2, payload)
+        self.filters = {}
+
+    def rowCount(self, parent=None):
+        return len(self.rows)
+
+    def columnCount(self, parent=None):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        rowid, t, type_, value, aux, aux2, payload = self.rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return datetime.fromtimestamp(t).strftime("%m-%d %H:%M:%S.%f")[:-3]
+        if column == 1:
+            return type_
+        if column == 2:
+            return value
+        if column == 3:
+            return f"{aux},{aux2}" if type_ == "RGB" else aux
+        return payload
+
+    def set_filters(self, end=False, **filters):
+        """필터를 바꾸고 처음(end=True면 끝)부터 다시 읽기"""
+        import session_store
+        self.filters = filters
+        self.beginResetModel()
+        if end:
+            self.rows = session_store.page(self.db, before=(float("inf"), 0),
+                                           limit=self.page_size, **filters)
+        else:
+            self.rows = session_store.page(self.db, limit=self.page_size, **filters)
+        self.endResetModel()
+
+    def load_next(self):
+        """아래로 한 페이지. 위에서 버린 줄 수를 돌려줌"""
+        import session_store
+        if not self.rows:
+            return 0
+        last = self.rows[-1]
+        rows = session_store.page(self.db, after=(last[1], last[0]), limit=self.page_size, **self.filters)
+        if not rows:
+            return 0
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+        drop = len(self.rows) - self.max_rows
+        if drop > 0:
+            self.beginRemoveRows(QModelIndex(), 0, drop - 1)
+            del self.rows[:drop]
+            self.endRemoveRows()
+            return drop
+        return 0
+
+    def load_previous(self):
+        """위로 한 페이지. 위에 끼워넣은 줄 수를 돌려줌"""
+        import session_store
+        if not self.rows:
+            return 0
+        first = self.rows[0]
+        rows = session_store.page(self.db, before=(first[1], first[0]), limit=self.page_size, **self.filters)
+        if not rows:
+            return 0
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self.rows[:0] = rows
+        self.endInsertRows()
+        drop = len(self.rows) - self.max_rows
+        if drop > 0:
+            self.beginRemoveRows(QModelIndex(), len(self.rows) - drop, len(self.rows) - 1)
+            del self.rows[-drop:]
+            self.endRemoveRows()
+        return len(rows)
+
+
+class HistoryPanel(QWidget):
+    """'기록' 탭 - 지난 세션 이벤트 보기 (TESTINGGUI_SESSION_DB)"""
+    # 버튼 이름 -> 저장된 종류
+    TYPE_FILTERS = (("ADC", ("ADC",)), ("LED", ("LED",)), ("TIM", ("TIM", "TIMER")),
+                    ("RTC", ("RTC", "TIME")), ("Flash", ("0x90",)))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db = None
+        self.model = None
+        self.loading = False
+        layout = QVBoxLayout(self)
+
+        filter_layout = QHBoxLayout()
+        self.session_box = QComboBox()
+        filter_layout.addWidget(self.session_box)
+        self.type_checks = []
+        for label, _ in self.TYPE_FILTERS:
+            check = QCheckBox(label)
+            filter_layout.addWidget(check)
+            self.type_checks.append(check)
+        self.since_edit = QLineEdit()
+        self.since_edit.setPlaceholderText("시작 YYYY-MM-DD HH:MM")
+        self.until_edit = QLineEdit()
+        self.until_edit.setPlaceholderText("끝 YYYY-MM-DD HH:MM")
+        filter_layout.addWidget(self.since_edit)
+        filter_layout.addWidget(self.until_edit)
+        apply_button = QPushButton("적용")
+        apply_button.clicked.connect(lambda: self.apply_filters())
+        end_button = QPushButton("맨 끝")
+        end_button.clicked.connect(lambda: self.apply_filters(end=True))
+        filter_layout.addWidget(apply_button)
+        filter_layout.addWidget(end_button)
+        layout.addLayout(filter_layout)
+
+        self.table = QTableView()
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(18)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        layout.addWidget(self.table)
+        self.status = QLabel("")
+        layout.addWidget(self.status)
+
+    def showEvent(self, event):
+        # 탭을 처음 열 때 DB 열기 (시작 시간에 영향 없게)
+        super().showEvent(event)
+        if self.db is None:
+            self.open_db()
+
+    def open_db(self):
+        import session_store  # 기록 탭을 처음 열 때 불러옴 (sqlite3)
+        path = os.environ.get("TESTINGGUI_SESSION_DB")
+        if not path or not os.path.exists(path):
+            self.status.setText("기록 없음 - 런처 --session-db 로 기록을 켜야 함")
+            return
+        self.db = session_store.connect(path)
+        self.model = HistoryModel(self.db, parent=self)
+        self.table.setModel(self.model)
+        for session, started, app, port in session_store.sessions(self.db):
+            stamp = datetime.fromtimestamp(started).strftime("%m-%d %H:%M")
+            self.session_box.addItem(f"#{session} {stamp} {app} {port}", session)
+        self.apply_filters()
+
+    def apply_filters(self, end=False):
+        import session_store
+        if self.model is None:
+            return
+        types = []
+        for check, (_, names) in zip(self.type_checks, self.TYPE_FILTERS):
+            if check.isChecked():
+                types.extend(names)
+        try:
+            since = session_store.parse_time(self.since_edit.text()) if self.since_edit.text() else None
+            until = session_store.parse_time(self.until_edit.text()) if self.until_edit.text() else None
+        except Exception as e:
+            self.status.setText(str(e))
+            return
+        self.loading = True
+        self.model.set_filters(end=end, session=self.session_box.currentData(),
+                               types=types or None, since=since, until=until)
+        self.loading = False
+        if end:
+            self.table.scrollToBottom()
+        self.update_status()
+
+    def on_scroll(self, value):
+        if self.loading or self.model is None:
+            return
+        bar = self.table.verticalScrollBar()
+        self.loading = True
+        try:
+            if value >= bar.maximum() - 5:
+                dropped = self.model.load_next()
+                if dropped:
+                    bar.setValue(value - dropped)
+            elif value <= 5:
+                added = self.model.load_previous()
+                if added:
+                    bar.setValue(value + added)
+        finally:
+            self.loading = False
+        self.update_status()
+
+    def update_status(self):
+        rows = self.model.rows
+        if not rows:
+            self.status.setText("조건에 맞는 기록 없음")
+            return
+        first = datetime.fromtimestamp(rows[0][1]).strftime("%H:%M:%S")
+        last = datetime.fromtimestamp(rows[-1][1]).strftime("%H:%M:%S")
+        self.status.setText(f"{first} ~ {last} ({len(rows)}줄 로드, 최대 {self.model.max_rows}줄)")
+
+
 class SerialWorker(QObject):
-    data_received = Signal(str, str, int)  # time, message, adc_value
-    led_status_changed = Signal(int, bool)  # LED 인덱스, 상태
+    TOPICS = ("adc", "led", "tim", "log")  # ADC, LED1~4, TIMER/TIME + 로그 창
 
     def __init__(self, port="COM13", baudrate=115200):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
-        self.running = True
-        self.ser = None
+        self.stop_event = threading.Event()  # stop()이 set하면 루프가 대기 중이어도 바로 깸
+        # 포트는 hub가 가짐 - 같은 포트를 쓰는 다른 패널과 연결을 같이 씀 (hub.py)
+        self.sub = None
         self.command_queue = []
         self.lock = threading.Lock()
 
         # 추가: LED 상태 추적
         self.led_status = [False, False, False, False]  # 4개 LED 상태
 
+        # 보드 시계 동기화 (매 루프 시각 전송 대신 오차가 허용치를 넘을 때만 보정)
+        self.clock_sync = clocksync.ClockSync(self.write_now, clocksync.HHMM, "R00005")
+
+        # GUI가 밀려도 Qt 대기열이 늘지 않게 크기 제한 채널로 받음 (pipeline.py)
+        # LED 상태도 여기로 - 키별 마지막 것만 GUI가 update_led_status로 반영
+        self.feed = pipeline.UiFeed("testingGUI")
+        self.on_ready = None  # feed에 새 이벤트가 있을 때 GUI 스레드에서 부를 함수 (TraceBoard.drain_received)
+
+    def wake(self):
+        """연결 스레드에서 - GUI 스레드에서 deliver()가 불리게 (drain할 때까지 한 번만)
+
+        Signal.emit()은 PySide6 6.12에서 부를 때마다 True 참조를 하나씩 깎아서
+        (paint_bench.leaks_none_refs 참고) 연결 스레드가 초당 수십 번 깨우면 금방 인터프리터가 죽음.
+        queued invokeMethod로 부르면 안 샘."""
+        QMetaObject.invokeMethod(self, "deliver", Qt.QueuedConnection)
+
+    @Slot()
+    def deliver(self):
+        if self.on_ready is not None:
+            self.on_ready()
+
     def open_serial(self):
-        """시리얼 포트 열기"""
-        if self.ser is None or not self.ser.is_open:
-            try:
-                self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
-                print(f"시리얼 포트 {self.port} 연결됨.")
-                return True
-            except serial.SerialException as e:
-                print(f"시리얼 포트 접근 불가: {e}")
-                self.ser = None
-                return False
+        """hub 연결에 구독 (포트는 연결 스레드가 엶) - 시계 응답/질의는 연결 스레드에서"""
+        if self.sub is None and not self.stop_event.is_set():
+            # 연결/세션 기록 모듈은 작업자 스레드에서 불러옴 (창이 먼저 뜨도록)
+            import hub
+            import session_store
+            session_store.start("testingGUI", self.port)
+            self.sub = hub.subscribe(self.port, self.baudrate, "testingGUI", self.TOPICS, self.wake,
+                                     on_line=self.handle_line, on_tick=self.clock_sync.tick, feed=self.feed)
+        return self.sub is not None
+
+    def reconnect(self):
+        """연결이 끊겼으면 (포트 오류/뽑힘) 다시 구독 - 포트는 연결 스레드가 다시 엶"""
+        if self.sub is not None and self.sub.closed and not self.stop_event.is_set():
+            import hub
+            print(f"시리얼 포트 {self.port} 연결이 끊겨서 다시 연결")
+            self.sub = hub.resubscribe(self.sub)
 
     def close_serial(self):
-        """시리얼 포트 닫기"""
-        if self.ser and self.ser.is_open:
-            self.ser.close()
-            print("시리얼 포트 닫힘")
-            self.ser = None
+        """구독 해제 - 이 포트를 쓰는 마지막 패널이면 hub가 포트를 닫음"""
+        if self.sub is not None:
+            import hub
+            hub.unsubscribe(self.sub)
+            self.sub = None
+            print("시리얼 연결 구독 해제")
 
     def stop(self):
         """작업자 스레드 중지"""
-        self.running = False
+        self.stop_event.set()
         self.close_serial()
 
     def run(self):
         if not self.open_serial():
-            print(f"시리얼 포트 {self.port}를 열 수 없습니다.")
             return
 
-        try:
-            print(f"시리얼 포트 오픈: {self.port}")
-            while self.running:
-                # 현재 시간 전송
-                current_time = datetime.now().strftime("T%H:%M")
-                if self.ser and self.ser.is_open:
-                    self.ser.write(current_time.encode())
-                    print(f"[현재시각: {current_time[1:]}] 전송됨")
-
-                # 명령 대기열 처리
-                with self.lock:
-                    if self.command_queue:
-                        command = self.command_queue.pop(0)
-                        print(f"명령 전송: {command}")
-                        if self.ser and self.ser.is_open:
-                            self.ser.write(str(command).encode())
-
-                # 데이터 수신
-                if self.ser and self.ser.is_open:
-                    data = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                    if data:
-                        print(f"[수신 데이터] {data}")
-
-                        # 데이터 처리 로직 강화
-                        adc_value = 0
-                        message = data
-
-                        # ADC 값 파싱 - 개선된 정규식 패턴
-                        adc_match = re.search(r"ADC\s*:?\s*(\d+)", data)
-                        if adc_match:
-                            try:
-                                adc_value = int(adc_match.group(1))
-                                print(f"ADC Value: {adc_value}")
-                            except ValueError:
-                                adc_value = 0
-
-                        # LED 상태 파싱
-                        led_match = re.search(r"LED(\d+):(ON|OFF)", data)
-                        if led_match:
-                            try:
-                                led_index = int(led_match.group(1)) - 1  # 0-based 인덱스로 변환
-                                led_status = led_match.group(2) == "ON"
-                                if 0 <= led_index < 4:  # 유효한 인덱스 확인
-                                    self.led_status[led_index] = led_status
-                                    self.led_status_changed.emit(led_index, led_status)
-                            except (ValueError, IndexError):
-                                pass
-
-                        # UI 업데이트 신호 발생
-                        self.data_received.emit(current_time[1:], message, adc_value)
-
-                time.sleep(1)
-
-        except serial.SerialException as e:
-            print(f"시리얼 오류 발생: {e}")
-        finally:
-            self.close_serial()
+        print(f"시리얼 포트 오픈: {self.port}")
+        with profiling.thread_cprofile("SerialWorker"):
+            # time.sleep(1)이면 창 닫을 때 GUI 스레드의 join이 최대 1초 멈춤
+            while not self.stop_event.wait(1):
+                self.poll_once()
+
+    @profiling.span("SerialWorker.poll_once")
+    def poll_once(self):
+        # 수신/파싱/기록은 hub 연결 스레드에서 - 여기서는 명령 대기열만 처리
+        with self.lock:
+            if not self.command_queue:
+                return
+            if self.sub is None or not self.sub.is_open:
+                # 끊겼으면 다시 구독 - 명령은 대기열에 남겨뒀다가 포트가 열리면 보냄
+                self.reconnect()
+                return
+            command = self.command_queue.pop(0)
+            metrics.COMMAND_QUEUE_DEPTH.set(len(self.command_queue))
+            print(f"명령 전송: {command}")
+            self.sub.write(str(command).encode())
+
+    def handle_line(self, line, t_ns):
+        """연결 스레드에서 - 시계 응답만 확인하고 줄은 그대로 패널로 보냄"""
+        self.clock_sync.handle_line(line, received=t_ns / 1e9)
+        return False
+
+    def write_now(self, command):
+        """연결 스레드에서 바로 쓰기 (시계 동기화용)"""
+        if self.sub is not None:
+            self.sub.write(str(command).encode())
 
     def send_command(self, command):
         """명령어 전송"""
-        if not self.ser or not self.ser.is_open:
-            if not self.open_serial():
-                print("시리얼 포트가 닫혀있어 명령을 전송할 수 없습니다.")
-                return
+        if self.sub is None:
+            print("시리얼 포트가 닫혀있어 명령을 전송할 수 없습니다.")
+            return
 
         with self.lock:
+            self.reconnect()
             self.command_queue.append(command)
+            metrics.COMMAND_QUEUE_DEPTH.set(len(self.command_queue))
             print(f"명령 대기열 추가: {command}")
 
-        # 즉시 전송 시도
-        if self.ser and self.ser.is_open:
-            try:
-                self.ser.write(str(command).encode())
+        # 즉시 전송 시도 (다시 연결하는 중이면 아직 안 열려서 대기열에서 보냄)
+        try:
+            if self.sub.write(str(command).encode()):
                 print(f"\n<실제로 STM32로 보낸 명령어: {command}>\n")
-            except serial.SerialException as e:
-                print(f"명령 전송 중 오류 발생: {e}")
+            else:
+                print(f"시리얼 포트가 아직 열리지 않아 대기열에서 보냅니다: {command}")
+        except OSError as e:  # serial.SerialException도 OSError (sim/socket/브리지 포트는 OSError)
+            metrics.SERIAL_ERRORS.inc()
+            print(f"명령 전송 중 오류 발생: {e}")
 
     def toggle_led(self, index):
         """LED 토글"""
@@ -173,7 +398,7 @@ class SerialWorker(QObject):
         self.send_command('R00005')
 
 
-class TraceBoard(QWidget):
+class TraceBoard(render_gate.GatedWindow, QWidget):
     def __init__(self, serial_worker):
         super().__init__()
         self.setWindowTitle("Serial Communication Panel")
@@ -208,11 +433,15 @@ class TraceBoard(QWidget):
         self.seven_segment = SevenSegmentDisplay()
         center_layout.addWidget(self.seven_segment)
 
-        # 로그 텍스트 영역
+        # 로그 텍스트 영역 + 지난 기록 탭
         self.text_edit = QTextEdit()
         self.text_edit.setReadOnly(True)
         self.text_edit.setMinimumHeight(150)
-        center_layout.addWidget(self.text_edit)
+        self.history_panel = HistoryPanel()
+        self.log_tabs = QTabWidget()
+        self.log_tabs.addTab(self.text_edit, "실시간 로그")
+        self.log_tabs.addTab(self.history_panel, "기록")
+        center_layout.addWidget(self.log_tabs)
 
         # 데이터 표시 라벨
         data_frame = QFrame()
@@ -224,10 +453,12 @@ class TraceBoard(QWidget):
         self.timer_label = QLabel("타이머: 00:00")
         self.time_label = QLabel("시간: 00:00")
         self.adc_label = QLabel("ADC 값: 0")
+        self.sync_label = QLabel("시계 동기: 대기 중")
 
         labels_layout.addWidget(self.timer_label)
         labels_layout.addWidget(self.time_label)
         labels_layout.addWidget(self.adc_label)
+        labels_layout.addWidget(self.sync_label)
         data_layout.addWidget(labels_frame)
 
         # ADC 프로그레스 바 (세로)
@@ -255,6 +486,11 @@ class TraceBoard(QWidget):
         data_layout.addWidget(progress_frame)
 
         center_layout.addWidget(data_frame)
+
+        # 지표 패널
+        self.stats_panel = StatsPanel()
+        self.stats_panel.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        center_layout.addWidget(self.stats_panel)
         main_layout.addWidget(center_frame, 2)  # 중앙 부분에 더 많은 공간 할당
 
         # 버튼 프레임
@@ -294,38 +530,72 @@ class TraceBoard(QWidget):
         self.setLayout(main_vlayout)
 
         # 시그널 연결
-        self.serial_worker.data_received.connect(self.update_ui)
-        self.serial_worker.led_status_changed.connect(self.update_led_status)
+        self.serial_worker.on_ready = self.drain_received
+
+        # 시계 동기 상태 표시
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.update_sync_status)
+        self.sync_timer.start(1000)
 
         # 초기 상태 설정
         self.reset_display()
 
+        # 타이머 동기 모드면 보드는 기준점만 보내고 여기서 세어서 그림 (timer_sync.py)
+        self.timer_model = timer_sync.TimerModel()
+        self.timer_text = None
+        self.timer_view = QTimer(self)
+        self.timer_view.timeout.connect(self.render_timer)
+        self.timer_view.start(timer_sync.REFRESH_MS)
+
+        # 창이 안 보이면 위젯 갱신과 화면용 타이머를 멈춤 (render_gate.py)
+        self.render_gate = render_gate.RenderGate("testingGUI")
+        self.render_gate.add_timer(self.sync_timer, self.update_sync_status)
+        self.render_gate.add_timer(self.timer_view, self.render_timer)
+        self.render_gate.add_timer(self.stats_panel.refresh_timer, self.stats_panel.refresh)
+        self.render_poll_timer = QTimer(self)
+        self.render_poll_timer.timeout.connect(self.update_render_state)
+        self.render_poll_timer.start(render_gate.POLL_MS)
+
+        # create_window()에서 채워짐
+        self.serial_launcher = None
+
+    @stall_watchdog.slot("on_led_clicked")
     def on_led_clicked(self, index):
         """LED 토글"""
         self.text_edit.append(f"LED {index + 1} 토글 버튼 클릭됨")
         self.serial_worker.toggle_led(index)
 
+    def update_sync_status(self):
+        self.sync_label.setText(self.serial_worker.clock_sync.status_text())
+
+    @stall_watchdog.slot("update_led_status")
     def update_led_status(self, index, status):
         """LED 상태 업데이트"""
         color = "green" if status else "red"
-        self.led_buttons[index].setStyleSheet(f"background-color: {color};")
+        self.render_gate.apply(("led", index), self.led_buttons[index].setStyleSheet,
+                               f"background-color: {color};")
 
+    @stall_watchdog.slot("on_adc_clicked")
     def on_adc_clicked(self):
         self.text_edit.append("ADC 값 요청 버튼 클릭됨")
         self.serial_worker.send_adc()
 
+    @stall_watchdog.slot("on_timer_clicked")
     def on_timer_clicked(self):
         self.text_edit.append("타이머 제어 버튼 클릭됨")
         self.serial_worker.send_timer()
 
+    @stall_watchdog.slot("on_buzzer_clicked")
     def on_buzzer_clicked(self):
         self.text_edit.append("부저 제어 버튼 클릭됨")
         self.serial_worker.send_buzzer()
 
+    @stall_watchdog.slot("on_time_clicked")
     def on_time_clicked(self):
         self.text_edit.append("시간 제어 버튼 클릭됨")
         self.serial_worker.send_time()
 
+    @stall_watchdog.slot("on_reset_clicked")
     def on_reset_clicked(self):
         self.text_edit.append("리셋 제어 버튼 클릭됨")
         self.serial_worker.send_reset()
@@ -339,56 +609,129 @@ class TraceBoard(QWidget):
         self.timer_label.setText("타이머: 00:00")
         self.time_label.setText("시간: 00:00")
 
-    def update_ui(self, current_time, message, adc_value):
+    @stall_watchdog.slot("drain_received")
+    def drain_received(self):
+        """밀린 만큼 한 번에 - 로그는 전부 (넘친 건 개수만), 위젯은 키별 마지막 상태만"""
+        logs, states, dropped = self.serial_worker.feed.drain()
+        if dropped:
+            self.render_gate.log(self.text_edit.append, f"... GUI가 밀려서 {dropped}줄 버림")
+        # 로그 추가 (수신 시각, ms 단위)
+        for event in logs:
+            print(f"[수신 데이터 {events.format_time(event.t_ns)}] {event.line}")
+            if event.kind == events.ADC:
+                print(f"ADC Value: {event.value}")
+            self.render_gate.log(self.text_edit.append,
+                                 f"[시간: {events.format_time(event.t_ns)}] 메시지: {event.line}")
+        for event in states:
+            if event.kind == events.LED_N and 1 <= event.value <= 4:
+                self.serial_worker.led_status[event.value - 1] = bool(event.aux)
+                self.update_led_status(event.value - 1, bool(event.aux))
+            self.update_ui(event)
+
+    @stall_watchdog.slot("update_ui", message_arg=0)
+    @profiling.span("TraceBoard.update_ui")
+    def update_ui(self, event):
         """UI 업데이트"""
-        # 로그 추가
-        self.text_edit.append(f"[시간: {current_time}] 메시지: {message}")
-
+        started = time.monotonic()
+        metrics.SIGNAL_LATENCY.observe((time.monotonic_ns() - event.t_ns) / 1e9)
+        current_time = time.strftime("%H:%M", time.localtime(events.wall_time(event.t_ns)))  # 받은 시각 기준
+        adc_value = event.value if event.kind == events.ADC else 0
+        gate = self.render_gate
         # 개별 데이터 업데이트
-        self.timer_label.setText(f"타이머: {current_time}")
-        self.time_label.setText(f"시간: {current_time}")
+        gate.apply("timer", self.timer_label.setText, f"타이머: {current_time}")
+        gate.apply("time", self.time_label.setText, f"시간: {current_time}")
 
         # ADC 값 업데이트
         if adc_value > 0:
-            self.adc_label.setText(f"ADC 값: {adc_value}")
-            self.adc_progress.setValue(adc_value)
+            gate.apply("adc_label", self.adc_label.setText, f"ADC 값: {adc_value}")
+            gate.apply("adc", self.adc_progress.setValue, adc_value)
 
             # 7-세그먼트에 ADC 값 표시
-            if message.startswith("ADC"):
-                self.seven_segment.update_display(str(adc_value))
+            gate.apply("segment", self.seven_segment.update_display, str(adc_value))
 
-        # 타이머 값이 포함된 경우
-        timer_match = re.search(r"TIMER:([0-9:]+)", message)
-        if timer_match:
-            self.seven_segment.update_display(timer_match.group(1))
+        # 타이머 / 시간 값 (타이머 기준점이면 render_timer가 보간해서 그림)
+        if event.kind == events.TIMER and self.timer_model.anchor(event):
+            self.timer_text = None
+            self.render_timer()
+        elif event.kind in (events.TIMER, events.TIME):
+            gate.apply("segment", self.seven_segment.update_display, event.payload)
 
-        # 시간 값이 포함된 경우
-        time_match = re.search(r"TIME:([0-9:]+)", message)
-        if time_match:
-            self.seven_segment.update_display(time_match.group(1))
+        metrics.UI_UPDATE_SECONDS.observe(time.monotonic() - started)
 
+    def render_timer(self):
+        """보간한 타이머 값 - 표시가 바뀔 때(초 단위)만 그림"""
+        model = self.timer_model
+        if not model.active or (not model.running and self.timer_text is not None):
+            return
+        text = timer_sync.mm_ss(model.value_ms(time.monotonic_ns()))
+        if text == self.timer_text:
+            return
+        self.timer_text = text
+        self.render_gate.apply("segment", self.seven_segment.update_display, text)
 
-def main():
-    app = QApplication(sys.argv)
+    def update_render_state(self):
+        self.render_gate.update(self)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.serial_launcher is not None and not self.serial_launcher.started:
+            # 시리얼 스레드(hub, session_store import 포함)는 창이 처음 그려진 다음에 시작
+            self.serial_launcher.started = True
+            QTimer.singleShot(0, self.serial_launcher.start)
 
+    def closeEvent(self, event):
+        # 창 닫을 때 시리얼 스레드 정리
+        if self.serial_launcher is not None:
+            self.serial_launcher.stop()
+        event.accept()
+
+
+class SerialLauncher:
+    """창이 뜬 뒤에 SerialWorker 스레드를 시작/정리"""
+
+    def __init__(self, serial_worker):
+        self.serial_worker = serial_worker
+        self.serial_thread = None
+        self.started = False
+
+    def start(self):
+        self.serial_thread = threading.Thread(target=self.serial_worker.run, daemon=True)
+        self.serial_thread.start()
+
+    def stop(self):
+        self.serial_worker.stop()
+        if self.serial_thread is not None:
+            self.serial_thread.join(timeout=1)
+
+
+def create_window(port="COM13", baudrate=115200):
+    """TraceBoard 생성 - 포트는 첫 프레임 이후에 열림"""
     # SerialWorker 인스턴스 생성
-    serial_worker = SerialWorker(port="COM13")
+    serial_worker = SerialWorker(port=port, baudrate=baudrate)
 
     # TraceBoard에 serial_worker 전달
     window = TraceBoard(serial_worker)
 
-    # 별도 스레드에서 SerialWorker 실행
-    serial_thread = threading.Thread(target=serial_worker.run, daemon=True)
-    serial_thread.start()
+    # TESTINGGUI_METRICS_FILE이 있으면 Prometheus textfile 기록 시작
+    metrics.start_exporter()
+    stall_watchdog.WATCHDOG.attach(QTimer)
+
+    # 별도 스레드에서 SerialWorker 실행 (창이 처음 그려진 다음, paintEvent에서)
+    window.serial_launcher = SerialLauncher(serial_worker)
+    return window
+
+
+def main():
+    app = QApplication(sys.argv)
 
+    window = create_window(port="COM13")
     window.show()
 
     try:
         app.exec()
     finally:
-        serial_worker.stop()
-        serial_thread.join(timeout=1)
+        window.serial_launcher.stop()
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,82 @@
+"""
+타이머 모드 호스트 보간 - TIM/TIMER 값을 계속 받는 대신 기준점만 받아서 화면에서 돌림
+
+타이머 모드에서 보드가 TIM:/TIMER: 값을 계속 흘려보내서 (초 단위로 뻔히 늘어나는 값)
+링크를 채웠다. 타이머 동기 모드 펌웨어는 시작/멈춤 때와 가끔(기본 30초마다) 기준점만 보내고,
+호스트가 받은 시각(Event.t_ns)부터 직접 세어서 화면 갱신 주기로 그린다.
+
+    TIM:START,0        타이머 시작 - 그 순간 값 (ms)
+    TIM:SYNC,61234     달리는 중 기준점 - 보간 값과 다르면 부드럽게 보정
+    TIM:STOP,0         멈춤 - 표시할 값 (ms)
+    TIMER:START,0 ...  testingGUI 형식도 같음
+
+보정: 기준점과 SNAP_MS 이내로 다르면 표시 시계를 최대 SLEW(20%)만큼 빠르게/느리게 돌려서
+메움 (숫자가 뒤로 가거나 한 번에 튀지 않음). 더 크면 바로 맞춤.
+기준점을 받은 적 없으면 (예전 펌웨어) 예전처럼 받은 값을 그대로 표시.
+
+가상 보드: sim://?timer=sync&anchor=30  (timer=stream 이 예전 방식)
+보간 오차는 timer_sync_error_seconds (기준점을 받을 때 |기준점 - 보간 값|).
+"""
+import events
+import metrics
+
+SLEW = 0.2  # 오차를 메울 때 표시 시계 속도를 바꾸는 최대 비율
+SNAP_MS = 1000  # 이보다 크게 틀리면 보정하지 않고 바로 맞춤
+REFRESH_MS = 100  # GUI가 값을 다시 계산하는 주기 (초 단위 표시라 바뀔 때만 그림)
+
+ANCHOR_ERROR = metrics.REGISTRY.histogram("timer_sync_error_seconds", "기준점을 받았을 때 보간 값과의 차이")
+
+
+def mmss(ms):
+    """another2 형식 "0012" (분은 100에서 돌아감)"""
+    seconds = int(ms // 1000)
+    return f"{(seconds // 60) % 100:02d}{seconds % 60:02d}"
+
+
+def mm_ss(ms):
+    """testingGUI 형식 "00:12\""""
+    seconds = int(ms // 1000)
+    return f"{(seconds // 60) % 100:02d}:{seconds % 60:02d}"
+
+
+class TimerModel:
+    """GUI 스레드에서만 씀 - anchor()로 기준점, value_ms()로 지금 값"""
+
+    def __init__(self, slew=SLEW, snap_ms=SNAP_MS):
+        self.slew = slew
+        self.snap_ms = snap_ms
+        self.active = False  # 기준점을 받은 적 있음
+        self.running = False
+        self.base_ms = 0.0  # base_ns 시각의 표시 값
+        self.base_ns = 0
+        self.error_ms = 0.0  # 아직 못 메운 오차
+
+    def anchor(self, event):
+        """타이머 기준점이면 반영하고 True (아니면 False - 예전 값 줄)"""
+        if event.aux not in (events.TIM_START, events.TIM_STOP, events.TIM_SYNC):
+            return False
+        self.active = True
+        if event.aux == events.TIM_SYNC and self.running:
+            error = event.value - self.value_ms(event.t_ns)
+            ANCHOR_ERROR.observe(abs(error) / 1000)
+            if abs(error) <= self.snap_ms:
+                self.error_ms = error
+                return True
+        self.base_ms = float(event.value)
+        self.base_ns = event.t_ns
+        self.error_ms = 0.0
+        self.running = event.aux != events.TIM_STOP
+        return True
+
+    def value_ms(self, now_ns):
+        """now_ns(monotonic_ns) 시각의 표시 값"""
+        if not self.running:
+            return self.base_ms
+        elapsed = (now_ns - self.base_ns) / 1e6
+        if elapsed <= 0:
+            return self.base_ms + elapsed  # 마지막 계산보다 앞선 시각 (기준점 수신 시각) - 상태는 그대로
+        step = max(-self.slew * elapsed, min(self.slew * elapsed, self.error_ms))
+        self.base_ms += elapsed + step
+        self.base_ns = now_ns
+        self.error_ms -= step
+        return self.base_ms
@@ -0,0 +1,393 @@
+"""
+네트워크 시리얼 (실험실 시리얼 장치 서버에 붙은 보드)
+
+    socket://192.168.0.50:4001     raw TCP (장치 서버의 TCP 서버 모드)
+    rfc2217://192.168.0.50:2217    RFC 2217 (텔넷 + 보드레이트 등 원격 설정, pyserial)
+
+serial_port.open_port가 이 주소를 받으면 여기서 열고, 앱은 시리얼 객체처럼
+readline / in_waiting / write / close 를 그대로 씀.
+
+- Nagle 끔 (TCP_NODELAY) - 짧은 명령이 ACK를 기다리며 40ms씩 묶이지 않게
+- 대신 보낸 직후 짧은 시간(TESTINGGUI_COALESCE_MS, 기본 1ms) 안에 이어서 들어온 작은
+  쓰기는 모아서 TCP 세그먼트 하나로 보냄 (Flash 덤프 요청 창, 연속 LED 명령 등).
+  한동안 조용하다 들어온 단발 명령은 기다리지 않고 바로 나감
+- readline은 받은 덩어리를 버퍼에 두고 줄을 잘라 씀
+  (pyserial socket:// 은 readline이 바이트마다 select + recv 라서 느림)
+
+    python transports.py --bench            루프백 대역 서버로 왕복 시간 비교
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+
+import metrics
+
+COALESCE = float(os.environ.get("TESTINGGUI_COALESCE_MS", "1")) / 1000
+
+WRITES = metrics.REGISTRY.counter("transport_writes_total", "네트워크 포트에 요청된 쓰기 수")
+SEGMENTS = metrics.REGISTRY.counter("transport_sends_total", "실제로 소켓에 보낸 횟수 (모은 뒤)")
+
+
+class CoalescingWriter:
+    """보낸 직후 window 안에 들어온 쓰기를 모아 한 번에 send (limit 이상 쌓이면 바로)
+
+    스레드에서 send가 실패하면 (연결 끊김 등) 그 예외를 들고 있다가 다음 write/flush에서 던지고
+    on_error(예외)를 부름 - 모아둔 명령이 조용히 사라지지 않게."""
+
+    def __init__(self, send, window=COALESCE, limit=1400, on_error=None):
+        self.send = send
+        self.on_error = on_error
+        self.window = window
+        self.limit = limit
+        self.buffer = bytearray()
+        self.cond = threading.Condition()
+        self.send_lock = threading.Lock()  # flush()와 스레드가 순서를 섞지 않게
+        self.closed = False
+        self.error = None  # 스레드에서 난 send 오류
+        self.last_send = 0.0
+        if window > 0:
+            threading.Thread(target=self.run, name="coalescing-writer", daemon=True).start()
+
+    def check(self):
+        if self.error is not None:
+            raise self.error
+
+    def write(self, data):
+        WRITES.inc()
+        self.check()
+        with self.send_lock:
+            with self.cond:
+                # 한동안 보낸 게 없으면 바로 보냄 (단발 명령은 기다리지 않음),
+                # 방금 보냈으면 window 동안 모았다가 한 번에
+                idle = not self.buffer and time.monotonic() - self.last_send >= self.window
+                if not idle:
+                    self.buffer += data
+                    self.cond.notify()
+                    return len(data)
+            self.last_send = time.monotonic()
+            SEGMENTS.inc()
+            self.send(bytes(data))
+        return len(data)
+
+    def take(self):
+        with self.cond:
+            data = bytes(self.buffer)
+            self.buffer.clear()
+        return data
+
+    def flush(self):
+        self.check()
+        with self.send_lock:
+            data = self.take()
+            if data:
+                self.last_send = time.monotonic()
+                SEGMENTS.inc()
+                self.send(data)
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.buffer and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                # 첫 쓰기 후 window 동안 더 기다려서 모음
+                deadline = time.monotonic() + self.window
+                while len(self.buffer) < self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+            try:
+                self.flush()
+            except OSError as e:
+                self.error = e
+                self.close()
+                if self.on_error is not None:
+                    self.on_error(e)
+                return
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+
+class NetworkPort:
+    """줄 버퍼 + 모아 쓰기 공통 부분. 하위 클래스가 _recv / _send / _close 구현"""
+
+    def __init__(self, name, timeout=1, coalesce=COALESCE, baudrate=115200):
+        self.port = name
+        self.timeout = timeout
+        self.baudrate = baudrate
+        self.buffer = bytearray()
+        self.is_open = True
+        self.released = False  # close()로 소켓까지 닫았음
+        self.writer = CoalescingWriter(self._send, coalesce, on_error=self._write_failed)
+
+    def _write_failed(self, error):
+        """모아 쓰기 스레드에서 send 실패 - 포트를 닫힌 것으로 (읽는 쪽도 다음 호출에서 같은 오류)"""
+        self.is_open = False
+
+    def _fill(self, timeout):
+        data = self._recv(timeout)
+        if data is None:
+            self.is_open = False
+            raise OSError(f"{self.port}: connection closed")
+        self.buffer += data
+
+    @property
+    def in_waiting(self):
+        self.writer.check()
+        if self.is_open and not self.buffer:
+            self._fill(0)
+        return len(self.buffer)
+
+    def readline(self):
+        self.writer.check()
+        deadline = time.monotonic() + (self.timeout if self.timeout is not None else 1e9)
+        while True:
+            end = self.buffer.find(b"\n")
+            if end >= 0:
+                line = bytes(self.buffer[:end + 1])
+                del self.buffer[:end + 1]
+                return line
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.is_open:
+                return b""
+            self._fill(remaining)
+
+    def read(self, size=1):
+        deadline = time.monotonic() + (self.timeout if self.timeout is not None else 1e9)
+        while len(self.buffer) < size and self.is_open:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._fill(remaining)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def write(self, data):
+        return self.writer.write(data)
+
+    def flush(self):
+        self.writer.flush()
+
+    def reset_input_buffer(self):
+        self.buffer.clear()
+
+    def close(self):
+        if self.released:
+            return
+        self.released = True
+        try:
+            self.writer.flush()
+        except OSError:
+            pass
+        self.writer.close()
+        self.is_open = False
+        self._close()
+
+
+class SocketPort(NetworkPort):
+    """socket://host:port - raw TCP"""
+
+    def __init__(self, host, port, timeout=1, coalesce=COALESCE, nodelay=True):
+        self.sock = socket.create_connection((host, port), timeout=5)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if nodelay else 0)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        super().__init__(f"socket://{host}:{port}", timeout, coalesce)
+
+    @classmethod
+    def from_url(cls, url, timeout=1, **kwargs):
+        host, port = split_url(url)
+        return cls(host, port, timeout=timeout, **kwargs)
+
+    def _recv(self, timeout):
+        self.sock.settimeout(timeout)
+        try:
+            data = self.sock.recv(65536)
+        except (socket.timeout, BlockingIOError):
+            return b""
+        return data or None
+
+    def _send(self, data):
+        self.sock.sendall(data)
+
+    def _close(self):
+        self.sock.close()
+
+
+class Rfc2217Port(NetworkPort):
+    """rfc2217://host:port - 프로토콜은 pyserial, 쓰기 모으기/줄 버퍼만 여기서"""
+
+    def __init__(self, url, baudrate=115200, timeout=1, coalesce=COALESCE, nodelay=True):
+        import serial
+        # timeout을 바꾸면 pyserial이 장치 서버에 설정 전체를 다시 보내므로 짧은 값으로 고정
+        self.serial = serial.serial_for_url(url, baudrate=baudrate, timeout=0.02)
+        # pyserial이 NODELAY를 켜두지만 비교(--bench)용으로 끌 수 있게
+        self.serial._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if nodelay else 0)
+        super().__init__(url, timeout, coalesce, baudrate)
+
+    def __setattr__(self, name, value):
+        # 보드레이트 협상(baudrate.py)이 바꾸면 장치 서버에도 전달
+        if name == "baudrate" and "serial" in self.__dict__ and value != self.serial.baudrate:
+            self.serial.baudrate = value
+        object.__setattr__(self, name, value)
+
+    def _recv(self, timeout):
+        if not self.serial.is_open:
+            return None
+        waiting = self.serial.in_waiting
+        if waiting:
+            return self.serial.read(waiting)
+        if timeout <= 0:
+            return b""
+        return self.serial.read(1)  # 최대 0.02초 대기, readline이 deadline까지 다시 부름
+
+    def _send(self, data):
+        self.serial.write(data)
+
+    def _close(self):
+        self.serial.close()
+
+
+def split_url(url):
+    host, _, port = url.split("://", 1)[1].strip("/").rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def open_url(url, baudrate=115200, timeout=1):
+    if url.startswith("socket://"):
+        return SocketPort.from_url(url, timeout=timeout)
+    if url.startswith("rfc2217://"):
+        return Rfc2217Port(url, baudrate, timeout=timeout)
+    raise ValueError(f"지원하지 않는 주소: {url}")
+
+
+class SocketWriter:
+    """PortManager가 쓰는 connection.write"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def write(self, data):
+        self.sock.sendall(data)
+
+
+# 루프백 대역 서버 (보드 대신 명령 줄을 그대로 돌려줌)
+class StandInServer(threading.Thread):
+    def __init__(self, rfc2217=False):
+        super().__init__(name="stand-in-server", daemon=True)
+        self.rfc2217 = rfc2217
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+        self.recv_calls = 0
+
+    def run(self):
+        conn, _ = self.listener.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        manager = None
+        if self.rfc2217:
+            import serial
+            from serial import rfc2217
+            manager = rfc2217.PortManager(serial.serial_for_url("loop://"), SocketWriter(conn))
+        pending = bytearray()
+        while True:
+            try:
+                data = conn.recv(65536)
+            except OSError:
+                break
+            if not data:
+                break
+            self.recv_calls += 1
+            if manager is not None:
+                data = b"".join(manager.filter(data))
+            pending += data
+            replies = bytearray()
+            while b"\n" in pending:
+                line, _, rest = bytes(pending).partition(b"\n")
+                pending[:] = rest
+                replies += line + b"\r\n"
+            if replies:
+                conn.sendall(b"".join(manager.escape(bytes(replies))) if manager is not None else bytes(replies))
+        conn.close()
+
+
+def bench_one(kind, nodelay, coalesce, count, burst):
+    server = StandInServer(rfc2217=(kind == "rfc2217"))
+    server.start()
+    url = f"{kind}://127.0.0.1:{server.port}"
+    if kind == "socket":
+        port = SocketPort.from_url(url, timeout=1, coalesce=coalesce, nodelay=nodelay)
+    else:
+        port = Rfc2217Port(url, timeout=1, coalesce=coalesce, nodelay=nodelay)
+    time.sleep(0.2)
+    port.reset_input_buffer()
+    result = {}
+    # 1) 앱처럼 명령 하나를 한 번에 쓰기, 2) 명령과 줄바꿈을 따로 쓰기 (Nagle + 지연 ACK에 걸리는 모양)
+    for mode in ("single", "split"):
+        rtts = []
+        for i in range(count):
+            time.sleep(0.002)  # 단발 명령 (사람이 누르는 버튼 간격 흉내)
+            command = f"SEG:{i % 10000:04d}".encode()
+            started = time.perf_counter()
+            if mode == "single":
+                port.write(command + b"\n")
+            else:
+                port.write(command)
+                port.write(b"\n")
+            rtts.append(time.perf_counter() - started if port.readline() else 1.0)
+        rtts.sort()
+        result[mode] = (rtts[len(rtts) // 2], rtts[min(len(rtts) - 1, int(len(rtts) * 0.99))])
+
+    # 3) 연속 명령 burst: 대역 서버의 recv 횟수로 세그먼트 수 가늠
+    calls_before = server.recv_calls
+    started = time.perf_counter()
+    for i in range(burst):
+        port.write(f"LED{i % 4 + 1}:ON\n".encode())
+    for i in range(burst):
+        port.readline()
+    result["burst"] = (server.recv_calls - calls_before, time.perf_counter() - started)
+    port.close()
+    return result
+
+
+def bench(count, burst):
+    print(f"루프백 대역 서버, 단발 왕복 {count}회씩, 연속 명령 {burst}개")
+    print(f"{'전송':<8} {'설정':<22} {'단발 p50':>9} {'p99':>9} {'나눠쓰기 p50':>12} {'p99':>9} "
+          f"{'burst recv':>11} {'burst':>8}")
+    for kind in ("socket", "rfc2217"):
+        for label, nodelay, coalesce in (("Nagle, 모으기 없음", False, 0), ("NODELAY, 모으기 없음", True, 0),
+                                         (f"NODELAY, 모으기 {COALESCE * 1000:g}ms", True, COALESCE)):
+            try:
+                r = bench_one(kind, nodelay, coalesce, count, burst)
+            except ImportError as e:
+                print(f"{kind:<8} 건너뜀 ({e})")
+                break
+            print(f"{kind:<8} {label:<22} {r['single'][0] * 1000:8.2f}ms {r['single'][1] * 1000:8.2f}ms "
+                  f"{r['split'][0] * 1000:11.2f}ms {r['split'][1] * 1000:8.2f}ms "
+                  f"{r['burst'][0]:11d} {r['burst'][1] * 1000:6.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="네트워크 시리얼 전송 벤치마크")
+    parser.add_argument("--bench", action="store_true", help="루프백 대역 서버로 왕복 시간 비교")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--burst", type=int, default=32)
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+    bench(args.count, args.burst)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())